@@ -8,6 +8,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_GET
 
+from member.middleware import get_logged_in_member
 from member.models import Member
 
 from .forms import DonationForm
@@ -15,14 +16,10 @@ from .models import Donation
 
 
 def _session_member(request):
-    member_no = request.session.get("member_no")
-    if not member_no:
-        return None
-    return Member.objects.filter(
-        member_no=member_no,
-        approval_status="Approved",
-        status="Active",
-    ).first()
+    member = get_logged_in_member(request)
+    if member and member.approval_status == "Approved" and member.status == "Active":
+        return member
+    return None
 
 
 def _member_payload(member):
@@ -4,6 +4,7 @@ Django settings for hello project.
 
 from pathlib import Path
 import os
+import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,6 +27,10 @@ FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://192.168.1.4:3000").rs
 MEMBER_LOGIN_URL = os.getenv("MEMBER_LOGIN_URL", f"{FRONTEND_BASE_URL}/login/")
 SITE_BASE_URL = os.getenv("SITE_BASE_URL", BACKEND_BASE_URL)
 PASSWORD_RESET_TOKEN_MINUTES = int(os.getenv("PASSWORD_RESET_TOKEN_MINUTES", "30"))
+# Seconds a session member stays in the shared cache; 0 loads it once per request only.
+MEMBER_CACHE_TIMEOUT = int(os.getenv("MEMBER_CACHE_TIMEOUT", "0"))
+PUBLIC_PROFILE_CACHE_TIMEOUT = int(os.getenv("PUBLIC_PROFILE_CACHE_TIMEOUT", "300"))
+NEWS_FEED_CACHE_TIMEOUT = int(os.getenv("NEWS_FEED_CACHE_TIMEOUT", "60"))
 
 INSTALLED_APPS = [
     'rest_framework',
@@ -55,6 +60,7 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    'member.middleware.CurrentMemberMiddleware',
     'member.middleware.MemberAuthMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -108,6 +114,25 @@ DATABASES = {
 }
 
 
+# -------------------------------
+# CACHE
+# -------------------------------
+
+# Each process gets its own LocMemCache unless DJANGO_CACHE_BACKEND names a
+# shared one (e.g. django.core.cache.backends.redis.RedisCache with
+# DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379). Run several workers or the
+# location seed scripts against a shared backend, so their version bumps
+# reach every process. Tests always use a private LocMemCache.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("DJANGO_CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("DJANGO_CACHE_LOCATION", ''),
+    }
+}
+if sys.argv[1:2] == ['test']:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
 # -------------------------------
 # PASSWORD VALIDATION
 # -------------------------------
@@ -164,6 +189,16 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', MAIL_ACCOUNT_APP_PASSWORD
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', f"Community Portal <{MAIL_ACCOUNT_EMAIL}>")
 REPLY_TO_EMAIL = os.getenv('REPLY_TO_EMAIL', MAIL_ACCOUNT_EMAIL)
 
+# Outgoing mail is queued in member.EmailOutbox and delivered by
+# `python manage.py send_queued_emails`.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_SECONDS', '60'))
+# A Sending row whose claim has not been renewed for this long is assumed
+# abandoned by a crashed worker and becomes Pending again. The sender renews
+# its claims before each message, so this only has to exceed EMAIL_TIMEOUT.
+EMAIL_OUTBOX_CLAIM_SECONDS = int(os.getenv('EMAIL_OUTBOX_CLAIM_SECONDS', '900'))
+
 
 # -------------------------------
 # DEFAULT PK
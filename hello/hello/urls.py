@@ -15,13 +15,22 @@ urlpatterns = [
     path('donation/', include('donation.urls')),
 
     path('api/public/profile/', member_views.public_profile_api),
+    path('api/directory/search/', member_views.member_directory_search_api),
+    path('api/stats/demographics/', member_views.demographics_stats_api),
+    path('api/birthdays/', member_views.birthdays_api),
+    path('api/member-details/bulk/', member_views.member_detail_bulk_add_api),
     path('api/master/countries/', member_views.country_list_api),
     path('api/master/states/', member_views.state_list_api),
     path('api/master/cities/', member_views.city_list_api),
+    path('api/master/cities/search/', member_views.city_search_api),
+    path('api/master/states/search/', member_views.state_search_api),
     path('api/members/create/', member_views.member_create_api),
     path('api/members/pending/', member_views.pending_member_requests_api),
     path('api/members/<int:member_no>/approve/', member_views.approve_member_api),
     path('api/members/<int:member_no>/reject/', member_views.reject_member_api),
+    path('api/members/bulk-approve/', member_views.bulk_approve_members_api),
+    path('api/members/bulk-reject/', member_views.bulk_reject_members_api),
+    path('api/members/export/', member_views.member_export_api),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0007_alter_bnsmodel_status'),
+        ('member', '0018_profile_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bnsmodel',
+            index=models.Index(fields=['status', 'published_at', 'id'], name='bns_status_published_id_idx'),
+        ),
+    ]
@@ -63,6 +63,9 @@ class BnsModel(models.Model):
         ordering = ["-published_at"]
         verbose_name = "BNS"
         verbose_name_plural = "BNS"
+        indexes = [
+            models.Index(fields=["status", "published_at", "id"], name="bns_status_published_id_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug and self.title:
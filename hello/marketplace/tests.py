@@ -1,3 +1,74 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from member.models import Member
+
+from .models import BnsModel
+
+
+class ListingNavigationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9000000001")
+        cls.items = [
+            BnsModel.objects.create(
+                title=f"Listing {index}",
+                desc="Desc",
+                listing_type=BnsModel.LISTING_TYPE_SELLER,
+                contact="1",
+                status=BnsModel.STATUS_PUBLISHED,
+                created_by=author,
+            )
+            for index in range(5)
+        ]
+        now = timezone.now()
+        # Listings 0 and 1 share a timestamp; listings 3 and 4 have none.
+        published_at = [now - timedelta(days=1), now - timedelta(days=1), now, None, None]
+        for item, value in zip(cls.items, published_at):
+            BnsModel.objects.filter(pk=item.pk).update(published_at=value)
+
+    def _get(self, **params):
+        response = self.client.get(reverse("marketplace:api_all_marketplace"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_neighbours_follow_the_list_order(self):
+        expected = [item["id"] for item in self._get()["results"]]
+        i = self.items
+        self.assertEqual(expected, [i[2].pk, i[1].pk, i[0].pk, i[4].pk, i[3].pk])
+
+        for position, pk in enumerate(expected):
+            data = self._get(id=pk)
+            previous_item = data["previous_item"]["id"] if data["previous_item"] else None
+            next_item = data["next_item"]["id"] if data["next_item"] else None
+            self.assertEqual(previous_item, expected[position - 1] if position else None)
+            self.assertEqual(next_item, expected[position + 1] if position + 1 < len(expected) else None)
+
+    def test_slug_lookup_uses_the_same_neighbours(self):
+        data = self._get(slug=self.items[4].slug)
+        self.assertEqual(data["result"]["id"], self.items[4].pk)
+        self.assertEqual(data["previous_item"]["id"], self.items[0].pk)
+        self.assertEqual(data["next_item"]["id"], self.items[3].pk)
+
+    def test_cursor_pages_walk_the_list_order(self):
+        expected = [item["id"] for item in self._get()["results"]]
+        seen = []
+        data = self._get(cursor="", page_size=2)
+        while True:
+            self.assertNotIn("count", data)
+            seen += [item["id"] for item in data["results"]]
+            if not data["has_next"]:
+                break
+            data = self.client.get(data["next"]).json()
+        self.assertEqual(seen, expected)
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(self._get(page_size=1000000)["page_size"], 100)
+        self.assertEqual(self._get(cursor="", page_size=1000000)["page_size"], 100)
 
-# Create your tests here.
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("marketplace:api_all_marketplace"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
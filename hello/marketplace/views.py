@@ -6,10 +6,14 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.conf import settings
 from django.utils import timezone
 
-from member.models import Member
+from member.middleware import get_logged_in_member
+from member.pagination import InvalidCursor, keyset_neighbours, keyset_page
 from .forms import BnsModelForm
 from .models import BnsModel
 
+MARKETPLACE_PAGE_SIZE = 10
+MARKETPLACE_PAGE_SIZE_MAX = 100
+
 STATUS_CODE_MAP = {
     BnsModel.STATUS_INREVIEW: 0,
     BnsModel.STATUS_PUBLISHED: 1,
@@ -53,16 +57,6 @@ def _published_ordered_queryset(base_qs=None):
     return qs.order_by(F("published_at").desc(nulls_last=True), "-id")
 
 
-def get_logged_in_member(request):
-    member_no = request.session.get("member_no")
-    if not member_no:
-        return None
-    try:
-        return Member.objects.get(member_no=member_no)
-    except Member.DoesNotExist:
-        return None
-
-
 def member_marketplace_list(request):
     member = get_logged_in_member(request)
     if not member:
@@ -165,14 +159,7 @@ def _serialize_bns_item(item):
 
 
 def _single_record_navigation(request, qs, current_obj):
-    ordered_ids = list(qs.values_list("id", flat=True))
-    try:
-        idx = ordered_ids.index(current_obj.id)
-    except ValueError:
-        return {"previous": None, "next": None, "previous_item": None, "next_item": None}
-
-    prev_obj = qs.filter(id=ordered_ids[idx - 1]).first() if idx > 0 else None
-    next_obj = qs.filter(id=ordered_ids[idx + 1]).first() if idx < len(ordered_ids) - 1 else None
+    prev_obj, next_obj = keyset_neighbours(qs, current_obj)
     return {
         "previous": request.build_absolute_uri(f"{request.path}?id={prev_obj.id}") if prev_obj else None,
         "next": request.build_absolute_uri(f"{request.path}?id={next_obj.id}") if next_obj else None,
@@ -269,11 +256,41 @@ def api_all_marketplace(request):
         )
 
     page_number = request.GET.get("page", 1)
-    page_size = request.GET.get("page_size") or request.GET.get("per_page") or 10
+    page_size = request.GET.get("page_size") or request.GET.get("per_page") or MARKETPLACE_PAGE_SIZE
     try:
-        page_size = max(1, int(page_size))
+        page_size = max(1, min(int(page_size), MARKETPLACE_PAGE_SIZE_MAX))
     except (TypeError, ValueError):
-        page_size = 10
+        page_size = MARKETPLACE_PAGE_SIZE
+
+    if "cursor" in request.GET:
+        # Opt-in infinite scroll: keyset on (published_at, id), no COUNT/OFFSET.
+        try:
+            page, next_cursor = keyset_page(qs, request.GET["cursor"].strip(), page_size)
+        except InvalidCursor as exc:
+            return JsonResponse({"detail": str(exc)}, status=400)
+        next_url = None
+        if next_cursor:
+            next_params = request.GET.copy()
+            next_params.pop("page", None)
+            next_params["cursor"] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{next_params.urlencode()}")
+        # No "count": page mode's is the total, which cursor mode never computes.
+        return JsonResponse(
+            {
+                "page_size": page_size,
+                "has_next": next_cursor is not None,
+                "ordering": ordering_mode,
+                "next_cursor": next_cursor,
+                "next": next_url,
+                "filters": {
+                    "status": status_filter,
+                    "listing_type": listing_type or None,
+                    "area": area or None,
+                    "search": search or None,
+                },
+                "results": [_serialize_bns_item(obj) for obj in page],
+            }
+        )
 
     paginator = Paginator(qs, page_size)
     try:
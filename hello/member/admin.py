@@ -1,8 +1,13 @@
 from django.contrib import admin, messages
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import Q
 from django.urls import reverse
-from member.models import City, Country, Member, MemberDetail, MemberPasswordResetToken, State
+from django.utils import timezone
+from member.emails import queue_approval_email, queue_approval_emails
+from member.exports import households_export_response
+from member.models import City, Country, EmailOutbox, Member, MemberDetail, MemberPasswordResetToken, State
+from member.search import member_search_filter, search_available
 
 
 @admin.register(Country)
@@ -68,136 +73,66 @@ class MemberAdmin(admin.ModelAdmin):
     list_select_related = ("approved_by", "country", "state", "city")
     autocomplete_fields = ("country", "state", "city")
     readonly_fields = ("approved_by", "approved_at", "created_at", "updated_at")
-    actions = ["approve_selected", "mark_not_approved"]
+    actions = ["approve_selected", "mark_not_approved", "export_csv", "export_ndjson"]
     list_per_page = 25
     list_max_show_all = 200
     show_full_result_count = False
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = (search_term or "").strip()
+        if not search_term or not search_available():
+            return super().get_search_results(request, queryset, search_term)
+
+        # FTS index lookup instead of icontains over every search field.
+        condition = member_search_filter(search_term)
+        if search_term.isdigit():
+            condition |= Q(member_no=int(search_term))
+        return queryset.filter(condition), False
+
     def _build_reset_link(self, token):
         path = reverse("member:reset_password_with_token", args=[token])
         base_url = getattr(settings, "SITE_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
         return f"{base_url}{path}"
 
-    def _send_credentials_email(self, member, reset_link):
-        if not member.email_id:
-            return False, "Member email not available"
-
-        subject = "Your Account Is Approved - Set Your Password"
-        text_message = (
-            f"Hello {member.first_name},\n\n"
-            "Your account request has been approved.\n"
-            f"Username: {member.username}\n"
-            "For security, password is not sent in email.\n"
-            "Use this one-time link to set your password:\n"
-            f"{reset_link}\n\n"
-            "This link will expire and can be used only once."
-        )
-        display_name = member.first_name or "Member"
-        username = member.username or member.email_id or ""
-        html_message = f"""<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Membership Approved</title>
-</head>
-<body style="margin:0;padding:0;background:#f2f3f5;font-family:Arial,sans-serif;color:#111;">
-  <table width="100%" cellpadding="0" cellspacing="0" style="padding:24px 12px;">
-    <tr>
-      <td align="center">
-        <table width="700" cellpadding="0" cellspacing="0" style="max-width:700px;background:#ffffff;">
-          <tr>
-            <td style="background:#000;padding:28px 32px;color:#fff;">
-              <div style="font-size:34px;font-weight:700;letter-spacing:1px;">Community Portal</div>
-              <div style="font-size:12px;opacity:.85;margin-top:6px;">membership approval update</div>
-            </td>
-          </tr>
-          <tr>
-            <td style="padding:30px 32px;">
-              <p style="margin:0 0 18px 0;font-size:18px;">Hello {display_name},</p>
-              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
-                Your membership request has been <strong>approved</strong>.
-              </p>
-              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
-                <strong>Username:</strong> {username}<br>
-                <strong>Password:</strong> Not shared by email for security.
-              </p>
-              <p style="margin:0 0 22px 0;font-size:18px;line-height:1.6;">
-                Click below to set your password and activate your account.
-              </p>
-              <table cellpadding="0" cellspacing="0" style="margin:0 0 18px 0;">
-                <tr>
-                  <td bgcolor="#007bff" style="border-radius:4px;">
-                    <a href="{reset_link}" style="display:inline-block;padding:12px 22px;color:#fff;text-decoration:none;font-size:14px;font-weight:700;">Set Password</a>
-                  </td>
-                </tr>
-              </table>
-              <p style="margin:0;font-size:13px;line-height:1.6;color:#555;">
-                This link is one-time use and will expire automatically.
-              </p>
-            </td>
-          </tr>
-          <tr>
-            <td style="padding:16px 32px;background:#f7f7f8;color:#666;font-size:12px;">
-              &copy; 2026 Community Portal
-            </td>
-          </tr>
-        </table>
-      </td>
-    </tr>
-  </table>
-</body>
-</html>"""
-
-        try:
-            email = EmailMultiAlternatives(
-                subject,
-                text_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [member.email_id],
-                reply_to=[settings.REPLY_TO_EMAIL],
-            )
-            email.attach_alternative(html_message, "text/html")
-            sent = email.send(fail_silently=False)
-            if sent > 0:
-                return True, None
-            return False, "Email backend returned 0 sent emails"
-        except Exception as exc:
-            return False, f"{exc.__class__.__name__}: {exc}"
-
     def _approve_and_notify(self, member, approver):
-        member.approve(approver=approver)
-        ttl_minutes = int(getattr(settings, "PASSWORD_RESET_TOKEN_MINUTES", 30))
-        token_obj = MemberPasswordResetToken.create_for_member(member, ttl_minutes=ttl_minutes)
-        reset_link = self._build_reset_link(token_obj.token)
-        sent, err = self._send_credentials_email(member, reset_link)
+        with transaction.atomic():
+            member.approve(approver=approver)
+            ttl_minutes = int(getattr(settings, "PASSWORD_RESET_TOKEN_MINUTES", 30))
+            token_obj = MemberPasswordResetToken.create_for_member(member, ttl_minutes=ttl_minutes)
+            reset_link = self._build_reset_link(token_obj.token)
+            queued, err = queue_approval_email(member, reset_link)
         return {
             "username": member.username,
             "set_password_link": reset_link,
-            "email_sent": sent,
+            "email_queued": queued,
             "email_error": err,
         }
 
     @admin.action(description="Approve selected members and send credentials")
     def approve_selected(self, request, queryset):
-        approved_count = 0
+        ttl_minutes = int(getattr(settings, "PASSWORD_RESET_TOKEN_MINUTES", 30))
+        member_nos = list(queryset.values_list("member_no", flat=True))
+        with transaction.atomic():
+            approved = Member.bulk_approve(member_nos, approver=request.user)
+            tokens = MemberPasswordResetToken.bulk_create_for_members(approved, ttl_minutes=ttl_minutes)
+            reset_links = {
+                member_no: self._build_reset_link(token.token)
+                for member_no, token in tokens.items()
+            }
+            email_results = queue_approval_emails(approved, reset_links)
+
         email_count = 0
         email_errors = []
-        for member in queryset:
-            if member.approval_status == "Approved":
-                continue
-            result = self._approve_and_notify(member, request.user)
-            approved_count += 1
-            if result["email_sent"]:
+        for member in approved:
+            queued, err = email_results[member.member_no]
+            if queued:
                 email_count += 1
-            elif result["email_error"]:
-                email_errors.append(
-                    f"Member {member.member_no} ({member.email_id}): {result['email_error']}"
-                )
+            elif err:
+                email_errors.append(f"Member {member.member_no} ({member.email_id}): {err}")
 
         self.message_user(
             request,
-            f"Approved {approved_count} member(s). Credentials email sent to {email_count} member(s).",
+            f"Approved {len(approved)} member(s). Credentials email queued for {email_count} member(s).",
         )
         if email_errors:
             for err in email_errors[:5]:
@@ -205,11 +140,20 @@ class MemberAdmin(admin.ModelAdmin):
 
     @admin.action(description="Mark selected members as Not Approved")
     def mark_not_approved(self, request, queryset):
-        count = 0
-        for member in queryset:
-            member.mark_not_approved(approver=request.user)
-            count += 1
-        self.message_user(request, f"Marked {count} member(s) as Not Approved.")
+        with transaction.atomic():
+            member_nos = Member.bulk_mark_not_approved(
+                queryset.values_list("member_no", flat=True),
+                approver=request.user,
+            )
+        self.message_user(request, f"Marked {len(member_nos)} member(s) as Not Approved.")
+
+    @admin.action(description="Export selected members with family (CSV)")
+    def export_csv(self, request, queryset):
+        return households_export_response(queryset, "csv")
+
+    @admin.action(description="Export selected members with family (NDJSON)")
+    def export_ndjson(self, request, queryset):
+        return households_export_response(queryset, "ndjson")
 
     def save_model(self, request, obj, form, change):
         # If superadmin changes approval to Approved from change form,
@@ -228,10 +172,10 @@ class MemberAdmin(admin.ModelAdmin):
                     ),
                     level=messages.SUCCESS,
                 )
-                if not result["email_sent"] and result["email_error"]:
+                if not result["email_queued"] and result["email_error"]:
                     self.message_user(
                         request,
-                        f"Credentials email failed: {result['email_error']}",
+                        f"Credentials email not queued: {result['email_error']}",
                         level=messages.ERROR,
                     )
                 return
@@ -288,3 +232,24 @@ class MemberDetailAdmin(admin.ModelAdmin):
         css = {
             "all": ("admin_custom/news_changelist.css",)
         }
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "to_email", "subject", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status", "kind")
+    search_fields = ("to_email", "subject", "member__member_no")
+    list_select_related = ("member",)
+    readonly_fields = ("member", "sent_at", "last_error", "created_at", "updated_at")
+    actions = ["retry_selected"]
+    list_per_page = 50
+    show_full_result_count = False
+
+    @admin.action(description="Retry selected emails now")
+    def retry_selected(self, request, queryset):
+        count = queryset.exclude(status__in=[EmailOutbox.STATUS_SENT, EmailOutbox.STATUS_SENDING]).update(
+            status=EmailOutbox.STATUS_PENDING,
+            next_attempt_at=timezone.now(),
+            attempts=0,
+        )
+        self.message_user(request, f"Queued {count} email(s) for another delivery attempt.")
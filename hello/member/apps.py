@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MemberConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'member'
+
+    def ready(self):
+        from . import signals
+
+        signals.connect_activity_signals()
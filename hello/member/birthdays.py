@@ -0,0 +1,63 @@
+from .models import Member, MemberDetail, birthday_q, calculate_age
+
+
+def _full_name(obj):
+    return " ".join(part for part in (obj.first_name, obj.middle_name, obj.surname) if part)
+
+
+def birthdays_on(day, member_no=None):
+    """
+    Approved, active members and their family members whose birthday is on
+    ``day``: one query per table on the (birth_month, birth_day) index.
+    """
+    window = birthday_q(day, day)
+    members = Member.objects.filter(window, approval_status="Approved", status="Active")
+    details = MemberDetail.objects.filter(
+        window, member_no__approval_status="Approved", member_no__status="Active"
+    ).select_related("member_no")
+    if member_no is not None:
+        members = members.filter(member_no=member_no)
+        details = details.filter(member_no_id=member_no)
+    return (
+        list(members.order_by("first_name", "surname", "member_no")),
+        list(details.order_by("first_name", "surname", "member_id")),
+    )
+
+
+def group_by_household(members, details, day):
+    # {household Member: [(name, relation, age turning)]}
+    households = {}
+    for member in members:
+        households.setdefault(member, []).append(
+            (_full_name(member), "member", calculate_age(member.date_of_birth, day))
+        )
+    for detail in details:
+        households.setdefault(detail.member_no, []).append(
+            (_full_name(detail), "family", calculate_age(detail.date_of_birth, day))
+        )
+    return households
+
+
+def serialize_birthdays(members, details, day):
+    return {
+        "members": [
+            {
+                "member_no": member.member_no,
+                "full_name": _full_name(member),
+                "date_of_birth": member.date_of_birth.isoformat(),
+                "turning": calculate_age(member.date_of_birth, day),
+            }
+            for member in members
+        ],
+        "family_members": [
+            {
+                "member_id": detail.member_id,
+                "member_no": detail.member_no_id,
+                "full_name": _full_name(detail),
+                "household": _full_name(detail.member_no),
+                "date_of_birth": detail.date_of_birth.isoformat(),
+                "turning": calculate_age(detail.date_of_birth, day),
+            }
+            for detail in details
+        ],
+    }
@@ -1,19 +1,19 @@
-from .models import Member
+from .images import profile_image_variant_urls
+from .middleware import get_logged_in_member
 from .models import MemberDetail
 
 
+def _avatar_url(obj):
+    # The 96px avatar variant when one has been generated, else the original.
+    return profile_image_variant_urls(obj).get("avatar") or obj.profile_image.url
+
+
 def sidebar_member(request):
-    member_no = request.session.get("member_no")
-    member = None
-    if member_no:
-        try:
-            member = Member.objects.get(member_no=member_no)
-        except Member.DoesNotExist:
-            member = None
+    member = get_logged_in_member(request)
     sidebar_profile_image = None
     if member:
         if member.profile_image:
-            sidebar_profile_image = member.profile_image.url
+            sidebar_profile_image = _avatar_url(member)
         else:
             latest_detail = (
                 MemberDetail.objects
@@ -23,7 +23,7 @@ def sidebar_member(request):
                 .first()
             )
             if latest_detail and latest_detail.profile_image:
-                sidebar_profile_image = latest_detail.profile_image.url
+                sidebar_profile_image = _avatar_url(latest_detail)
 
     return {
         "sidebar_member": member,
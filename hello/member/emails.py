@@ -0,0 +1,373 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import EmailOutbox
+
+
+def build_approval_email(member, reset_link):
+    subject = "Your Account Is Approved - Set Your Password"
+    text_message = (
+        f"Hello {member.first_name},\n\n"
+        "Your account request has been approved.\n"
+        f"Username: {member.username}\n"
+        "For security, password is not sent in email.\n"
+        "Use this one-time link to set your password:\n"
+        f"{reset_link}\n\n"
+        "This link will expire and can be used only once."
+    )
+    display_name = member.first_name or "Member"
+    username = member.username or member.email_id or ""
+    html_message = f"""<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Membership Approved</title>
+</head>
+<body style="margin:0;padding:0;background:#f2f3f5;font-family:Arial,sans-serif;color:#111;">
+  <table width="100%" cellpadding="0" cellspacing="0" style="padding:24px 12px;">
+    <tr>
+      <td align="center">
+        <table width="700" cellpadding="0" cellspacing="0" style="max-width:700px;background:#ffffff;">
+          <tr>
+            <td style="background:#000;padding:28px 32px;color:#fff;">
+              <div style="font-size:34px;font-weight:700;letter-spacing:1px;">Community Portal</div>
+              <div style="font-size:12px;opacity:.85;margin-top:6px;">membership approval update</div>
+            </td>
+          </tr>
+          <tr>
+            <td style="padding:30px 32px;">
+              <p style="margin:0 0 18px 0;font-size:18px;">Hello {display_name},</p>
+              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
+                Your membership request has been <strong>approved</strong>.
+              </p>
+              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
+                <strong>Username:</strong> {username}<br>
+                <strong>Password:</strong> Not shared by email for security.
+              </p>
+              <p style="margin:0 0 22px 0;font-size:18px;line-height:1.6;">
+                Click below to set your password and activate your account.
+              </p>
+              <table cellpadding="0" cellspacing="0" style="margin:0 0 18px 0;">
+                <tr>
+                  <td bgcolor="#007bff" style="border-radius:4px;">
+                    <a href="{reset_link}" style="display:inline-block;padding:12px 22px;color:#fff;text-decoration:none;font-size:14px;font-weight:700;">Set Password</a>
+                  </td>
+                </tr>
+              </table>
+              <p style="margin:0;font-size:13px;line-height:1.6;color:#555;">
+                This link is one-time use and will expire automatically.
+              </p>
+            </td>
+          </tr>
+          <tr>
+            <td style="padding:16px 32px;background:#f7f7f8;color:#666;font-size:12px;">
+              &copy; 2026 Community Portal
+            </td>
+          </tr>
+        </table>
+      </td>
+    </tr>
+  </table>
+</body>
+</html>"""
+    return subject, text_message, html_message
+
+
+def build_request_received_email(member):
+    subject = "Member Request Received"
+    text_message = (
+        f"Hello {member.first_name},\n\n"
+        "Your membership request has been received successfully.\n"
+        "Your account is currently Pending approval by superadmin.\n\n"
+        "You will receive login credentials after approval."
+    )
+    display_name = member.first_name or "Member"
+    html_message = f"""<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Member Request Received</title>
+</head>
+<body style="margin:0;padding:0;background:#f2f3f5;font-family:Arial,sans-serif;color:#111;">
+  <table width="100%" cellpadding="0" cellspacing="0" style="padding:24px 12px;">
+    <tr>
+      <td align="center">
+        <table width="700" cellpadding="0" cellspacing="0" style="max-width:700px;background:#ffffff;">
+          <tr>
+            <td style="background:#000;padding:28px 32px;color:#fff;">
+              <div style="font-size:34px;font-weight:700;letter-spacing:1px;">Community Portal</div>
+              <div style="font-size:12px;opacity:.85;margin-top:6px;">membership request update</div>
+            </td>
+          </tr>
+          <tr>
+            <td style="padding:30px 32px;">
+              <p style="margin:0 0 18px 0;font-size:18px;">Hello {display_name},</p>
+              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
+                Your membership request has been received successfully.
+              </p>
+              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
+                Current status: <strong>Pending superadmin approval</strong>.
+              </p>
+              <p style="margin:0;font-size:14px;line-height:1.6;color:#555;">
+                You will receive the next email after approval.
+              </p>
+            </td>
+          </tr>
+          <tr>
+            <td style="padding:16px 32px;background:#f7f7f8;color:#666;font-size:12px;">
+              &copy; 2026 Community Portal
+            </td>
+          </tr>
+        </table>
+      </td>
+    </tr>
+  </table>
+</body>
+</html>"""
+    return subject, text_message, html_message
+
+
+def build_birthday_email(member, celebrants, day):
+    # celebrants: [(name, relation, age)] for one household on one day.
+    subject = "Birthday Reminder - " + ", ".join(name for name, _, _ in celebrants)
+    lines = []
+    for name, relation, age in celebrants:
+        label = name if relation == "member" else f"{name} ({relation})"
+        lines.append(f"{label} turns {age} today." if age is not None else f"{label} has a birthday today.")
+    text_message = f"Hello {member.first_name},\n\n" + "\n".join(lines) + "\n\nWishing your family a wonderful day."
+    display_name = escape(member.first_name or "Member")
+    items = "".join(f'<li style="margin:0 0 8px 0;">{escape(line)}</li>' for line in lines)
+    html_message = f"""<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Birthday Reminder</title>
+</head>
+<body style="margin:0;padding:0;background:#f2f3f5;font-family:Arial,sans-serif;color:#111;">
+  <table width="100%" cellpadding="0" cellspacing="0" style="padding:24px 12px;">
+    <tr>
+      <td align="center">
+        <table width="700" cellpadding="0" cellspacing="0" style="max-width:700px;background:#ffffff;">
+          <tr>
+            <td style="background:#000;padding:28px 32px;color:#fff;">
+              <div style="font-size:34px;font-weight:700;letter-spacing:1px;">Community Portal</div>
+              <div style="font-size:12px;opacity:.85;margin-top:6px;">birthday reminder for {day:%d %B}</div>
+            </td>
+          </tr>
+          <tr>
+            <td style="padding:30px 32px;">
+              <p style="margin:0 0 18px 0;font-size:18px;">Hello {display_name},</p>
+              <ul style="margin:0 0 18px 0;padding-left:20px;font-size:18px;line-height:1.6;">{items}</ul>
+              <p style="margin:0;font-size:14px;line-height:1.6;color:#555;">
+                Wishing your family a wonderful day.
+              </p>
+            </td>
+          </tr>
+          <tr>
+            <td style="padding:16px 32px;background:#f7f7f8;color:#666;font-size:12px;">
+              &copy; 2026 Community Portal
+            </td>
+          </tr>
+        </table>
+      </td>
+    </tr>
+  </table>
+</body>
+</html>"""
+    return subject, text_message, html_message
+
+
+def queue_email(member, kind, subject, text_message, html_message=""):
+    if not member.email_id:
+        return False, "Member email not available"
+
+    EmailOutbox.objects.create(
+        member=member,
+        kind=kind,
+        to_email=member.email_id,
+        subject=subject,
+        text_body=text_message,
+        html_body=html_message or "",
+    )
+    return True, None
+
+
+def queue_approval_email(member, reset_link):
+    return queue_email(member, EmailOutbox.KIND_APPROVAL, *build_approval_email(member, reset_link))
+
+
+def queue_approval_emails(members, reset_links):
+    # Bulk variant of queue_approval_email; returns {member_no: (queued, error)}.
+    rows = []
+    results = {}
+    for member in members:
+        if not member.email_id:
+            results[member.member_no] = (False, "Member email not available")
+            continue
+        subject, text_message, html_message = build_approval_email(member, reset_links[member.member_no])
+        rows.append(
+            EmailOutbox(
+                member=member,
+                kind=EmailOutbox.KIND_APPROVAL,
+                to_email=member.email_id,
+                subject=subject,
+                text_body=text_message,
+                html_body=html_message,
+            )
+        )
+        results[member.member_no] = (True, None)
+    EmailOutbox.objects.bulk_create(rows, batch_size=200)
+    return results
+
+
+def queue_request_received_email(member):
+    return queue_email(member, EmailOutbox.KIND_REQUEST_RECEIVED, *build_request_received_email(member))
+
+
+def _retry_delay(attempts):
+    base = int(getattr(settings, "EMAIL_OUTBOX_RETRY_SECONDS", 60))
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), 6 * 60 * 60))
+
+
+def _build_message(item, connection):
+    email = EmailMultiAlternatives(
+        item.subject,
+        item.text_body,
+        settings.DEFAULT_FROM_EMAIL,
+        [item.to_email],
+        reply_to=[settings.REPLY_TO_EMAIL],
+        connection=connection,
+    )
+    if item.html_body:
+        email.attach_alternative(item.html_body, "text/html")
+    return email
+
+
+def release_stale_claims(now=None):
+    # Rows left in Sending by a worker that died mid-batch go back to Pending.
+    now = now or timezone.now()
+    stale_before = now - timedelta(seconds=int(getattr(settings, "EMAIL_OUTBOX_CLAIM_SECONDS", 900)))
+    return EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_SENDING,
+        updated_at__lt=stale_before,
+    ).update(status=EmailOutbox.STATUS_PENDING, updated_at=now)
+
+
+def claim_outbox_batch(batch_size, now=None):
+    """
+    Move up to ``batch_size`` due Pending rows to Sending and return them.
+    Each claim is a conditional UPDATE, so of several workers polling the
+    outbox at once exactly one gets a given row.
+    """
+    now = now or timezone.now()
+    candidates = list(
+        EmailOutbox.objects
+        .filter(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at", "id")[:batch_size]
+    )
+    claimed = []
+    with transaction.atomic():
+        for item in candidates:
+            if EmailOutbox.objects.filter(pk=item.pk, status=EmailOutbox.STATUS_PENDING).update(
+                status=EmailOutbox.STATUS_SENDING,
+                updated_at=now,
+            ):
+                claimed.append(item)
+    return claimed
+
+
+def deliver_outbox_batch(batch_size=None, max_attempts=None):
+    # One SMTP connection per batch. Failed rows are rescheduled with
+    # exponential backoff until max_attempts, then left as Failed.
+    batch_size = batch_size or int(getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50))
+    max_attempts = max_attempts or int(getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+
+    now = timezone.now()
+    release_stale_claims(now)
+    items = claim_outbox_batch(batch_size, now)
+    if not items:
+        return 0, 0
+
+    sent = 0
+    failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        connection_error = None
+    except Exception as exc:
+        connection_error = f"{exc.__class__.__name__}: {exc}"
+
+    try:
+        for index, item in enumerate(items):
+            # Renew the claim on every row still waiting in this batch, so a
+            # batch of slow sends outlasting EMAIL_OUTBOX_CLAIM_SECONDS is not
+            # released as stale and sent again by another worker.
+            EmailOutbox.objects.filter(
+                pk__in=[pending.pk for pending in items[index:]],
+                status=EmailOutbox.STATUS_SENDING,
+            ).update(updated_at=timezone.now())
+            item.attempts += 1
+            error = connection_error
+            if error is None:
+                try:
+                    if _build_message(item, connection).send(fail_silently=False) > 0:
+                        item.status = EmailOutbox.STATUS_SENT
+                        item.sent_at = timezone.now()
+                        item.last_error = ""
+                    else:
+                        error = "Email backend returned 0 sent emails"
+                except Exception as exc:
+                    error = f"{exc.__class__.__name__}: {exc}"
+
+            if error is None:
+                sent += 1
+            else:
+                failed += 1
+                item.last_error = error
+                if item.attempts >= max_attempts:
+                    item.status = EmailOutbox.STATUS_FAILED
+                else:
+                    item.status = EmailOutbox.STATUS_PENDING
+                    item.next_attempt_at = timezone.now() + _retry_delay(item.attempts)
+
+            item.save(update_fields=["status", "attempts", "next_attempt_at", "sent_at", "last_error", "updated_at"])
+    finally:
+        if connection_error is None:
+            connection.close()
+
+    return sent, failed
+
+
+def queue_birthday_emails(households, day):
+    # households: {member: [(name, relation, age)]}. Keyed per member and day,
+    # so rerunning the job for the same date queues nothing new.
+    rows = []
+    for member, celebrants in households.items():
+        if not member.email_id:
+            continue
+        subject, text_message, html_message = build_birthday_email(member, celebrants, day)
+        rows.append(
+            EmailOutbox(
+                member=member,
+                kind=EmailOutbox.KIND_BIRTHDAY,
+                to_email=member.email_id,
+                subject=subject[:255],
+                text_body=text_message,
+                html_body=html_message,
+                dedupe_key=f"birthday:{member.member_no}:{day.isoformat()}",
+            )
+        )
+    existing = set(
+        EmailOutbox.objects.filter(dedupe_key__in=[row.dedupe_key for row in rows]).values_list("dedupe_key", flat=True)
+    )
+    rows = [row for row in rows if row.dedupe_key not in existing]
+    EmailOutbox.objects.bulk_create(rows, batch_size=200, ignore_conflicts=True)
+    return len(rows)
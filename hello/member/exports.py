@@ -0,0 +1,118 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import MemberDetail
+
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FORMATS = ("csv", "ndjson")
+
+MEMBER_EXPORT_FIELDS = (
+    "member_no",
+    "first_name",
+    "middle_name",
+    "surname",
+    "phone_no",
+    "email_id",
+    "gender",
+    "date_of_birth",
+    "age",
+    "occupation",
+    "country",
+    "state",
+    "city",
+    "residential_address",
+    "marital_status",
+    "education",
+    "username",
+    "status",
+    "approval_status",
+    "created_at",
+)
+DETAIL_EXPORT_FIELDS = (
+    "member_id",
+    "first_name",
+    "middle_name",
+    "surname",
+    "date_of_birth",
+    "age",
+    "gender",
+    "occupation",
+    "email_id",
+    "marital_status",
+    "education",
+)
+# Same layout import_members reads: family rows carry household_phone_no.
+CSV_EXPORT_COLUMNS = ("member_id",) + MEMBER_EXPORT_FIELDS + ("household_phone_no",)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_households(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    # iterator() with prefetch_related runs one details query per chunk, so
+    # memory stays bounded by chunk_size whatever the table size.
+    return (
+        queryset.select_related("country", "state", "city")
+        .prefetch_related(Prefetch("details", queryset=MemberDetail.objects.order_by("member_id")))
+        .order_by("member_no")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _member_row(member):
+    row = {name: getattr(member, name) for name in MEMBER_EXPORT_FIELDS if name not in ("country", "state", "city")}
+    row["country"] = member.country.name if member.country else None
+    row["state"] = member.state.name if member.state else None
+    row["city"] = member.city.name if member.city else None
+    return row
+
+
+def _detail_row(detail):
+    return {name: getattr(detail, name) for name in DETAIL_EXPORT_FIELDS}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def stream_households_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_EXPORT_COLUMNS)
+    for member in iter_households(queryset, chunk_size):
+        row = _member_row(member)
+        yield writer.writerow([_csv_value(row.get(name)) for name in CSV_EXPORT_COLUMNS])
+        for detail in member.details.all():
+            row = _detail_row(detail)
+            row["household_phone_no"] = member.phone_no
+            yield writer.writerow([_csv_value(row.get(name)) for name in CSV_EXPORT_COLUMNS])
+
+
+def stream_households_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    for member in iter_households(queryset, chunk_size):
+        row = _member_row(member)
+        row["details"] = [_detail_row(detail) for detail in member.details.all()]
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def households_export_response(queryset, fmt="csv", chunk_size=EXPORT_CHUNK_SIZE):
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+    if fmt == "ndjson":
+        response = StreamingHttpResponse(
+            stream_households_ndjson(queryset, chunk_size), content_type="application/x-ndjson"
+        )
+    else:
+        response = StreamingHttpResponse(stream_households_csv(queryset, chunk_size), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="members-{stamp}.{fmt}"'
+    return response
@@ -103,17 +103,20 @@ class MemberCreateForm(forms.ModelForm):
             "residential_address",
         ]
 
+    REQUIRED_FIELDS = ("email_id", "country", "state", "residential_address")
+    OPTIONAL_FIELDS = ("middle_name", "date_of_birth", "occupation", "city")
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields["middle_name"].required = False
-        self.fields["email_id"].required = True
-        self.fields["date_of_birth"].required = False
-        self.fields["occupation"].required = False
-        self.fields["country"].required = True
-        self.fields["state"].required = True
-        self.fields["city"].required = False
-        self.fields["residential_address"].required = True
+        self._apply_required_fields()
+        self._limit_location_choices()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        self._clean_location(cleaned_data)
+        return cleaned_data
 
+    def _limit_location_choices(self):
         self.fields["country"].queryset = Country.objects.all().order_by("name")
         self.fields["state"].queryset = State.objects.none()
         self.fields["city"].queryset = City.objects.none()
@@ -130,8 +133,7 @@ class MemberCreateForm(forms.ModelForm):
                 Q(state_id=state_id) | Q(state__isnull=True)
             )
 
-    def clean(self):
-        cleaned_data = super().clean()
+    def _clean_location(self, cleaned_data):
         country = cleaned_data.get("country")
         state = cleaned_data.get("state")
         city = cleaned_data.get("city")
@@ -145,7 +147,71 @@ class MemberCreateForm(forms.ModelForm):
         if city and state and city.state_id and city.state_id != state.id:
             self.add_error("city", "Selected city does not belong to selected state.")
 
-        return cleaned_data
+    def _apply_required_fields(self):
+        for name in self.REQUIRED_FIELDS:
+            self.fields[name].required = True
+        for name in self.OPTIONAL_FIELDS:
+            self.fields[name].required = False
+
+
+class MemberImportForm(MemberCreateForm):
+    """
+    MemberCreateForm rules for bulk imports. Locations arrive as names and are
+    resolved against a LocationSnapshot, and phone uniqueness is checked by
+    the importer per batch, so validating a row runs no queries.
+    """
+
+    country = forms.CharField(max_length=100)
+    state = forms.CharField(max_length=100)
+    city = forms.CharField(max_length=100, required=False)
+
+    class Meta(MemberCreateForm.Meta):
+        fields = [f for f in MemberCreateForm.Meta.fields if f not in ("country", "state", "city")]
+
+    def __init__(self, *args, snapshot, **kwargs):
+        self.snapshot = snapshot
+        super().__init__(*args, **kwargs)
+
+    def _limit_location_choices(self):
+        # Locations are plain names here, resolved in _clean_location().
+        pass
+
+    def _clean_location(self, cleaned_data):
+        country_name = cleaned_data.get("country")
+        state_name = cleaned_data.get("state")
+        city_name = cleaned_data.get("city")
+
+        country = self.snapshot.find_country(country_name) if country_name else None
+        if country_name and not country:
+            self.add_error("country", f"Unknown country '{country_name}'.")
+            return
+
+        state = self.snapshot.find_state(country["id"], state_name) if country and state_name else None
+        if country and state_name and not state:
+            self.add_error("state", "Selected state does not belong to selected country.")
+            return
+
+        city = None
+        if state and city_name:
+            city = self.snapshot.find_city(country["id"], state["id"], city_name)
+            if not city:
+                self.add_error("city", "Selected city does not belong to selected state.")
+
+        cleaned_data["country_id"] = country["id"] if country else None
+        cleaned_data["state_id"] = state["id"] if state else None
+        cleaned_data["city_id"] = city["id"] if city else None
+
+    def validate_unique(self):
+        pass
+
+    def save(self, commit=True):
+        member = super().save(commit=False)
+        member.country_id = self.cleaned_data["country_id"]
+        member.state_id = self.cleaned_data["state_id"]
+        member.city_id = self.cleaned_data["city_id"]
+        if commit:
+            member.save()
+        return member
 
 
 class MemberDetailForm(forms.ModelForm):
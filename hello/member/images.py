@@ -0,0 +1,133 @@
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, features
+
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, crop to fill)
+PROFILE_IMAGE_VARIANTS = {
+    "avatar": (96, 96, True),
+    "card": (320, 320, True),
+    "full": (1280, 1280, False),
+}
+ORIGINAL_MAX_SIZE = 2048
+VARIANT_FORMAT, VARIANT_EXTENSION = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == "WEBP":
+        image.save(buffer, fmt, quality=80, method=4)
+    else:
+        image.save(buffer, fmt, quality=85, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _load_rgb(file):
+    file.seek(0)
+    image = Image.open(file)
+    image.load()
+    # Apply the EXIF orientation before the metadata is dropped.
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _stored_paths(obj):
+    # The original and variants saved for obj before this save.
+    if obj._state.adding:
+        return []
+    stored = (
+        type(obj)._base_manager.filter(pk=obj.pk)
+        .values_list("profile_image", "profile_image_variants")
+        .first()
+    )
+    if stored is None:
+        return []
+    name, variants = stored
+    return [path for path in (name, *(variants or {}).values()) if path]
+
+
+def prepare_profile_image(obj):
+    """
+    Called from save(). A newly assigned, not yet stored profile_image is
+    re-encoded as a JPEG without EXIF, and its avatar/card/full variants are
+    written to storage and recorded in profile_image_variants. The files it
+    replaces are deleted by delete_replaced_profile_images() after the save.
+    """
+    field = obj.profile_image
+    if not field:
+        if obj.profile_image_variants:
+            obj._replaced_profile_images = _stored_paths(obj)
+        obj.profile_image_variants = {}
+        return
+    if field._committed:
+        return
+
+    obj._replaced_profile_images = _stored_paths(obj)
+    try:
+        image = _load_rgb(field.file)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("Could not process profile image %s: %s", field.name, exc)
+        obj.profile_image_variants = {}
+        return
+
+    storage = field.storage
+    stem = storage.get_valid_name(os.path.splitext(os.path.basename(field.name))[0] or "profile")
+    upload_dir = os.path.dirname(field.field.generate_filename(obj, f"{stem}.jpg"))
+
+    variants = {}
+    for name, (width, height, crop) in PROFILE_IMAGE_VARIANTS.items():
+        if crop:
+            resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+        variants[name] = storage.save(
+            f"{upload_dir}/variants/{stem}_{name}.{VARIANT_EXTENSION}",
+            ContentFile(_encode(resized, VARIANT_FORMAT)),
+        )
+
+    image.thumbnail((ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE), Image.Resampling.LANCZOS)
+    # Stored now under upload_to; the raw upload (with its EXIF) never is.
+    field.save(f"{stem}.jpg", ContentFile(_encode(image, "JPEG")), save=False)
+    obj.profile_image_variants = variants
+
+
+def delete_replaced_profile_images(obj):
+    """
+    Called from post_save. Deletes the files prepare_profile_image() found
+    replaced, once the transaction commits, so a rollback keeps them.
+    """
+    paths = obj.__dict__.pop("_replaced_profile_images", None)
+    if not paths:
+        return
+    storage = obj.profile_image.storage
+    current = {obj.profile_image.name, *(obj.profile_image_variants or {}).values()}
+    paths = [path for path in paths if path not in current]
+
+    def delete():
+        for path in paths:
+            try:
+                storage.delete(path)
+            except OSError as exc:
+                logger.warning("Could not delete replaced profile image %s: %s", path, exc)
+
+    transaction.on_commit(delete)
+
+
+def profile_image_variant_urls(obj):
+    variants = obj.profile_image_variants or {}
+    if not obj.profile_image or not variants:
+        return {}
+    storage = obj.profile_image.storage
+    return {name: storage.url(path) for name, path in variants.items() if name in PROFILE_IMAGE_VARIANTS}
@@ -0,0 +1,242 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import City, Country, State
+
+
+LOCATION_VERSION_KEY = "member:locations:version"
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_location_version():
+    version = cache.get(LOCATION_VERSION_KEY)
+    if version is None:
+        # Seed with a timestamp so a restarted process never reuses an ETag
+        # that a client may still hold from before the restart.
+        cache.add(LOCATION_VERSION_KEY, time.time_ns() // 1000, None)
+        version = cache.get(LOCATION_VERSION_KEY)
+    return version
+
+
+def bump_location_version():
+    # A fresh timestamp rather than cache.incr(): several backends' incr is a
+    # get/set that re-sets the key with the default timeout.
+    cache.set(LOCATION_VERSION_KEY, max(time.time_ns() // 1000, get_location_version() + 1), None)
+
+
+def schedule_location_version_bump():
+    transaction.on_commit(bump_location_version)
+
+
+def location_etag(request, *args, **kwargs):
+    return f"locations-{get_location_version()}"
+
+
+def normalize_name(value):
+    # Accent-folded, case-insensitive form used by the seed scripts to match
+    # geonames rows, e.g. "Bogotá" -> "bogota".
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return value.strip().lower()
+
+
+class LocationSnapshot:
+    """Read-only copy of the Country/State/City tables for one data version."""
+
+    def __init__(self, version, countries, states, cities):
+        self.version = version
+        self.countries = countries
+        self.states = states
+        self.cities = cities
+
+        self.country_by_id = {c["id"]: c for c in countries}
+        self.state_by_id = {st["id"]: st for st in states}
+        self.states_by_country = {}
+        for st in states:
+            self.states_by_country.setdefault(st["country_id"], []).append(st)
+        self.cities_by_country = {}
+        self.cities_by_state = {}
+        for city in cities:
+            self.cities_by_country.setdefault(city["country_id"], []).append(city)
+            if city["state_id"]:
+                self.cities_by_state.setdefault(city["state_id"], []).append(city)
+
+        # Sorted (normalized name, row) lists per search scope, built lazily.
+        self._prefix_indexes = {}
+        self._name_indexes = None
+
+    @classmethod
+    def load(cls, version):
+        countries = [
+            {"id": pk, "name": name}
+            for pk, name in Country.objects.order_by("name", "id").values_list("id", "name")
+        ]
+        country_names = {c["id"]: c["name"] for c in countries}
+
+        states = [
+            {
+                "id": pk,
+                "name": name,
+                "country_id": country_id,
+                "country_name": country_names.get(country_id),
+            }
+            for pk, name, country_id in (
+                State.objects.order_by("name", "id").values_list("id", "name", "country_id")
+            )
+        ]
+        state_names = {st["id"]: st["name"] for st in states}
+
+        cities = [
+            {
+                "id": pk,
+                "name": name,
+                "country_id": country_id,
+                "country_name": country_names.get(country_id),
+                "state_id": state_id,
+                "state_name": state_names.get(state_id) if state_id else None,
+            }
+            for pk, name, country_id, state_id in (
+                City.objects.order_by("name", "id").values_list("id", "name", "country_id", "state_id")
+            )
+        ]
+        return cls(version, countries, states, cities)
+
+    def _prefix_index(self, scope, rows):
+        index = self._prefix_indexes.get(scope)
+        if index is None:
+            pairs = sorted(
+                ((normalize_name(row["name"]), row) for row in rows),
+                key=lambda pair: (pair[0], pair[1]["id"]),
+            )
+            index = ([key for key, _ in pairs], [row for _, row in pairs])
+            self._prefix_indexes[scope] = index
+        return index
+
+    def _prefix_search(self, scope, rows, query, limit):
+        prefix = normalize_name(query)
+        if not prefix or limit <= 0:
+            return []
+
+        keys, items = self._prefix_index(scope, rows)
+        results = []
+        for pos in range(bisect_left(keys, prefix), len(keys)):
+            if len(results) >= limit or not keys[pos].startswith(prefix):
+                break
+            results.append(items[pos])
+        return results
+
+    def search_cities(self, query, country_id=None, state_id=None, limit=10):
+        if state_id:
+            return self._prefix_search(
+                ("city", "state", state_id), self.cities_by_state.get(state_id, []), query, limit
+            )
+        if country_id:
+            return self._prefix_search(
+                ("city", "country", country_id), self.cities_by_country.get(country_id, []), query, limit
+            )
+        return self._prefix_search(("city", "all", None), self.cities, query, limit)
+
+    def search_states(self, query, country_id=None, limit=10):
+        if country_id:
+            return self._prefix_search(
+                ("state", "country", country_id), self.states_by_country.get(country_id, []), query, limit
+            )
+        return self._prefix_search(("state", "all", None), self.states, query, limit)
+
+
+    def _name_index(self):
+        if self._name_indexes is None:
+            countries = {}
+            for country in self.countries:
+                countries.setdefault(normalize_name(country["name"]), country)
+            states = {}
+            for st in self.states:
+                states.setdefault((st["country_id"], normalize_name(st["name"])), st)
+            cities = {}
+            for city in self.cities:
+                cities.setdefault((city["country_id"], normalize_name(city["name"])), []).append(city)
+            self._name_indexes = (countries, states, cities)
+        return self._name_indexes
+
+    def find_country(self, name):
+        countries, _, _ = self._name_index()
+        return countries.get(normalize_name(name))
+
+    def find_state(self, country_id, name):
+        _, states, _ = self._name_index()
+        return states.get((country_id, normalize_name(name)))
+
+    def find_city(self, country_id, state_id, name):
+        # Same rule as the member forms: a city must be in the state, or be a
+        # stateless city of the country.
+        _, _, cities = self._name_index()
+        candidates = cities.get((country_id, normalize_name(name)), [])
+        for city in candidates:
+            if city["state_id"] == state_id:
+                return city
+        for city in candidates:
+            if not city["state_id"]:
+                return city
+        return None
+
+
+def build_country_node(country, states, cities):
+    # Index the country's states by id once so every city is attached in
+    # O(1); the whole tree is built in a single pass over states + cities.
+    state_nodes = {}
+    state_list = []
+    for st in states:
+        node = {"id": st["id"], "name": st["name"], "cities": []}
+        state_nodes[st["id"]] = node
+        state_list.append(node)
+
+    cities_without_state = []
+    for city in cities:
+        city_data = {"id": city["id"], "name": city["name"]}
+        if city["state_id"]:
+            node = state_nodes.get(city["state_id"])
+            if node is not None:
+                node["cities"].append(city_data)
+        else:
+            cities_without_state.append(city_data)
+
+    return {
+        "id": country["id"],
+        "name": country["name"],
+        "states": state_list,
+        "cities_without_state": cities_without_state,
+    }
+
+
+def iter_location_tree(snapshot, countries, state=None):
+    for country in countries:
+        if state is not None:
+            states = [state]
+            cities = snapshot.cities_by_state.get(state["id"], [])
+        else:
+            states = snapshot.states_by_country.get(country["id"], [])
+            cities = snapshot.cities_by_country.get(country["id"], [])
+        yield build_country_node(country, states, cities)
+
+
+def get_location_snapshot():
+    global _snapshot
+
+    version = get_location_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = LocationSnapshot.load(version)
+        return _snapshot
@@ -0,0 +1,47 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from member.models import Member, MemberDetail
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode stored profile images without EXIF and generate their avatar/card/full "
+        "variants. New uploads are processed on save; this backfills images uploaded before "
+        "variants existed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Also reprocess images that already have variants")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Rows read per batch")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        for model in (Member, MemberDetail):
+            qs = model.objects.exclude(profile_image="").exclude(profile_image__isnull=True)
+            if not options["force"]:
+                qs = qs.filter(profile_image_variants={})
+            processed = missing = 0
+            for obj in qs.order_by("pk").iterator(chunk_size=chunk_size):
+                old_name = obj.profile_image.name
+                try:
+                    with obj.profile_image.open("rb") as handle:
+                        content = handle.read()
+                except OSError:
+                    missing += 1
+                    self.stderr.write(f"{model.__name__} {obj.pk}: cannot read {old_name}")
+                    continue
+
+                obj.profile_image = ContentFile(content, name=os.path.basename(old_name))
+                obj.save(update_fields=["profile_image", "updated_at"])
+                # save() deletes the replaced original, which still carried EXIF.
+                if obj.profile_image_variants:
+                    processed += 1
+                else:
+                    self.stderr.write(f"{model.__name__} {obj.pk}: {old_name} is not a readable image")
+
+            self.stdout.write(
+                self.style.SUCCESS(f"{model.__name__}: processed {processed} image(s), {missing} missing file(s)")
+            )
@@ -0,0 +1,238 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from member.forms import MemberDetailForm, MemberImportForm
+from member.locations import get_location_snapshot
+from member.models import DemographicsSnapshot, Member, MemberDetail, MemberStats, sync_birthday_fields
+
+
+HOUSEHOLD_FIELD = "household_phone_no"
+
+
+def _detail_form(record):
+    form = MemberDetailForm(record)
+    # Age may be left out when date_of_birth is given; checked after save(commit=False).
+    form.fields["age"].required = False
+    return form
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream members (and their MemberDetail family rows) from CSV or NDJSON into the "
+        "database in bulk_create batches. Rows with a household_phone_no column are family "
+        "members of that member; NDJSON members may also embed a 'details' list. Rejected "
+        "rows are written to a reject file with their errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument("--format", choices=("csv", "ndjson"), help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=500, help="Members inserted per bulk_create")
+        parser.add_argument("--reject-file", help="Defaults to <path>.rejects.ndjson")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; nothing is written to the database")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+        fmt = options["format"] or ("ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "csv")
+        reject_path = Path(options["reject_file"] or f"{path}.rejects.ndjson")
+        batch_size = max(1, options["batch_size"])
+
+        self.dry_run = options["dry_run"]
+        self.snapshot = get_location_snapshot()
+        self.seen_phones = set()
+        self.imported_members = 0
+        self.imported_details = 0
+        self.rejected = 0
+
+        started = time.perf_counter()
+        with reject_path.open("w", encoding="utf-8") as self.reject_file:
+            batch = []
+            for line_no, record, error in self._read_records(path, fmt):
+                if error:
+                    self._reject(line_no, record, {"__all__": [error]})
+                    continue
+                item = self._validate(line_no, record)
+                if item is None:
+                    continue
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    self._flush(batch)
+                    batch = []
+            if batch:
+                self._flush(batch)
+
+        if not self.dry_run and (self.imported_members or self.imported_details):
+            # bulk_create skips the signals that keep the snapshot current.
+            DemographicsSnapshot.rebuild()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Validated' if self.dry_run else 'Imported'} {self.imported_members} member(s) and "
+                f"{self.imported_details} family member(s) in {elapsed:.1f}s; rejected {self.rejected}"
+            )
+        )
+        if self.rejected:
+            self.stdout.write(f"Rejected rows written to {reject_path}")
+
+    def _read_records(self, path, fmt):
+        with path.open(encoding="utf-8-sig", newline="") as handle:
+            if fmt == "csv":
+                # Header is line 1, so data rows start at line 2.
+                for line_no, row in enumerate(csv.DictReader(handle), start=2):
+                    yield line_no, {k.strip(): (v or "").strip() for k, v in row.items() if k}, None
+                return
+
+            for line_no, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    yield line_no, {"raw": line}, f"Invalid JSON: {exc}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line_no, {"raw": line}, "Each line must be a JSON object"
+                    continue
+                yield line_no, record, None
+
+    def _validate(self, line_no, record):
+        household_phone = str(record.get(HOUSEHOLD_FIELD) or "").strip()
+        if household_phone:
+            detail, errors = self._build_detail(record)
+            if errors:
+                self._reject(line_no, record, errors)
+                return None
+            return {"line": line_no, "record": record, "member": None, "details": [detail], "household": household_phone}
+
+        data = {k: v for k, v in record.items() if k != "details"}
+        form = MemberImportForm(data, snapshot=self.snapshot)
+        if not form.is_valid():
+            self._reject(line_no, record, form.errors.get_json_data())
+            return None
+
+        phone = form.cleaned_data["phone_no"]
+        if phone in self.seen_phones:
+            self._reject(line_no, record, {"phone_no": ["Duplicate phone_no in import file."]})
+            return None
+
+        details = []
+        for index, detail_record in enumerate(record.get("details") or []):
+            detail, errors = self._build_detail(detail_record if isinstance(detail_record, dict) else {})
+            if errors:
+                self._reject(line_no, record, {f"details[{index}]": errors})
+                return None
+            details.append(detail)
+
+        self.seen_phones.add(phone)
+        member = form.save(commit=False)
+        sync_birthday_fields(member)
+        member.status = "Inactive"
+        member.approval_status = "Pending"
+        member.username = None
+        member.password = None
+        return {"line": line_no, "record": record, "member": member, "details": details, "household": None}
+
+    def _build_detail(self, record):
+        form = _detail_form(record)
+        if not form.is_valid():
+            return None, form.errors.get_json_data()
+        detail = form.save(commit=False)
+        sync_birthday_fields(detail)
+        if detail.age is None:
+            return None, {"age": [{"message": "Provide age or date_of_birth.", "code": "required"}]}
+        return detail, None
+
+    def _flush(self, batch):
+        members = [item for item in batch if item["member"] is not None]
+        households = [item for item in batch if item["household"]]
+
+        # One query per batch for phones that already exist in the database.
+        taken = set(
+            Member.objects.filter(phone_no__in=[item["member"].phone_no for item in members])
+            .values_list("phone_no", flat=True)
+        )
+        accepted = []
+        for item in members:
+            if item["member"].phone_no in taken:
+                self._reject(item["line"], item["record"], {"phone_no": ["Member with this Phone no already exists."]})
+            else:
+                accepted.append(item)
+        batch_phones = {item["member"].phone_no for item in accepted}
+
+        existing_parents = dict(
+            Member.objects.filter(
+                phone_no__in={item["household"] for item in households} - batch_phones
+            ).values_list("phone_no", "member_no")
+        )
+        linked = []
+        for item in households:
+            if item["household"] in batch_phones or item["household"] in existing_parents:
+                linked.append(item)
+            else:
+                self._reject(item["line"], item["record"], {HOUSEHOLD_FIELD: ["No member with this phone_no."]})
+
+        if self.dry_run:
+            self.imported_members += len(accepted)
+            self.imported_details += sum(len(item["details"]) for item in accepted + linked)
+            return
+
+        try:
+            with transaction.atomic():
+                self._insert(accepted, linked, dict(existing_parents))
+        except IntegrityError:
+            # Lost a race on a unique phone_no; fall back to row-by-row inserts
+            # so one conflicting row does not reject the whole batch. Members
+            # come first so in-batch households can still be linked.
+            parents = dict(existing_parents)
+            for item in accepted + linked:
+                if item["member"] is not None:
+                    item["member"].pk = None
+                for detail in item["details"]:
+                    detail.pk = None
+                try:
+                    with transaction.atomic():
+                        if item["member"] is not None:
+                            self._insert([item], [], parents)
+                        else:
+                            self._insert([], [item], parents)
+                except IntegrityError as exc:
+                    self._reject(item["line"], item["record"], {"__all__": [str(exc)]})
+
+    def _insert(self, accepted, linked, parents):
+        Member.objects.bulk_create([item["member"] for item in accepted])
+        member_nos = dict(parents)
+        member_nos.update({item["member"].phone_no: item["member"].member_no for item in accepted})
+
+        details = []
+        for item in accepted:
+            for detail in item["details"]:
+                detail.member_no_id = item["member"].member_no
+                details.append(detail)
+        for item in linked:
+            parent = member_nos.get(item["household"])
+            if parent is None:
+                raise IntegrityError(f"Household member {item['household']} was not imported")
+            for detail in item["details"]:
+                detail.member_no_id = parent
+                details.append(detail)
+        MemberDetail.objects.bulk_create(details)
+
+        # bulk_create skips the post_save handlers that maintain MemberStats.
+        MemberStats.rebuild({detail.member_no_id for detail in details} | {item["member"].member_no for item in accepted})
+
+        parents.update(member_nos)
+        self.imported_members += len(accepted)
+        self.imported_details += len(details)
+
+    def _reject(self, line_no, record, errors):
+        self.rejected += 1
+        self.reject_file.write(json.dumps({"line": line_no, "errors": errors, "record": record}, default=str) + "\n")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from member.models import DemographicsSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the DemographicsSnapshot table from Member and MemberDetail. Run it once to "
+        "build the table; saves then keep it current incrementally. Run it nightly as well so "
+        "age bands follow birthdays."
+    )
+
+    def handle(self, *args, **options):
+        rows = DemographicsSnapshot.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Demographics snapshot rebuilt with {rows} bucket(s)"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from member.models import MemberStats
+
+
+class Command(BaseCommand):
+    help = "Recompute MemberStats counters and latest rows from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--member-no",
+            type=int,
+            action="append",
+            dest="member_nos",
+            help="Only rebuild these members (repeatable); defaults to every member",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows upserted per query")
+
+    def handle(self, *args, **options):
+        rebuilt = MemberStats.rebuild(options["member_nos"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rebuilt} member(s)"))
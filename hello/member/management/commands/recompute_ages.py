@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from member.middleware import invalidate_member_cache
+from member.models import DemographicsSnapshot, Member, MemberDetail, birthday_q, calculate_age
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute stored Member/MemberDetail ages for everyone whose birthday falls in a date "
+        "window (default: the last 7 days through today), using the birth_month/birth_day index "
+        "and chunked bulk_update. Only rows whose age changed are written, so reruns are no-ops "
+        "and a wide window catches up after missed runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Compute ages as of this date (YYYY-MM-DD); defaults to today")
+        parser.add_argument("--days", type=int, default=7, help="Birthdays in the N days up to --date are checked")
+        parser.add_argument("--all", action="store_true", help="Check every row with a date_of_birth")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows read and updated per batch")
+        parser.add_argument(
+            "--skip-demographics",
+            action="store_true",
+            help="Do not rebuild the demographics snapshot afterwards",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options["date"]) if options["date"] else date.today()
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD")
+        if options["days"] < 0:
+            raise CommandError("--days must be 0 or more")
+
+        if options["all"] or options["days"] >= 365:
+            window = None
+        else:
+            window = birthday_q(today - timedelta(days=options["days"]), today)
+
+        chunk_size = max(1, options["chunk_size"])
+        member_nos = self._recompute(Member, window, today, chunk_size)
+        detail_ids = self._recompute(MemberDetail, window, today, chunk_size)
+
+        # bulk_update skips post_save; evict cached session members by hand.
+        invalidate_member_cache(*member_nos)
+        if (member_nos or detail_ids) and not options["skip_demographics"]:
+            DemographicsSnapshot.rebuild(today=today)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated ages as of {today}: {len(member_nos)} member(s), {len(detail_ids)} family member(s)"
+            )
+        )
+
+    def _recompute(self, model, window, today, chunk_size):
+        qs = model.objects.filter(date_of_birth__isnull=False)
+        if window is not None:
+            qs = qs.filter(window)
+        qs = qs.only("pk", "date_of_birth", "age").order_by("pk")
+
+        changed_pks = []
+        pending = []
+        for obj in qs.iterator(chunk_size=chunk_size):
+            age = calculate_age(obj.date_of_birth, today)
+            if obj.age != age:
+                obj.age = age
+                pending.append(obj)
+            if len(pending) >= chunk_size:
+                changed_pks.extend(self._flush(model, pending))
+                pending = []
+        if pending:
+            changed_pks.extend(self._flush(model, pending))
+        return changed_pks
+
+    def _flush(self, model, objs):
+        with transaction.atomic():
+            model.objects.bulk_update(objs, ["age"])
+        return [obj.pk for obj in objs]
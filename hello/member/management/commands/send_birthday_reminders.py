@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from member.birthdays import birthdays_on, group_by_household
+from member.emails import queue_birthday_emails
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue one birthday reminder per household for members and family members born on "
+        "the given day. Safe to rerun: each household is queued at most once per date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Day to send reminders for (YYYY-MM-DD); defaults to today")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["date"]) if options["date"] else date.today()
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD")
+
+        members, details = birthdays_on(day)
+        queued = queue_birthday_emails(group_by_household(members, details, day), day)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{day}: {len(members)} member and {len(details)} family birthday(s); queued {queued} reminder(s)"
+            )
+        )
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from member.emails import deliver_outbox_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver pending EmailOutbox rows, reusing one SMTP connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=int(getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50)),
+            help="Emails sent per SMTP connection",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=int(getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5)),
+            help="Attempts before an email is marked Failed",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox instead of exiting")
+        parser.add_argument("--interval", type=int, default=10, help="Seconds to sleep between polls with --loop")
+
+    def handle(self, *args, **options):
+        total_sent = 0
+        total_failed = 0
+        while True:
+            sent, failed = deliver_outbox_batch(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Batch delivered: sent={sent} failed={failed}")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: sent={total_sent} failed={total_failed}"))
@@ -1,4 +1,54 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
+
+from .models import Member
+
+
+MEMBER_CACHE_KEY = "member:session:{member_no}"
+
+
+def member_cache_key(member_no):
+    return MEMBER_CACHE_KEY.format(member_no=member_no)
+
+
+def invalidate_member_cache(*member_nos):
+    keys = [member_cache_key(member_no) for member_no in member_nos if member_no]
+    if keys:
+        cache.delete_many(keys)
+
+
+def _load_member(member_no):
+    timeout = int(getattr(settings, "MEMBER_CACHE_TIMEOUT", 0) or 0)
+    if timeout > 0:
+        member = cache.get(member_cache_key(member_no))
+        if member is not None:
+            return member
+
+    member = Member.objects.filter(member_no=member_no).first()
+    if member and timeout > 0:
+        cache.set(member_cache_key(member_no), member, timeout)
+    return member
+
+
+def get_logged_in_member(request):
+    # Resolved at most once per request; every app and the sidebar context
+    # processor share the same instance through request._cached_member.
+    if not hasattr(request, "_cached_member"):
+        member_no = request.session.get("member_no") if hasattr(request, "session") else None
+        request._cached_member = _load_member(member_no) if member_no else None
+    return request._cached_member
+
+
+class CurrentMemberMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.member = SimpleLazyObject(lambda: get_logged_in_member(request))
+        return self.get_response(request)
+
 
 class MemberAuthMiddleware:
     def __init__(self, get_response):
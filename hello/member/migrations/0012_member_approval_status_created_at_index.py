@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0011_emailoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['approval_status', 'created_at'], name='member_memb_approva_828964_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donation', '0004_donationsubject_is_default'),
+        ('marketplace', '0007_alter_bnsmodel_status'),
+        ('member', '0012_member_approval_status_created_at_index'),
+        ('news', '0006_alter_news_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberStats',
+            fields=[
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='member.member')),
+                ('detail_count', models.PositiveIntegerField(default=0)),
+                ('news_count', models.PositiveIntegerField(default=0)),
+                ('listing_count', models.PositiveIntegerField(default=0)),
+                ('donation_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('latest_detail', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='member.memberdetail')),
+                ('latest_donation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='donation.donation')),
+                ('latest_listing', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='marketplace.bnsmodel')),
+                ('latest_news', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='news.news')),
+            ],
+            options={
+                'verbose_name': 'Member Stats',
+                'verbose_name_plural': 'Member Stats',
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations
+
+
+# The SQL is written out here rather than imported from member.search, so
+# later changes to that module cannot change what this migration did.
+# FTS5 is SQLite-only; other databases fall back to LIKE queries.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS member_search USING fts5(
+        first_name, middle_name, surname, phone_no, email_id, username, occupation, education, city,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_ai AFTER INSERT ON member_member BEGIN
+        INSERT INTO member_search(rowid, first_name, middle_name, surname, phone_no, email_id,
+                                  username, occupation, education, city)
+        VALUES (new.member_no, new.first_name, new.middle_name, new.surname, new.phone_no, new.email_id,
+                new.username, new.occupation, new.education,
+                (SELECT name FROM member_city WHERE id = new.city_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_au
+    AFTER UPDATE OF first_name, middle_name, surname, phone_no, email_id, username,
+                    occupation, education, city_id ON member_member BEGIN
+        DELETE FROM member_search WHERE rowid = old.member_no;
+        INSERT INTO member_search(rowid, first_name, middle_name, surname, phone_no, email_id,
+                                  username, occupation, education, city)
+        VALUES (new.member_no, new.first_name, new.middle_name, new.surname, new.phone_no, new.email_id,
+                new.username, new.occupation, new.education,
+                (SELECT name FROM member_city WHERE id = new.city_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_ad AFTER DELETE ON member_member BEGIN
+        DELETE FROM member_search WHERE rowid = old.member_no;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_city_au AFTER UPDATE OF name ON member_city BEGIN
+        UPDATE member_search SET city = new.name
+        WHERE rowid IN (SELECT member_no FROM member_member WHERE city_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO member_search(rowid, first_name, middle_name, surname, phone_no, email_id,
+                              username, occupation, education, city)
+    SELECT m.member_no, m.first_name, m.middle_name, m.surname, m.phone_no, m.email_id,
+           m.username, m.occupation, m.education, c.name
+    FROM member_member m LEFT JOIN member_city c ON c.id = m.city_id
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS member_search_city_au",
+    "DROP TRIGGER IF EXISTS member_search_ad",
+    "DROP TRIGGER IF EXISTS member_search_au",
+    "DROP TRIGGER IF EXISTS member_search_ai",
+    "DROP TABLE IF EXISTS member_search",
+]
+
+
+def _execute_on_sqlite(schema_editor, statements):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    _execute_on_sqlite(schema_editor, CREATE_SQL)
+
+
+def backwards(apps, schema_editor):
+    _execute_on_sqlite(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0013_memberstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0014_member_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemographicsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('population', models.CharField(choices=[('member', 'Members'), ('detail', 'Family members')], max_length=10)),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('age_band', 'Age band'), ('gender', 'Gender'), ('marital_status', 'Marital status'), ('occupation', 'Occupation'), ('city', 'City')], max_length=20)),
+                ('bucket', models.CharField(max_length=120)),
+                ('label', models.CharField(blank=True, max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['population', 'dimension', '-count', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('population', 'dimension', 'bucket'), name='member_demographics_bucket_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def backfill_birthdays(apps, schema_editor):
+    for model_name in ("Member", "MemberDetail"):
+        apps.get_model("member", model_name).objects.filter(date_of_birth__isnull=False).update(
+            birth_month=ExtractMonth("date_of_birth"),
+            birth_day=ExtractDay("date_of_birth"),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0015_demographicssnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='birth_day',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='birth_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='memberdetail',
+            name='birth_day',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='memberdetail',
+            name='birth_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['birth_month', 'birth_day'], name='member_memb_birth_m_b23e29_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='memberdetail',
+            index=models.Index(fields=['birth_month', 'birth_day'], name='member_memb_birth_m_00255d_idx'),
+        ),
+        migrations.RunPython(backfill_birthdays, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0016_birthday_month_day'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='dedupe_key',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='kind',
+            field=models.CharField(choices=[('approval', 'Approval'), ('request_received', 'Request Received'), ('birthday', 'Birthday Reminder')], max_length=30),
+        ),
+        migrations.AddConstraint(
+            model_name='emailoutbox',
+            constraint=models.UniqueConstraint(condition=models.Q(('dedupe_key', ''), _negated=True), fields=('dedupe_key',), name='member_emailoutbox_dedupe_key_unique'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+from django.db import migrations, models
+
+
+# member_member's search triggers (0014), written out so that later edits to
+# member.search cannot change this migration. Only the triggers block the
+# table rebuild; the member_search table and its rows are kept.
+CREATE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_ai AFTER INSERT ON member_member BEGIN
+        INSERT INTO member_search(rowid, first_name, middle_name, surname, phone_no, email_id,
+                                  username, occupation, education, city)
+        VALUES (new.member_no, new.first_name, new.middle_name, new.surname, new.phone_no, new.email_id,
+                new.username, new.occupation, new.education,
+                (SELECT name FROM member_city WHERE id = new.city_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_au
+    AFTER UPDATE OF first_name, middle_name, surname, phone_no, email_id, username,
+                    occupation, education, city_id ON member_member BEGIN
+        DELETE FROM member_search WHERE rowid = old.member_no;
+        INSERT INTO member_search(rowid, first_name, middle_name, surname, phone_no, email_id,
+                                  username, occupation, education, city)
+        VALUES (new.member_no, new.first_name, new.middle_name, new.surname, new.phone_no, new.email_id,
+                new.username, new.occupation, new.education,
+                (SELECT name FROM member_city WHERE id = new.city_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_ad AFTER DELETE ON member_member BEGIN
+        DELETE FROM member_search WHERE rowid = old.member_no;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS member_search_city_au AFTER UPDATE OF name ON member_city BEGIN
+        UPDATE member_search SET city = new.name
+        WHERE rowid IN (SELECT member_no FROM member_member WHERE city_id = new.id);
+    END
+    """,
+]
+
+DROP_TRIGGERS_SQL = [
+    "DROP TRIGGER IF EXISTS member_search_city_au",
+    "DROP TRIGGER IF EXISTS member_search_ad",
+    "DROP TRIGGER IF EXISTS member_search_au",
+    "DROP TRIGGER IF EXISTS member_search_ai",
+]
+
+
+def _execute_on_sqlite(schema_editor, statements):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_triggers(apps, schema_editor):
+    _execute_on_sqlite(schema_editor, DROP_TRIGGERS_SQL)
+
+
+def create_search_triggers(apps, schema_editor):
+    _execute_on_sqlite(schema_editor, CREATE_TRIGGERS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0017_emailoutbox_dedupe_key'),
+    ]
+
+    operations = [
+        # SQLite rebuilds member_member to add a column with a default; the
+        # search triggers would block the rename, so they are recreated after.
+        migrations.RunPython(drop_search_triggers, create_search_triggers),
+        migrations.AddField(
+            model_name='member',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='memberdetail',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
@@ -1,15 +1,66 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, check_password, make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
+import calendar
 import secrets
-import string
 import re
 
+from .images import prepare_profile_image
+
 
 User = get_user_model()
 
+USERNAME_ALLOCATION_ATTEMPTS = 5
+
+
+def calculate_age(dob, today=None):
+    if not dob:
+        return None
+    today = today or date.today()
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+def birthday_q(start, end):
+    """
+    Q matching rows whose birthday falls between start and end inclusive,
+    using the (birth_month, birth_day) index. Feb 29 birthdays count on
+    Mar 1 in non-leap years.
+    """
+    days = {}
+    current = start
+    while current <= end and len(days) < 366:
+        days.setdefault(current.month, set()).add(current.day)
+        if current.month == 3 and current.day == 1 and not calendar.isleap(current.year):
+            days.setdefault(2, set()).add(29)
+        current += timedelta(days=1)
+
+    condition = Q(pk__in=[])
+    for month, month_days in sorted(days.items()):
+        condition |= Q(birth_month=month, birth_day__in=sorted(month_days))
+    return condition
+
+
+def sync_birthday_fields(obj):
+    # Keeps the indexed birth_month/birth_day columns, and age, derived from
+    # date_of_birth. bulk_create() callers must call this themselves.
+    dob = obj._meta.get_field("date_of_birth").to_python(obj.date_of_birth)
+    obj.birth_month = dob.month if dob else None
+    obj.birth_day = dob.day if dob else None
+    if dob:
+        obj.age = calculate_age(dob)
+
+
+def _prepare_profile_image(obj, save_kwargs):
+    prepare_profile_image(obj)
+    update_fields = save_kwargs.get("update_fields")
+    if update_fields is not None and "profile_image" in update_fields:
+        save_kwargs["update_fields"] = {*update_fields, "profile_image_variants"}
+
 
 class Country(models.Model):
     name = models.CharField(max_length=120, unique=True)
@@ -55,6 +106,11 @@ class City(models.Model):
 
 
 class Member(models.Model):
+    # On SQLite, triggers on this table keep the member_search FTS index in
+    # sync (migration 0014). A migration that makes SQLite rebuild the table
+    # (e.g. adding a column with a default, or altering one) fails while they
+    # exist: drop the triggers before such operations and recreate them after,
+    # as 0018_profile_image_variants does.
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     member_no = models.AutoField(primary_key=True)
     first_name = models.CharField(max_length=50)
@@ -63,6 +119,8 @@ class Member(models.Model):
     phone_no = models.CharField(max_length=20, unique=True)
     date_of_birth = models.DateField(null=True, blank=True)
     age = models.PositiveIntegerField(blank=True, null=True)
+    birth_month = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    birth_day = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
 
     GENDER_CHOICES = [
         ("M", "Male"),
@@ -96,6 +154,7 @@ class Member(models.Model):
     )
     residential_address = models.TextField(blank=True, null=True)
     profile_image = models.ImageField(upload_to="member/profile/", blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     MARITAL_STATUS_CHOICES = [
         ("single", "Single"),
@@ -152,39 +211,83 @@ class Member(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @classmethod
-    def generate_unique_username(cls, first_name, surname, phone_no=None):
+    class Meta:
+        indexes = [
+            models.Index(fields=["approval_status", "created_at"]),
+            models.Index(fields=["birth_month", "birth_day"]),
+        ]
+
+    @staticmethod
+    def _username_base(first_name, surname):
         base_first = (first_name or "").strip().lower()
         base_surname = (surname or "").strip().lower()
         base = f"{base_first}{base_surname}"
         base = re.sub(r"[^a-z0-9]", "", base)
-        if not base:
-            base = "member"
+        return base or "member"
+
+    @classmethod
+    def _taken_usernames(cls, bases):
+        # Every candidate is `base` followed by digits, and ":" sorts right
+        # after "9", so a range scan on the unique username index returns
+        # all of them in one query per chunk of bases.
+        bases = sorted(set(bases))
+        taken = set()
+        for start in range(0, len(bases), 100):
+            condition = Q()
+            for base in bases[start:start + 100]:
+                condition |= Q(username__gte=base, username__lt=f"{base}:")
+            taken.update(cls.objects.filter(condition).values_list("username", flat=True))
+        return taken
 
+    @staticmethod
+    def _next_free_username(base, taken):
         username = base
         counter = 1
-        while cls.objects.filter(username=username).exists():
+        while username in taken:
             username = f"{base}{counter}"
             counter += 1
         return username
 
-    @staticmethod
-    def generate_temp_password(length=10):
-        alphabet = string.ascii_letters + string.digits + "@#$%"
-        return "".join(secrets.choice(alphabet) for _ in range(length))
+    @classmethod
+    def generate_unique_username(cls, first_name, surname, phone_no=None):
+        base = cls._username_base(first_name, surname)
+        return cls._next_free_username(base, cls._taken_usernames([base]))
 
-    def approve(self, approver=None):
-        if not self.username:
-            self.username = self.generate_unique_username(self.first_name, self.surname, self.phone_no)
+    @classmethod
+    def allocate_usernames(cls, members):
+        members = [m for m in members if not m.username]
+        bases = {m.pk: cls._username_base(m.first_name, m.surname) for m in members}
+        taken = cls._taken_usernames(bases.values())
+        for member in members:
+            member.username = cls._next_free_username(bases[member.pk], taken)
+            taken.add(member.username)
+        return members
 
-        raw_password = self.generate_temp_password()
-        self.password = raw_password
+    def approve(self, approver=None):
+        # The member sets a real password through the reset link, so no
+        # temporary password is generated or hashed here.
+        self.password = make_password(None)
         self.status = "Active"
         self.approval_status = "Approved"
         self.approved_by = approver
         self.approved_at = timezone.now()
-        self.save()
-        return raw_password
+
+        generated_username = not self.username
+        for attempt in range(USERNAME_ALLOCATION_ATTEMPTS):
+            if generated_username:
+                self.username = self.generate_unique_username(self.first_name, self.surname, self.phone_no)
+            try:
+                with transaction.atomic():
+                    self.save()
+                break
+            except IntegrityError:
+                # A concurrent approval may have claimed the same username
+                # between allocation and insert; allocate again and retry.
+                username_taken = (
+                    Member.objects.filter(username=self.username).exclude(pk=self.pk).exists()
+                )
+                if not generated_username or not username_taken or attempt == USERNAME_ALLOCATION_ATTEMPTS - 1:
+                    raise
 
     def mark_not_approved(self, approver=None):
         self.status = "Inactive"
@@ -193,16 +296,95 @@ class Member(models.Model):
         self.approved_at = timezone.now()
         self.save(update_fields=["status", "approval_status", "approved_by", "approved_at", "updated_at"])
 
+    @classmethod
+    def bulk_approve(cls, member_nos, approver=None):
+        # Approves every listed member that is not approved yet with a
+        # fixed number of queries and returns the approved instances.
+        with transaction.atomic():
+            members = list(
+                cls.objects.select_for_update()
+                .filter(member_no__in=member_nos)
+                .exclude(approval_status="Approved")
+                .order_by("member_no")
+            )
+            if not members:
+                return []
+
+            for attempt in range(USERNAME_ALLOCATION_ATTEMPTS):
+                needs_username = cls.allocate_usernames(members)
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_update(needs_username, ["username"], batch_size=500)
+                    break
+                except IntegrityError:
+                    for member in needs_username:
+                        member.username = None
+                    if attempt == USERNAME_ALLOCATION_ATTEMPTS - 1:
+                        raise
+
+            now = timezone.now()
+            unusable_password = make_password(None)
+            cls.objects.filter(member_no__in=[m.member_no for m in members]).update(
+                password=unusable_password,
+                status="Active",
+                approval_status="Approved",
+                approved_by=approver,
+                approved_at=now,
+                updated_at=now,
+            )
+            for member in members:
+                member.password = unusable_password
+                member.status = "Active"
+                member.approval_status = "Approved"
+                member.approved_by = approver
+                member.approved_at = now
+                member.updated_at = now
+            cls._invalidate_cached(member.member_no for member in members)
+            return members
+
+    @classmethod
+    def bulk_mark_not_approved(cls, member_nos, approver=None):
+        member_nos = list(cls.objects.filter(member_no__in=member_nos).values_list("member_no", flat=True))
+        if member_nos:
+            now = timezone.now()
+            cls.objects.filter(member_no__in=member_nos).update(
+                status="Inactive",
+                approval_status="Not Approved",
+                approved_by=approver,
+                approved_at=now,
+                updated_at=now,
+            )
+            cls._invalidate_cached(member_nos)
+        return member_nos
+
+    @staticmethod
+    def _invalidate_cached(member_nos):
+        # queryset.update() skips post_save, so evict the member caches here.
+        from .middleware import invalidate_member_cache
+        from .profile_cache import invalidate_public_profile
+
+        member_nos = list(member_nos)
+
+        def evict():
+            invalidate_member_cache(*member_nos)
+            invalidate_public_profile(*member_nos)
+
+        transaction.on_commit(evict)
+
     def save(self, *args, **kwargs):
-        if self.password and not self.password.startswith("pbkdf2_"):
+        if self.password and not self.password.startswith(("pbkdf2_", UNUSABLE_PASSWORD_PREFIX)):
             self.password = make_password(self.password)
+        sync_birthday_fields(self)
+        _prepare_profile_image(self, kwargs)
         super().save(*args, **kwargs)
 
     def set_password(self, raw_password):
-        self.password = make_password(raw_password)
+        # Hash once and store the same encoded value on the linked User.
+        encoded = make_password(raw_password)
+        self.password = encoded
         self.save(update_fields=["password", "updated_at"])
         if self.user_id:
-            self.user.set_password(raw_password)
+            self.user.password = encoded
             self.user.save(update_fields=["password"])
 
     def check_password(self, raw_password):
@@ -225,6 +407,8 @@ class MemberDetail(models.Model):
     surname = models.CharField(max_length=50)
     date_of_birth = models.DateField(null=True, blank=True)
     age = models.PositiveIntegerField()
+    birth_month = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    birth_day = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
 
     GENDER_CHOICES = [
         ("M", "Male"),
@@ -236,6 +420,7 @@ class MemberDetail(models.Model):
     occupation = models.CharField(max_length=100, blank=True, null=True)
     email_id = models.EmailField(max_length=254, blank=True, null=True)
     profile_image = models.ImageField(upload_to="member/profile/", blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     MARITAL_STATUS_CHOICES = [
         ("single", "Single"),
@@ -268,6 +453,16 @@ class MemberDetail(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["birth_month", "birth_day"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        sync_birthday_fields(self)
+        _prepare_profile_image(self, kwargs)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Detail of {self.member_no}"
 
@@ -307,3 +502,423 @@ class MemberPasswordResetToken(models.Model):
         token = secrets.token_urlsafe(48)
         expires_at = timezone.now() + timedelta(minutes=ttl_minutes)
         return cls.objects.create(member=member, token=token, expires_at=expires_at)
+
+    @classmethod
+    def bulk_create_for_members(cls, members, ttl_minutes=30):
+        now = timezone.now()
+        member_nos = [m.member_no for m in members]
+        cls.objects.filter(member_id__in=member_nos, used_at__isnull=True).update(used_at=now)
+        expires_at = now + timedelta(minutes=ttl_minutes)
+        tokens = cls.objects.bulk_create(
+            [cls(member=m, token=secrets.token_urlsafe(48), expires_at=expires_at) for m in members],
+            batch_size=500,
+        )
+        return {token.member_id: token for token in tokens}
+
+
+class EmailOutbox(models.Model):
+    STATUS_PENDING = "Pending"
+    STATUS_SENDING = "Sending"
+    STATUS_SENT = "Sent"
+    STATUS_FAILED = "Failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    KIND_APPROVAL = "approval"
+    KIND_REQUEST_RECEIVED = "request_received"
+    KIND_BIRTHDAY = "birthday"
+    KIND_CHOICES = [
+        (KIND_APPROVAL, "Approval"),
+        (KIND_REQUEST_RECEIVED, "Request Received"),
+        (KIND_BIRTHDAY, "Birthday Reminder"),
+    ]
+
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.SET_NULL,
+        related_name="outbox_emails",
+        blank=True,
+        null=True,
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    to_email = models.EmailField(max_length=254)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True, default="")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default="")
+    # Set by scheduled jobs so a rerun for the same day cannot queue twice.
+    dedupe_key = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Email Outbox"
+        verbose_name_plural = "Email Outbox"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=~Q(dedupe_key=""),
+                name="member_emailoutbox_dedupe_key_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.to_email} ({self.status})"
+
+
+class MemberStats(models.Model):
+    """Denormalized activity counters and latest rows for one member."""
+
+    KINDS = ("detail", "news", "listing", "donation")
+
+    member = models.OneToOneField(
+        Member,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    detail_count = models.PositiveIntegerField(default=0)
+    news_count = models.PositiveIntegerField(default=0)
+    listing_count = models.PositiveIntegerField(default=0)
+    donation_count = models.PositiveIntegerField(default=0)
+    latest_detail = models.ForeignKey(
+        MemberDetail, on_delete=models.SET_NULL, related_name="+", blank=True, null=True
+    )
+    latest_news = models.ForeignKey(
+        "news.News", on_delete=models.SET_NULL, related_name="+", blank=True, null=True
+    )
+    latest_listing = models.ForeignKey(
+        "marketplace.BnsModel", on_delete=models.SET_NULL, related_name="+", blank=True, null=True
+    )
+    latest_donation = models.ForeignKey(
+        "donation.Donation", on_delete=models.SET_NULL, related_name="+", blank=True, null=True
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Member Stats"
+        verbose_name_plural = "Member Stats"
+
+    def __str__(self):
+        return f"Stats of {self.member_id}"
+
+    @staticmethod
+    def sources():
+        # kind -> (model, field pointing at the owning Member)
+        from donation.models import Donation
+        from marketplace.models import BnsModel
+        from news.models import News
+
+        return {
+            "detail": (MemberDetail, "member_no"),
+            "news": (News, "created_by"),
+            "listing": (BnsModel, "created_by"),
+            "donation": (Donation, "member"),
+        }
+
+    @classmethod
+    def annotate_activity(cls, queryset):
+        # Adds <kind>_count and latest_<kind>_id subqueries to a Member queryset.
+        annotations = {}
+        for kind, (model, owner_field) in cls.sources().items():
+            owned = model.objects.filter(**{owner_field: OuterRef("pk")}).order_by()
+            annotations[f"{kind}_count"] = Coalesce(
+                Subquery(
+                    owned.values(owner_field).annotate(total=Count("pk")).values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+            annotations[f"latest_{kind}_id"] = Subquery(
+                owned.order_by("-created_at", "-pk").values("pk")[:1]
+            )
+        return queryset.annotate(**annotations)
+
+    @classmethod
+    def rebuild(cls, member_nos=None, batch_size=1000):
+        members = Member.objects.order_by("pk")
+        if member_nos is not None:
+            members = members.filter(pk__in=list(member_nos))
+        fields = [f"{kind}_count" for kind in cls.KINDS] + [f"latest_{kind}_id" for kind in cls.KINDS]
+
+        rebuilt = 0
+        rows = []
+        for member in cls.annotate_activity(members.only("pk")).iterator(chunk_size=batch_size):
+            rows.append(cls(member_id=member.pk, **{name: getattr(member, name) for name in fields}))
+            if len(rows) >= batch_size:
+                rebuilt += cls._upsert(rows, fields)
+                rows = []
+        if rows:
+            rebuilt += cls._upsert(rows, fields)
+        return rebuilt
+
+    @classmethod
+    def _upsert(cls, rows, fields):
+        now = timezone.now()
+        for row in rows:
+            row.updated_at = now
+        cls.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["member"],
+            update_fields=[name.removesuffix("_id") for name in fields] + ["updated_at"],
+        )
+        return len(rows)
+
+    @classmethod
+    def record_created(cls, member_no, kind, obj_pk):
+        updated = cls.objects.filter(member_id=member_no).update(
+            **{
+                f"{kind}_count": F(f"{kind}_count") + 1,
+                f"latest_{kind}_id": obj_pk,
+                "updated_at": timezone.now(),
+            }
+        )
+        if not updated:
+            cls.rebuild([member_no])
+
+    @classmethod
+    def for_member(cls, member):
+        qs = cls.objects.select_related("latest_detail", "latest_news__category", "latest_listing")
+        stats = qs.filter(member_id=member.pk).first()
+        if stats is None:
+            # One annotated aggregate query, one upsert, then a single joined
+            # fetch of the referenced latest rows.
+            cls.rebuild([member.pk])
+            stats = qs.get(member_id=member.pk)
+        return stats
+
+
+AGE_BANDS = (
+    (0, "0-17"),
+    (18, "18-24"),
+    (25, "25-34"),
+    (35, "35-44"),
+    (45, "45-54"),
+    (55, "55-64"),
+    (65, "65+"),
+)
+UNKNOWN_BUCKET = "unknown"
+
+
+def age_band(dob, today=None):
+    age = calculate_age(dob, today)
+    if age is None:
+        return UNKNOWN_BUCKET
+    label = AGE_BANDS[0][1]
+    for minimum, band in AGE_BANDS:
+        if age >= minimum:
+            label = band
+    return label
+
+
+def _years_before(today, years):
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        # Feb 29 on a non-leap target year.
+        return today.replace(year=today.year - years, day=28)
+
+
+def age_band_expression(field, today=None):
+    # Bands computed in SQL from date_of_birth, so the stored age never matters:
+    # age >= N exactly when date_of_birth <= today minus N years.
+    today = today or date.today()
+    whens = [models.When(**{f"{field}__isnull": True}, then=models.Value(UNKNOWN_BUCKET))]
+    for (_, band), (next_minimum, _) in zip(AGE_BANDS, AGE_BANDS[1:]):
+        whens.append(models.When(**{f"{field}__gt": _years_before(today, next_minimum)}, then=models.Value(band)))
+    return models.Case(*whens, default=models.Value(AGE_BANDS[-1][1]), output_field=models.CharField())
+
+
+class DemographicsSnapshot(models.Model):
+    """Precomputed bucket counts for members and their family members."""
+
+    POPULATION_MEMBER = "member"
+    POPULATION_DETAIL = "detail"
+    POPULATION_CHOICES = [
+        (POPULATION_MEMBER, "Members"),
+        (POPULATION_DETAIL, "Family members"),
+    ]
+
+    DIMENSION_CHOICES = [
+        ("total", "Total"),
+        ("age_band", "Age band"),
+        ("gender", "Gender"),
+        ("marital_status", "Marital status"),
+        ("occupation", "Occupation"),
+        ("city", "City"),
+    ]
+
+    population = models.CharField(max_length=10, choices=POPULATION_CHOICES)
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    bucket = models.CharField(max_length=120)
+    label = models.CharField(max_length=200, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["population", "dimension", "bucket"],
+                name="member_demographics_bucket_unique",
+            ),
+        ]
+        ordering = ["population", "dimension", "-count", "bucket"]
+
+    def __str__(self):
+        return f"{self.population} {self.dimension}={self.bucket}: {self.count}"
+
+    @staticmethod
+    def _populations():
+        # population -> (queryset, lookup prefix for the household's city)
+        return {
+            DemographicsSnapshot.POPULATION_MEMBER: (Member.objects.all(), ""),
+            DemographicsSnapshot.POPULATION_DETAIL: (MemberDetail.objects.all(), "member_no__"),
+        }
+
+    @staticmethod
+    def _labels(dimension, bucket):
+        if bucket == UNKNOWN_BUCKET:
+            return "Unknown"
+        if dimension == "gender":
+            return dict(Member.GENDER_CHOICES).get(bucket, bucket)
+        if dimension == "marital_status":
+            return dict(Member.MARITAL_STATUS_CHOICES).get(bucket, bucket)
+        return bucket
+
+    @classmethod
+    def rebuild(cls, today=None):
+        # One GROUP BY per population and dimension, then an atomic swap.
+        from django.db.models.functions import Lower, Trim
+
+        today = today or date.today()
+        rows = {}
+
+        def add(population, dimension, bucket, label, count):
+            bucket = str(bucket) if bucket not in (None, "") else UNKNOWN_BUCKET
+            key = (population, dimension, bucket)
+            if key in rows:
+                rows[key].count += count
+            else:
+                rows[key] = cls(
+                    population=population,
+                    dimension=dimension,
+                    bucket=bucket,
+                    label=label if bucket != UNKNOWN_BUCKET else "Unknown",
+                    count=count,
+                )
+
+        for population, (qs, prefix) in cls._populations().items():
+            qs = qs.order_by()
+            add(population, "total", "all", "All", qs.count())
+            grouped = {
+                "age_band": age_band_expression("date_of_birth", today),
+                "gender": F("gender"),
+                "marital_status": F("marital_status"),
+                "occupation": Lower(Trim("occupation")),
+            }
+            for dimension, expression in grouped.items():
+                for value, count in qs.values(value=expression).annotate(n=Count("pk")).values_list("value", "n"):
+                    add(population, dimension, value, cls._labels(dimension, value), count)
+            city_rows = (
+                qs.values_list(f"{prefix}city_id", f"{prefix}city__name")
+                .annotate(n=Count("pk"))
+            )
+            for city_id, city_name, count in city_rows:
+                add(population, "city", city_id, city_name or "", count)
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows.values())
+        return len(rows)
+
+    DEMOGRAPHIC_FIELDS = ("date_of_birth", "gender", "marital_status", "occupation")
+
+    @classmethod
+    def buckets_for(cls, values, city_id=None, today=None):
+        """Bucket of every dimension for one row's DEMOGRAPHIC_FIELDS values."""
+        date_of_birth, gender, marital_status, occupation = values
+        occupation = (occupation or "").strip().lower()
+        return {
+            "total": "all",
+            "age_band": age_band(date_of_birth, today),
+            "gender": gender or UNKNOWN_BUCKET,
+            "marital_status": marital_status or UNKNOWN_BUCKET,
+            "occupation": occupation or UNKNOWN_BUCKET,
+            "city": str(city_id) if city_id else UNKNOWN_BUCKET,
+        }
+
+    @classmethod
+    def apply_changes(cls, population, old_buckets=None, new_buckets=None, weight=1):
+        """
+        Move one row (or ``weight`` rows) between buckets. Skipped until the
+        snapshot has been built once, so a partial snapshot never appears.
+        """
+        deltas = {}
+        for dimension in dict(cls.DIMENSION_CHOICES):
+            old = old_buckets.get(dimension) if old_buckets else None
+            new = new_buckets.get(dimension) if new_buckets else None
+            if old == new:
+                continue
+            if old is not None:
+                deltas[(dimension, old)] = deltas.get((dimension, old), 0) - weight
+            if new is not None:
+                deltas[(dimension, new)] = deltas.get((dimension, new), 0) + weight
+        # Saves that change no demographic field (set_password, status
+        # changes, ...) cost no query here.
+        if not deltas:
+            return
+        if not cls.objects.filter(population=population, dimension="total").exists():
+            return
+        cls._apply_deltas(population, deltas)
+
+    @classmethod
+    def add_rows(cls, population, bucket_sets):
+        """
+        Count several new rows at once, for bulk_create() paths that skip
+        the post_save handlers; each touched bucket is updated once.
+        """
+        deltas = {}
+        for buckets in bucket_sets:
+            for dimension, bucket in buckets.items():
+                deltas[(dimension, bucket)] = deltas.get((dimension, bucket), 0) + 1
+        if not deltas:
+            return
+        if not cls.objects.filter(population=population, dimension="total").exists():
+            return
+        cls._apply_deltas(population, deltas)
+
+    @classmethod
+    def _apply_deltas(cls, population, deltas):
+        with transaction.atomic():
+            for (dimension, bucket), delta in deltas.items():
+                rows = cls.objects.filter(population=population, dimension=dimension, bucket=bucket)
+                if delta < 0:
+                    rows.filter(count__gte=-delta).update(count=F("count") + delta, updated_at=timezone.now())
+                    if dimension != "total":
+                        # An emptied bucket goes away, as it would in a rebuild.
+                        rows.filter(count=0).delete()
+                elif not rows.update(count=F("count") + delta, updated_at=timezone.now()):
+                    if dimension == "city" and bucket != UNKNOWN_BUCKET:
+                        label = City.objects.filter(pk=bucket).values_list("name", flat=True).first() or ""
+                    else:
+                        label = cls._labels(dimension, bucket)
+                    cls.objects.get_or_create(
+                        population=population,
+                        dimension=dimension,
+                        bucket=bucket,
+                        defaults={"label": label, "count": delta},
+                    )
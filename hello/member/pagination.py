@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    # Opaque, URL-safe token holding the sort key of the last row served.
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, *types, nullable=()):
+    """
+    Decode a cursor made by encode_cursor() into values of ``types``. Only the
+    positions listed in ``nullable`` may be None. Raises InvalidCursor.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise InvalidCursor("Invalid cursor")
+
+    values = []
+    for position, (value, expected) in enumerate(zip(payload, types)):
+        if value is None:
+            if position not in nullable:
+                raise InvalidCursor("Invalid cursor")
+            values.append(None)
+        elif expected is datetime:
+            parsed = parse_datetime(value) if isinstance(value, str) else None
+            if parsed is None:
+                raise InvalidCursor("Invalid cursor")
+            values.append(parsed)
+        elif expected is int and isinstance(value, int) and not isinstance(value, bool):
+            values.append(value)
+        else:
+            raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def keyset_neighbours(queryset, obj, field="published_at"):
+    """
+    Return the rows just before and just after ``obj`` in ``queryset`` when it
+    is ordered by ``field`` descending (NULLs last), then ``-id``. Each side is
+    a single LIMIT 1 query that an index on (..., field, id) can seek into.
+    """
+    value = getattr(obj, field)
+    if value is None:
+        previous = (
+            queryset.filter(**{f"{field}__isnull": True, "id__gt": obj.id}).order_by("id").first()
+            or queryset.filter(**{f"{field}__isnull": False}).order_by(field, "id").first()
+        )
+        following = queryset.filter(**{f"{field}__isnull": True, "id__lt": obj.id}).order_by("-id").first()
+        return previous, following
+
+    # The inclusive bound lets the database seek straight to obj; the OR
+    # only decides ties on the same timestamp.
+    previous = (
+        queryset.filter(**{f"{field}__gte": value})
+        .filter(Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": obj.id}))
+        .order_by(field, "id")
+        .first()
+    )
+    following = (
+        queryset.filter(**{f"{field}__lte": value})
+        .filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": obj.id}))
+        .order_by(f"-{field}", "-id")
+        .first()
+        or queryset.filter(**{f"{field}__isnull": True}).order_by("-id").first()
+    )
+    return previous, following
+
+
+def keyset_page(queryset, cursor, page_size, field="published_at"):
+    """
+    One page of ``queryset`` ordered by ``field`` descending (NULLs last),
+    then ``-id``, starting after ``cursor`` (empty for the first page).
+    Returns ``(rows, next_cursor)``; no COUNT or OFFSET is run, so every page
+    costs the same however deep it is. Raises InvalidCursor.
+    """
+    value = last_id = None
+    if cursor:
+        # Rows without a date sort last, so a cursor can end on a NULL value.
+        value, last_id = decode_cursor(cursor, datetime, int, nullable=(0,))
+
+    rows = []
+    if not cursor or value is not None:
+        dated = queryset.filter(**{f"{field}__isnull": False})
+        if cursor:
+            # Same seekable bound as keyset_neighbours().
+            dated = dated.filter(**{f"{field}__lte": value}).filter(
+                Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": last_id})
+            )
+        rows = list(dated.order_by(F(field).desc(), "-id")[:page_size + 1])
+
+    if len(rows) <= page_size:
+        undated = queryset.filter(**{f"{field}__isnull": True})
+        if cursor and value is None:
+            undated = undated.filter(id__lt=last_id)
+        rows += list(undated.order_by("-id")[:page_size + 1 - len(rows)])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(getattr(rows[-1], field), rows[-1].id)
+    return rows, next_cursor
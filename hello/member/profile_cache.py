@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .images import profile_image_variant_urls
+
+
+PUBLIC_PROFILE_KEY = "member:public-profile:{member_no}"
+PUBLIC_PROFILE_USERNAME_KEY = "member:public-profile:username:{username}"
+
+
+def _timeout():
+    return int(getattr(settings, "PUBLIC_PROFILE_CACHE_TIMEOUT", 0) or 0)
+
+
+def public_profile_key(member_no):
+    return PUBLIC_PROFILE_KEY.format(member_no=member_no)
+
+
+def public_profile_username_key(username):
+    return PUBLIC_PROFILE_USERNAME_KEY.format(username=username)
+
+
+def public_profile_etag(member_no, updated_at, location_version):
+    stamp = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+    return f'"member-{member_no}-{stamp}-{location_version}"'
+
+
+def get_cached_public_profile(location_version, member_no=None, username=None):
+    if _timeout() <= 0:
+        return None
+    if member_no is None:
+        member_no = cache.get(public_profile_username_key(username))
+        if member_no is None:
+            return None
+
+    entry = cache.get(public_profile_key(member_no))
+    if entry is None or entry["location_version"] != location_version:
+        return None
+    # The username pointer is never evicted on rename; the entry carries the
+    # current username so a stale pointer simply misses.
+    if username is not None and entry["username"] != username:
+        return None
+    return entry
+
+
+def cache_public_profile(member, data, location_version):
+    entry = {
+        "member_no": member.member_no,
+        "username": member.username,
+        "location_version": location_version,
+        "etag": public_profile_etag(member.member_no, member.updated_at, location_version),
+        "last_modified": member.updated_at,
+        "profile_image_path": member.profile_image.url if member.profile_image else None,
+        "profile_image_variants": profile_image_variant_urls(member),
+        "data": data,
+    }
+    timeout = _timeout()
+    if timeout > 0:
+        values = {public_profile_key(member.member_no): entry}
+        if member.username:
+            values[public_profile_username_key(member.username)] = member.member_no
+        cache.set_many(values, timeout)
+    return entry
+
+
+def invalidate_public_profile(*member_nos):
+    keys = [public_profile_key(member_no) for member_no in member_nos if member_no]
+    if keys:
+        cache.delete_many(keys)
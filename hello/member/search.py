@@ -0,0 +1,100 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+MEMBER_SEARCH_TABLE = "member_search"
+MEMBER_SEARCH_COLUMNS = (
+    "first_name",
+    "middle_name",
+    "surname",
+    "phone_no",
+    "email_id",
+    "username",
+    "occupation",
+    "education",
+    "city",
+)
+# bm25() weights, in column order: names rank above contact and profile text.
+MEMBER_SEARCH_WEIGHTS = (10.0, 4.0, 10.0, 6.0, 3.0, 6.0, 2.0, 2.0, 3.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# The FTS5 table and the triggers on member_member/member_city that keep it
+# in sync (for save(), bulk_create() and update() alike) are created by
+# migration 0014_member_search_index, on SQLite only.
+
+def rebuild_member_search_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {MEMBER_SEARCH_TABLE}")
+        cursor.execute(
+            f"""
+            INSERT INTO {MEMBER_SEARCH_TABLE}(rowid, {", ".join(MEMBER_SEARCH_COLUMNS)})
+            SELECT m.member_no, m.first_name, m.middle_name, m.surname, m.phone_no, m.email_id,
+                   m.username, m.occupation, m.education, c.name
+            FROM member_member m LEFT JOIN member_city c ON c.id = m.city_id
+            """
+        )
+
+
+def search_available():
+    return connection.vendor == "sqlite"
+
+
+def build_match_query(text):
+    # Every word must match as a prefix; quoting each token keeps FTS5
+    # operators typed by users (AND, NEAR, "-", ":") from being interpreted.
+    tokens = _TOKEN_RE.findall(text or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_member_nos(text, limit=None, offset=0, approved_only=False):
+    """Return member_nos matching ``text``, best match first."""
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    sql = [
+        f"SELECT s.rowid FROM {MEMBER_SEARCH_TABLE} s",
+        "JOIN member_member m ON m.member_no = s.rowid" if approved_only else "",
+        f"WHERE {MEMBER_SEARCH_TABLE} MATCH %s",
+        "AND m.approval_status = 'Approved' AND m.status = 'Active'" if approved_only else "",
+        f"ORDER BY bm25({MEMBER_SEARCH_TABLE}, {', '.join(str(w) for w in MEMBER_SEARCH_WEIGHTS)}), s.rowid",
+    ]
+    params = [match]
+    if limit is not None:
+        sql.append("LIMIT %s OFFSET %s")
+        params.extend([limit, offset])
+
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(part for part in sql if part), params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def member_search_filter(text):
+    # Q usable on any Member queryset; the FTS lookup runs as a subquery.
+    match = build_match_query(text)
+    if not match:
+        return Q(pk__in=[])
+    return Q(pk__in=RawSQL(f"SELECT rowid FROM {MEMBER_SEARCH_TABLE} WHERE {MEMBER_SEARCH_TABLE} MATCH %s", [match]))
+
+
+def member_search_q(text):
+    # Fallback for databases without FTS5.
+    condition = Q()
+    for token in _TOKEN_RE.findall(text or ""):
+        condition &= (
+            Q(first_name__icontains=token)
+            | Q(middle_name__icontains=token)
+            | Q(surname__icontains=token)
+            | Q(phone_no__icontains=token)
+            | Q(email_id__icontains=token)
+            | Q(username__icontains=token)
+            | Q(occupation__icontains=token)
+            | Q(education__icontains=token)
+            | Q(city__name__icontains=token)
+        )
+    return condition
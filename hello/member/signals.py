@@ -0,0 +1,226 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .images import delete_replaced_profile_images
+from .locations import schedule_location_version_bump
+from .middleware import invalidate_member_cache
+from .models import City, Country, DemographicsSnapshot, Member, MemberDetail, MemberStats, State
+from .profile_cache import invalidate_public_profile
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def member_changed(sender, instance, **kwargs):
+    invalidate_member_cache(instance.member_no)
+    invalidate_public_profile(instance.member_no)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=MemberDetail)
+def profile_image_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        delete_replaced_profile_images(instance)
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def location_changed(sender, instance, **kwargs):
+    # Also retires cached public profiles, which are stamped with the version.
+    schedule_location_version_bump()
+
+
+# Activity counters. Sources are registered in MemberConfig.ready() once all
+# apps are loaded; bulk_create/update() paths must call MemberStats directly.
+
+def _owner_id(instance):
+    _, owner_field = MemberStats.sources()[instance._stats_kind]
+    return getattr(instance, f"{owner_field}_id")
+
+
+def activity_initialized(sender, instance, **kwargs):
+    # Read __dict__ so instances loaded with only()/defer() stay lazy.
+    _, owner_field = MemberStats.sources()[instance._stats_kind]
+    if instance.pk and f"{owner_field}_id" in instance.__dict__:
+        instance._stats_owner_id = instance.__dict__[f"{owner_field}_id"]
+
+
+def activity_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    # An instance loaded without its owner column captured no owner in
+    # post_init; read the stored one so a reassignment still moves the counts.
+    if raw or instance._state.adding or hasattr(instance, "_stats_owner_id"):
+        return
+    _, owner_field = MemberStats.sources()[instance._stats_kind]
+    if update_fields is not None and not {owner_field, f"{owner_field}_id"} & set(update_fields):
+        return
+    instance._stats_owner_id = (
+        sender._base_manager.filter(pk=instance.pk).values_list(f"{owner_field}_id", flat=True).first()
+    )
+
+
+def activity_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    owner_id = _owner_id(instance)
+    previous_owner_id = getattr(instance, "_stats_owner_id", owner_id)
+    if created:
+        if owner_id:
+            MemberStats.record_created(owner_id, instance._stats_kind, instance.pk)
+    elif owner_id != previous_owner_id:
+        MemberStats.rebuild([pk for pk in (previous_owner_id, owner_id) if pk])
+    instance._stats_owner_id = owner_id
+
+
+def activity_deleting(sender, instance, **kwargs):
+    # Resolve a deferred owner while the row can still be read.
+    instance._stats_owner_id = _owner_id(instance)
+
+
+def activity_deleted(sender, instance, **kwargs):
+    owner_id = getattr(instance, "_stats_owner_id", None)
+    if owner_id:
+        # Deferred so a cascade from deleting the member itself does not
+        # recreate its stats row.
+        transaction.on_commit(lambda: MemberStats.rebuild([owner_id]))
+
+
+def connect_activity_signals():
+    for kind, (model, _) in MemberStats.sources().items():
+        model._stats_kind = kind
+        uid = f"member_stats_{kind}"
+        post_init.connect(activity_initialized, sender=model, dispatch_uid=uid)
+        pre_save.connect(activity_saving, sender=model, dispatch_uid=uid)
+        post_save.connect(activity_saved, sender=model, dispatch_uid=uid)
+        pre_delete.connect(activity_deleting, sender=model, dispatch_uid=uid)
+        post_delete.connect(activity_deleted, sender=model, dispatch_uid=uid)
+
+
+# Demographics snapshot. The values a row was loaded with are kept on the
+# instance, so a save only moves the buckets that changed and a save that
+# changes none costs no query.
+
+def _household_city_id(member_no):
+    return Member.objects.filter(pk=member_no).values_list("city_id", flat=True).first()
+
+
+def _demographics_link(sender):
+    # Family members are counted in their household's city.
+    return "city" if sender is Member else "member_no"
+
+
+def _demographics_attnames(sender):
+    return (*DemographicsSnapshot.DEMOGRAPHIC_FIELDS, f"{_demographics_link(sender)}_id")
+
+
+def _demographic_values(instance):
+    values = [getattr(instance, name) for name in _demographics_attnames(type(instance))]
+    # date_of_birth may still hold the string it was assigned; bucket the date.
+    values[0] = instance._meta.get_field("date_of_birth").to_python(values[0])
+    return tuple(values)
+
+
+def _stored_demographics(sender, instance):
+    return sender.objects.filter(pk=instance.pk).values_list(*_demographics_attnames(sender)).first()
+
+
+def _saves_demographics(sender, update_fields):
+    if update_fields is None:
+        return True
+    link = _demographics_link(sender)
+    return bool({*DemographicsSnapshot.DEMOGRAPHIC_FIELDS, link, f"{link}_id"} & set(update_fields))
+
+
+@receiver(post_init, sender=Member)
+@receiver(post_init, sender=MemberDetail)
+def demographics_initialized(sender, instance, **kwargs):
+    # Read __dict__ so instances loaded with only()/defer() stay lazy.
+    if instance.pk and all(name in instance.__dict__ for name in _demographics_attnames(sender)):
+        instance._demographics = _demographic_values(instance)
+
+
+@receiver(pre_save, sender=Member)
+@receiver(pre_save, sender=MemberDetail)
+def demographics_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # An instance loaded with a demographic field deferred has no snapshot;
+    # read the stored values instead.
+    if raw or instance._state.adding or hasattr(instance, "_demographics"):
+        return
+    if _saves_demographics(sender, update_fields):
+        instance._demographics = _stored_demographics(sender, instance)
+
+
+@receiver(pre_delete, sender=Member)
+@receiver(pre_delete, sender=MemberDetail)
+def demographics_before_delete(sender, instance, **kwargs):
+    if not hasattr(instance, "_demographics"):
+        instance._demographics = _stored_demographics(sender, instance)
+
+
+@receiver(post_save, sender=Member)
+def member_demographics_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not _saves_demographics(sender, update_fields):
+        return
+    current = _demographic_values(instance)
+    previous = None if created else getattr(instance, "_demographics", None)
+    instance._demographics = current
+    if current == previous:
+        return
+    new_buckets = DemographicsSnapshot.buckets_for(current[:-1], current[-1])
+    if previous is None:
+        DemographicsSnapshot.apply_changes(DemographicsSnapshot.POPULATION_MEMBER, None, new_buckets)
+    else:
+        old_buckets = DemographicsSnapshot.buckets_for(previous[:-1], previous[-1])
+        DemographicsSnapshot.apply_changes(DemographicsSnapshot.POPULATION_MEMBER, old_buckets, new_buckets)
+        if previous[-1] != current[-1]:
+            household_size = MemberDetail.objects.filter(member_no=instance).count()
+            if household_size:
+                DemographicsSnapshot.apply_changes(
+                    DemographicsSnapshot.POPULATION_DETAIL,
+                    {"city": old_buckets["city"]},
+                    {"city": new_buckets["city"]},
+                    weight=household_size,
+                )
+
+
+@receiver(post_save, sender=MemberDetail)
+def detail_demographics_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not _saves_demographics(sender, update_fields):
+        return
+    current = _demographic_values(instance)
+    previous = None if created else getattr(instance, "_demographics", None)
+    instance._demographics = current
+    if current == previous:
+        return
+    city_id = _household_city_id(current[-1])
+    new_buckets = DemographicsSnapshot.buckets_for(current[:-1], city_id)
+    old_buckets = None
+    if previous is not None:
+        old_city_id = city_id if previous[-1] == current[-1] else _household_city_id(previous[-1])
+        old_buckets = DemographicsSnapshot.buckets_for(previous[:-1], old_city_id)
+    DemographicsSnapshot.apply_changes(DemographicsSnapshot.POPULATION_DETAIL, old_buckets, new_buckets)
+
+
+@receiver(post_delete, sender=Member)
+def member_demographics_deleted(sender, instance, **kwargs):
+    values = getattr(instance, "_demographics", None)
+    if values is None:
+        return
+    DemographicsSnapshot.apply_changes(
+        DemographicsSnapshot.POPULATION_MEMBER, DemographicsSnapshot.buckets_for(values[:-1], values[-1]), None
+    )
+
+
+@receiver(post_delete, sender=MemberDetail)
+def detail_demographics_deleted(sender, instance, **kwargs):
+    values = getattr(instance, "_demographics", None)
+    if values is None:
+        return
+    DemographicsSnapshot.apply_changes(
+        DemographicsSnapshot.POPULATION_DETAIL,
+        DemographicsSnapshot.buckets_for(values[:-1], _household_city_id(values[-1])),
+        None,
+    )
@@ -1,3 +1,1139 @@
-from django.test import TestCase
+import csv
+import json
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from marketplace.models import BnsModel
+from news.models import Category, News
+
+from .birthdays import birthdays_on
+from .emails import claim_outbox_batch, deliver_outbox_batch, release_stale_claims
+from .exports import stream_households_ndjson
+from .images import profile_image_variant_urls
+from .locations import bump_location_version
+from .models import (
+    City,
+    Country,
+    DemographicsSnapshot,
+    EmailOutbox,
+    Member,
+    MemberDetail,
+    MemberPasswordResetToken,
+    MemberStats,
+    State,
+    birthday_q,
+)
+from .pagination import encode_cursor
+from .search import build_match_query, member_search_filter, search_member_nos
+
+
+class ProfileApiQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(
+            first_name="Asha",
+            surname="Patel",
+            phone_no="9000000001",
+            gender="F",
+            status="Active",
+            approval_status="Approved",
+        )
+        category = Category.objects.create(name="Community")
+        for index in range(3):
+            MemberDetail.objects.create(
+                member_no=cls.member, first_name=f"Child{index}", surname="Patel", age=10 + index, gender="M"
+            )
+            News.objects.create(
+                title=f"News {index}", content="Body", category=category, created_by=cls.member
+            )
+            BnsModel.objects.create(
+                title=f"Listing {index}", desc="Desc", listing_type="seller", contact="1", created_by=cls.member
+            )
+
+    def setUp(self):
+        session = self.client.session
+        session["member_no"] = self.member.member_no
+        session.save()
+
+    def _get_profile(self):
+        response = self.client.get(reverse("member:profile_api"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_profile_api_reads_stats_row(self):
+        # Session, member, stats row joined with its latest detail/news/category/listing.
+        with self.assertNumQueries(3):
+            data = self._get_profile()
+
+        self.assertEqual(data["counts"], {"details": 3, "news": 3, "listings": 3})
+        self.assertEqual(data["latest_detail"]["first_name"], "Child2")
+        self.assertEqual(data["latest_news"]["title"], "News 2")
+        self.assertEqual(data["latest_news"]["category"], "Community")
+        self.assertEqual(data["latest_listing"]["title"], "Listing 2")
+
+    def test_profile_api_rebuilds_missing_stats_row(self):
+        MemberStats.objects.filter(member=self.member).delete()
+
+        # Session, member, stats miss, annotated aggregate, upsert, joined fetch.
+        with self.assertNumQueries(6):
+            data = self._get_profile()
+
+        self.assertEqual(data["counts"], {"details": 3, "news": 3, "listings": 3})
+        self.assertEqual(data["latest_news"]["category"], "Community")
+        self.assertTrue(MemberStats.objects.filter(member=self.member).exists())
+
+
+class MemberStatsSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9000000001")
+        cls.other = Member.objects.create(first_name="Ravi", surname="Shah", phone_no="9000000002")
+        cls.news = News.objects.create(title="Festival", content="Body", created_by=cls.author)
+
+    def _news_count(self, member):
+        return MemberStats.objects.get(member=member).news_count
+
+    def test_deferred_owner_is_not_fetched_on_load(self):
+        with self.assertNumQueries(1):
+            items = list(News.objects.only("title"))
+        self.assertEqual(len(items), 1)
+
+    def test_delete_with_deferred_owner_updates_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.only("title").get(pk=self.news.pk).delete()
+        self.assertEqual(self._news_count(self.author), 0)
+
+    def test_queryset_delete_updates_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.filter(pk=self.news.pk).delete()
+        self.assertEqual(self._news_count(self.author), 0)
+
+    def test_reassigning_deferred_owner_moves_counts(self):
+        news = News.objects.defer("created_by").get(pk=self.news.pk)
+        news.created_by = self.other
+        news.save()
+        self.assertEqual(self._news_count(self.author), 0)
+        self.assertEqual(self._news_count(self.other), 1)
+
+
+class LocationApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.india = Country.objects.create(name="India")
+        cls.colombia = Country.objects.create(name="Colombia")
+        cls.gujarat = State.objects.create(country=cls.india, name="Gujarat")
+        cls.kerala = State.objects.create(country=cls.india, name="Kerala")
+        City.objects.create(country=cls.india, state=cls.gujarat, name="Ahmedabad")
+        City.objects.create(country=cls.india, state=cls.gujarat, name="Anand")
+        City.objects.create(country=cls.india, state=cls.kerala, name="Alappuzha")
+        City.objects.create(country=cls.colombia, name="Bogotá")
+
+    def setUp(self):
+        # A fresh version, so no snapshot from another test's data is reused.
+        cache.clear()
+
+    def test_snapshot_is_reused_until_the_version_changes(self):
+        self.client.get(reverse("member:country_list_api"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("member:city_list_api"), {"state_id": self.gujarat.pk})
+        self.assertEqual([c["name"] for c in response.json()["results"]], ["Ahmedabad", "Anand"])
+
+    def test_conditional_get_returns_304_until_a_location_changes(self):
+        url = reverse("member:country_list_api")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Country.objects.create(name="Kenya")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Kenya", [c["name"] for c in response.json()["results"]])
+
+    def test_city_search_matches_accent_folded_prefixes(self):
+        response = self.client.get(reverse("member:city_search_api"), {"q": "bogo"})
+        self.assertEqual([c["name"] for c in response.json()["results"]], ["Bogotá"])
+
+        response = self.client.get(reverse("member:city_search_api"), {"q": "A", "country_id": self.india.pk, "limit": 2})
+        self.assertEqual([c["name"] for c in response.json()["results"]], ["Ahmedabad", "Alappuzha"])
+
+    def test_city_search_rejects_a_state_from_another_country(self):
+        response = self.client.get(
+            reverse("member:city_search_api"), {"q": "a", "country_id": self.colombia.pk, "state_id": self.kerala.pk}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_state_search_is_scoped_to_the_country(self):
+        response = self.client.get(reverse("member:state_search_api"), {"q": "k", "country_id": self.india.pk})
+        self.assertEqual([s["name"] for s in response.json()["results"]], ["Kerala"])
+        response = self.client.get(reverse("member:state_search_api"), {"q": "k", "country_id": self.colombia.pk})
+        self.assertEqual(response.json()["results"], [])
+
+    def test_location_tree_nests_cities_under_states(self):
+        response = self.client.get(reverse("member:location_relation_api"), {"country_id": self.colombia.pk})
+        [node] = response.json()["results"]
+        self.assertEqual(node["states"], [])
+        self.assertEqual([c["name"] for c in node["cities_without_state"]], ["Bogotá"])
+
+        response = self.client.get(reverse("member:location_relation_api"), {"state_id": self.kerala.pk})
+        [node] = response.json()["results"]
+        self.assertEqual([(s["name"], [c["name"] for c in s["cities"]]) for s in node["states"]],
+                         [("Kerala", ["Alappuzha"])])
+
+
+class UsernameAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index, username in enumerate(["ashapatel", "ashapatel1", "ashapatel3", "ashapatelx"]):
+            Member.objects.create(first_name="Taken", surname=str(index), phone_no=f"80000000{index}", username=username)
+
+    def _pending(self, phone_no, first_name="Asha", surname="Patel", **extra):
+        return Member.objects.create(first_name=first_name, surname=surname, phone_no=phone_no, **extra)
+
+    def test_generate_unique_username_takes_next_free_suffix_in_one_query(self):
+        with self.assertNumQueries(1):
+            username = Member.generate_unique_username(" Asha ", "Patel")
+        self.assertEqual(username, "ashapatel2")
+        self.assertEqual(Member.generate_unique_username("R@vi", ""), "rvi")
+        self.assertEqual(Member.generate_unique_username("", "!!"), "member")
+
+    def test_allocate_usernames_keeps_a_batch_distinct(self):
+        members = [self._pending(f"90000000{index}") for index in range(3)]
+        members.append(self._pending("900000009", username="kept"))
+        with self.assertNumQueries(1):
+            allocated = Member.allocate_usernames(members)
+        self.assertEqual([m.username for m in allocated], ["ashapatel2", "ashapatel4", "ashapatel5"])
+        self.assertEqual(members[-1].username, "kept")
+
+    def test_approve_retries_when_a_concurrent_approval_takes_the_username(self):
+        member = self._pending("900000001")
+        real = Member.generate_unique_username
+        with mock.patch.object(Member, "generate_unique_username", side_effect=["ashapatel", real("Asha", "Patel")]):
+            member.approve()
+        member.refresh_from_db()
+        self.assertEqual(member.username, "ashapatel2")
+        self.assertEqual(member.approval_status, "Approved")
+        self.assertTrue(member.password.startswith(UNUSABLE_PASSWORD_PREFIX))
+
+    def test_approve_does_not_retry_a_chosen_username(self):
+        member = self._pending("900000001")
+        member.username = "ashapatel"
+        with self.assertRaises(IntegrityError):
+            member.approve()
+
+
+@override_settings(EMAIL_OUTBOX_RETRY_SECONDS=60, EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_CLAIM_SECONDS=900)
+class EmailOutboxTests(TestCase):
+    def _queue(self, count=1, **extra):
+        return [
+            EmailOutbox.objects.create(
+                kind=EmailOutbox.KIND_APPROVAL, to_email=f"m{index}@example.com", subject=f"Mail {index}",
+                text_body="Body", **extra,
+            )
+            for index in range(count)
+        ]
+
+    def test_claim_takes_due_pending_rows_once(self):
+        first, second = self._queue(2)
+        self._queue(next_attempt_at=timezone.now() + timedelta(hours=1))
+        self._queue(status=EmailOutbox.STATUS_FAILED)
+
+        self.assertEqual([item.pk for item in claim_outbox_batch(10)], [first.pk, second.pk])
+        # A second worker polling the same rows gets nothing.
+        self.assertEqual(claim_outbox_batch(10), [])
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENDING).count(), 2)
+
+    def test_deliver_sends_and_marks_rows_sent(self):
+        self._queue(2)
+        self.assertEqual(deliver_outbox_batch(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists())
+        self.assertEqual(deliver_outbox_batch(), (0, 0))
+
+    def test_failed_send_is_retried_with_backoff_then_marked_failed(self):
+        [item] = self._queue()
+        with mock.patch.object(EmailMultiAlternatives, "send", side_effect=OSError("refused")):
+            before = timezone.now()
+            self.assertEqual(deliver_outbox_batch(), (0, 1))
+            item.refresh_from_db()
+            self.assertEqual((item.status, item.attempts), (EmailOutbox.STATUS_PENDING, 1))
+            self.assertEqual(item.last_error, "OSError: refused")
+            self.assertGreaterEqual(item.next_attempt_at, before + timedelta(seconds=60))
+
+            # Not due yet, so the next run leaves it alone.
+            self.assertEqual(deliver_outbox_batch(), (0, 0))
+
+            EmailOutbox.objects.filter(pk=item.pk).update(next_attempt_at=timezone.now(), attempts=2)
+            self.assertEqual(deliver_outbox_batch(), (0, 1))
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.attempts), (EmailOutbox.STATUS_FAILED, 3))
+
+    def test_stale_claims_are_released(self):
+        stale, fresh = self._queue(2, status=EmailOutbox.STATUS_SENDING)
+        EmailOutbox.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(seconds=901))
+
+        self.assertEqual(release_stale_claims(), 1)
+        self.assertEqual(EmailOutbox.objects.get(pk=stale.pk).status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(EmailOutbox.objects.get(pk=fresh.pk).status, EmailOutbox.STATUS_SENDING)
+
+    def test_a_long_batch_keeps_its_claims(self):
+        claimed_at = timezone.now() - timedelta(hours=1)
+        self._queue(3, next_attempt_at=claimed_at)
+        real_now = timezone.now
+        calls = iter([claimed_at])
+        released = []
+
+        def send(message, fail_silently=False):
+            # Another worker checking for abandoned rows mid-batch.
+            released.append(release_stale_claims())
+            return 1
+
+        # The batch is claimed an hour ago, as if every earlier send were slow.
+        with mock.patch("member.emails.timezone.now", side_effect=lambda: next(calls, None) or real_now()), \
+                mock.patch.object(EmailMultiAlternatives, "send", autospec=True, side_effect=send):
+            self.assertEqual(deliver_outbox_batch(), (3, 0))
+        self.assertEqual(released, [0, 0, 0])
+
+    def test_admin_retry_skips_sent_and_sending_rows(self):
+        admin = User.objects.create_superuser("outbox-admin", "admin@example.com", "pw")
+        failed, sent, sending = (
+            self._queue(status=status, attempts=3)[0]
+            for status in (EmailOutbox.STATUS_FAILED, EmailOutbox.STATUS_SENT, EmailOutbox.STATUS_SENDING)
+        )
+        self.client.force_login(admin)
+        self.client.post(
+            reverse("admin:member_emailoutbox_changelist"),
+            {"action": "retry_selected", "_selected_action": [failed.pk, sent.pk, sending.pk]},
+        )
+        statuses = dict(EmailOutbox.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[failed.pk], EmailOutbox.STATUS_PENDING)
+        self.assertEqual(EmailOutbox.objects.get(pk=failed.pk).attempts, 0)
+        self.assertEqual(statuses[sent.pk], EmailOutbox.STATUS_SENT)
+        self.assertEqual(statuses[sending.pk], EmailOutbox.STATUS_SENDING)
+
+
+class BulkMemberActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("bulk-admin", "admin@example.com", "pw")
+        cls.approved = Member.objects.create(
+            first_name="Done", surname="Member", phone_no="9100000000", approval_status="Approved", username="done"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _pending(self, count, start=1):
+        return [
+            Member.objects.create(
+                first_name="Asha", surname="Patel", phone_no=f"91000000{start + index:02d}",
+                email_id=f"asha{start + index}@example.com",
+            )
+            for index in range(count)
+        ]
+
+    def _post(self, name, member_nos):
+        return self.client.post(reverse(f"member:{name}"), {"member_nos": member_nos}, content_type="application/json")
+
+    def test_bulk_approve_reports_each_member(self):
+        first, second = self._pending(2)
+        Member.objects.filter(pk=second.pk).update(email_id="")
+
+        response = self._post("bulk_approve_members_api", [first.pk, second.pk, self.approved.pk, 999999])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["approved_count"], 2)
+        results = data["results"]
+        self.assertEqual(results[str(first.pk)]["credentials"]["username"], "ashapatel")
+        self.assertEqual(results[str(second.pk)]["credentials"]["username"], "ashapatel1")
+        self.assertTrue(results[str(first.pk)]["email_queued"])
+        self.assertFalse(results[str(second.pk)]["email_queued"])
+        self.assertEqual(results[str(self.approved.pk)]["status"], "skipped")
+        self.assertEqual(results["999999"]["status"], "not_found")
+
+        self.assertEqual(
+            set(Member.objects.filter(pk__in=[first.pk, second.pk]).values_list("approval_status", flat=True)),
+            {"Approved"},
+        )
+        self.assertEqual(MemberPasswordResetToken.objects.filter(member__in=[first, second]).count(), 2)
+        self.assertEqual(list(EmailOutbox.objects.values_list("to_email", flat=True)), [first.email_id])
+
+    def test_bulk_approve_query_count_does_not_grow_with_the_batch(self):
+        def approve(members):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self._post("bulk_approve_members_api", [m.pk for m in members]).status_code, 200)
+            return len(queries)
+
+        self.assertEqual(approve(self._pending(2)), approve(self._pending(6, start=10)))
+
+    def test_bulk_reject_marks_members_not_approved(self):
+        [member] = self._pending(1)
+        response = self._post("bulk_reject_members_api", [member.pk, 999999])
+        data = response.json()
+        self.assertEqual(data["rejected_count"], 1)
+        self.assertEqual(data["results"][str(member.pk)]["status"], "not_approved")
+        self.assertEqual(data["results"]["999999"]["status"], "not_found")
+        member.refresh_from_db()
+        self.assertEqual((member.status, member.approval_status), ("Inactive", "Not Approved"))
+
+    def test_bulk_actions_validate_the_member_list(self):
+        self.assertEqual(self._post("bulk_approve_members_api", []).status_code, 400)
+        self.assertEqual(self._post("bulk_approve_members_api", ["x"]).status_code, 400)
+        self.assertEqual(self._post("bulk_reject_members_api", list(range(1, 502))).status_code, 400)
+        response = self.client.post(reverse("member:bulk_reject_members_api"), {"member_nos": "1,2"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_bulk_actions_require_a_superadmin(self):
+        self.client.logout()
+        self.assertEqual(self._post("bulk_approve_members_api", [self.approved.pk]).status_code, 403)
+        self.assertEqual(self._post("bulk_reject_members_api", [self.approved.pk]).status_code, 403)
+
+
+class PendingMemberPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("queue-admin", "admin@example.com", "pw")
+        cls.members = [
+            Member.objects.create(first_name=f"Pending{index}", surname="Member", phone_no=f"92000000{index}")
+            for index in range(5)
+        ]
+        Member.objects.create(first_name="Done", surname="Member", phone_no="920000009", approval_status="Approved")
+        # Two members share a timestamp, so the member_no tie-break matters.
+        created = timezone.now() - timedelta(days=1)
+        for offset, member in enumerate(cls.members):
+            Member.objects.filter(pk=member.pk).update(created_at=created + timedelta(minutes=min(offset, 3)))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _get(self, **params):
+        return self.client.get(reverse("member:pending_member_requests_api"), params)
+
+    def test_cursor_walks_the_queue_newest_first_without_repeats(self):
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            data = self._get(**params).json()
+            seen += [row["member_no"] for row in data["results"]]
+            if not data["has_next"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        self.assertEqual(seen, [m.pk for m in reversed(self.members)])
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        first = self._get(page_size=2).json()
+        with CaptureQueriesContext(connection) as first_page:
+            self._get(page_size=2)
+        with CaptureQueriesContext(connection) as next_page:
+            self._get(page_size=2, cursor=first["next_cursor"])
+        self.assertEqual(len(first_page), len(next_page))
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ("not-a-cursor", encode_cursor(None, 5), encode_cursor("2026-01-01T00:00:00", None),
+                       encode_cursor("2026-01-01T00:00:00", "5"), encode_cursor(1)):
+            with self.subTest(cursor=cursor):
+                response = self._get(cursor=cursor)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor"})
+
+    def test_queue_requires_a_superadmin(self):
+        self.client.logout()
+        self.assertEqual(self._get().status_code, 403)
+
+
+@override_settings(PUBLIC_PROFILE_CACHE_TIMEOUT=300)
+class PublicProfileCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(
+            first_name="Asha", surname="Patel", phone_no="9300000001", username="ashapatel", approval_status="Approved"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, **params):
+        return self.client.get(reverse("member:public_profile_api"), params)
+
+    def test_repeat_requests_are_served_from_the_cache(self):
+        first = self._get(member_no=self.member.pk)
+        with self.assertNumQueries(0):
+            second = self._get(member_no=self.member.pk)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("Last-Modified", second)
+
+    def test_conditional_get_returns_304(self):
+        etag = self._get(member_no=self.member.pk)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("member:public_profile_api"), {"member_no": self.member.pk}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_saving_the_member_evicts_the_entry(self):
+        etag = self._get(member_no=self.member.pk)["ETag"]
+        member = Member.objects.get(pk=self.member.pk)
+        member.occupation = "Teacher"
+        member.save()
+
+        response = self._get(member_no=self.member.pk)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["result"]["occupation"], "Teacher")
+
+    def test_location_changes_retire_cached_entries(self):
+        etag = self._get(member_no=self.member.pk)["ETag"]
+        bump_location_version()
+        response = self.client.get(
+            reverse("member:public_profile_api"), {"member_no": self.member.pk}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_a_stale_username_pointer_misses_after_a_rename(self):
+        self.assertEqual(self._get(username="ashapatel").status_code, 200)
+        with self.assertNumQueries(0):
+            self._get(username="ashapatel")
+
+        Member.objects.filter(pk=self.member.pk).update(username="asha")
+        Member.objects.get(pk=self.member.pk).save()
+        self.assertEqual(self._get(username="ashapatel").status_code, 404)
+        self.assertEqual(self._get(username="asha").json()["result"]["first_name"], "Asha")
+
+    @override_settings(PUBLIC_PROFILE_CACHE_TIMEOUT=0)
+    def test_a_zero_timeout_disables_the_cache(self):
+        self._get(member_no=self.member.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get(member_no=self.member.pk).status_code, 200)
+
+
+class MemberSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        india = Country.objects.create(name="India")
+        cls.city = City.objects.create(country=india, name="Vadodara")
+        approved = {"approval_status": "Approved", "status": "Active"}
+        cls.viewer = Member.objects.create(first_name="View", surname="Er", phone_no="9400000000", **approved)
+        cls.jose = Member.objects.create(first_name="José", surname="Patel", phone_no="9400000001", **approved)
+        cls.teacher = Member.objects.create(
+            first_name="Ravi", surname="Shah", phone_no="9400000002", occupation="Patel school teacher",
+            city=cls.city, **approved
+        )
+        cls.pending = Member.objects.create(first_name="Pat", surname="Patel", phone_no="9400000003")
+
+    def setUp(self):
+        session = self.client.session
+        session["member_no"] = self.viewer.member_no
+        session.save()
+
+    def _search(self, **params):
+        return self.client.get(reverse("member:member_directory_search_api"), params)
+
+    def test_name_matches_rank_above_profile_text(self):
+        self.assertEqual(search_member_nos("patel", approved_only=True), [self.jose.pk, self.teacher.pk])
+        self.assertEqual(search_member_nos("patel"), [self.jose.pk, self.pending.pk, self.teacher.pk])
+
+    def test_tokens_match_as_accent_folded_prefixes(self):
+        self.assertEqual(search_member_nos("jos pat"), [self.jose.pk])
+        self.assertEqual(search_member_nos("vado"), [self.teacher.pk])
+
+    def test_query_syntax_typed_by_users_is_quoted(self):
+        self.assertEqual(build_match_query('shah AND -"x'), '"shah"* "AND"* "x"*')
+        self.assertEqual(search_member_nos('NEAR( -ravi'), [])
+        self.assertEqual(search_member_nos("!!"), [])
+
+    def test_index_follows_saves_updates_deletes_and_city_renames(self):
+        self.teacher.first_name = "Kiran"
+        self.teacher.save()
+        self.assertEqual(search_member_nos("kiran"), [self.teacher.pk])
+        self.assertEqual(search_member_nos("ravi"), [])
+
+        Member.objects.filter(pk=self.jose.pk).update(surname="Mehta")
+        self.assertEqual(search_member_nos("mehta"), [self.jose.pk])
+
+        City.objects.filter(pk=self.city.pk).update(name="Baroda")
+        self.assertEqual(search_member_nos("baroda"), [self.teacher.pk])
+
+        [created] = Member.objects.bulk_create([Member(first_name="Nila", surname="Desai", phone_no="9400000004")])
+        self.assertEqual(search_member_nos("nila"), [created.pk])
+
+        self.pending.delete()
+        self.assertEqual(search_member_nos("patel"), [self.teacher.pk])
+
+    def test_search_filter_composes_with_querysets(self):
+        qs = Member.objects.filter(member_search_filter("patel"), approval_status="Pending")
+        self.assertEqual(list(qs.values_list("pk", flat=True)), [self.pending.pk])
+
+    def test_directory_api_lists_approved_members_by_rank(self):
+        data = self._search(q="patel", page_size=1).json()
+        self.assertEqual([row["member_no"] for row in data["results"]], [self.jose.pk])
+        self.assertEqual(data["results"][0]["full_name"], "José Patel")
+        self.assertTrue(data["has_next"])
+
+        data = self._search(q="patel", page_size=1, page=2).json()
+        self.assertEqual([row["member_no"] for row in data["results"]], [self.teacher.pk])
+        self.assertFalse(data["has_next"])
+
+    def test_directory_api_requires_a_member_and_a_query(self):
+        self.assertEqual(self._search().status_code, 400)
+        self.client.session.flush()
+        self.client.cookies.clear()
+        self.assertEqual(self._search(q="patel").status_code, 401)
+
+
+class ImportMembersTests(TestCase):
+    FIELDS = [
+        "first_name", "surname", "phone_no", "email_id", "gender", "residential_address",
+        "country", "state", "city", "age", "household_phone_no",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.india = Country.objects.create(name="India")
+        cls.gujarat = State.objects.create(country=cls.india, name="Gujarat")
+        cls.surat = City.objects.create(country=cls.india, state=cls.gujarat, name="Surat")
+        Member.objects.create(first_name="Old", surname="Member", phone_no="9500000000")
+
+    def setUp(self):
+        cache.clear()
+        self.tmp = Path(self.enterContext(tempfile.TemporaryDirectory()))
+
+    def _member(self, phone_no, **extra):
+        row = {
+            "first_name": "Asha", "surname": "Patel", "phone_no": phone_no, "email_id": f"{phone_no}@example.com",
+            "gender": "F", "residential_address": "1 Ring Road", "country": "india", "state": "GUJARAT",
+            "city": "Surat",
+        }
+        row.update(extra)
+        return row
+
+    def _detail(self, household, first_name="Kid", age="9"):
+        return {"first_name": first_name, "surname": "Patel", "gender": "M", "age": age, "household_phone_no": household}
+
+    def _write_csv(self, rows):
+        path = self.tmp / "members.csv"
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def _run(self, path, *args):
+        call_command("import_members", str(path), *args, stdout=StringIO())
+        rejects = Path(f"{path}.rejects.ndjson").read_text(encoding="utf-8").splitlines()
+        return {json.loads(line)["line"]: json.loads(line)["errors"] for line in rejects}
+
+    def test_csv_import_rejects_bad_rows_and_links_households(self):
+        path = self._write_csv([
+            self._member("9500000001"),
+            self._detail("9500000001"),
+            self._member("9500000002", country="Atlantis"),
+            self._member("9500000003", state="Kerala"),
+            self._member("9500000001", first_name="Twin"),
+            self._member("9500000000"),
+            self._detail("9599999999"),
+            self._detail("9500000000", first_name="Grandkid"),
+        ])
+        rejects = self._run(path, "--batch-size", "3")
+
+        self.assertEqual(sorted(rejects), [4, 5, 6, 7, 8])
+        self.assertIn("country", rejects[4])
+        self.assertIn("state", rejects[5])
+        self.assertEqual(rejects[6], {"phone_no": ["Duplicate phone_no in import file."]})
+        self.assertEqual(rejects[7], {"phone_no": ["Member with this Phone no already exists."]})
+        self.assertIn("household_phone_no", rejects[8])
+
+        member = Member.objects.get(phone_no="9500000001")
+        self.assertEqual((member.approval_status, member.city_id), ("Pending", self.surat.pk))
+        self.assertEqual(list(member.details.values_list("first_name", flat=True)), ["Kid"])
+        self.assertEqual(MemberStats.objects.get(member=member).detail_count, 1)
+        old = Member.objects.get(phone_no="9500000000")
+        self.assertEqual(list(old.details.values_list("first_name", flat=True)), ["Grandkid"])
+
+    def test_ndjson_import_reads_embedded_details(self):
+        path = self.tmp / "members.ndjson"
+        path.write_text("\n".join([
+            json.dumps(self._member("9500000011", details=[{"first_name": "Kid", "surname": "P", "gender": "M", "age": 4}])),
+            "{not json",
+            json.dumps(["a", "list"]),
+            json.dumps(self._member("9500000012", details=[{"first_name": "NoAge", "surname": "P", "gender": "M"}])),
+        ]), encoding="utf-8")
+        rejects = self._run(path)
+
+        self.assertEqual(sorted(rejects), [2, 3, 4])
+        self.assertIn("details[0]", rejects[4])
+        self.assertEqual(Member.objects.get(phone_no="9500000011").details.count(), 1)
+        self.assertFalse(Member.objects.filter(phone_no="9500000012").exists())
+
+    def test_dry_run_writes_nothing(self):
+        path = self._write_csv([self._member("9500000021"), self._detail("9500000021")])
+        self.assertEqual(self._run(path, "--dry-run"), {})
+        self.assertFalse(Member.objects.filter(phone_no="9500000021").exists())
+
+    def test_a_lost_phone_race_only_rejects_the_conflicting_row(self):
+        path = self._write_csv([self._member("9500000031"), self._member("9500000032"), self._detail("9500000032")])
+        # Another import commits the same phone after this batch checked for it.
+        Member.objects.create(first_name="Racer", surname="X", phone_no="9500000031")
+        real_filter = Member.objects.filter
+        checks = []
+
+        def filter_after_race(*args, **kwargs):
+            if not checks:
+                checks.append(kwargs)
+                return Member.objects.none()
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(Member.objects, "filter", side_effect=filter_after_race):
+            rejects = self._run(path)
+
+        self.assertIn("phone_no__in", checks[0])
+        self.assertEqual(list(rejects), [2])
+        self.assertEqual(Member.objects.get(phone_no="9500000031").first_name, "Racer")
+        self.assertEqual(Member.objects.get(phone_no="9500000032").details.count(), 1)
+
+
+class MemberExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("export-admin", "admin@example.com", "pw")
+        india = Country.objects.create(name="India")
+        gujarat = State.objects.create(country=india, name="Gujarat")
+        cls.members = []
+        for index in range(5):
+            member = Member.objects.create(
+                first_name=f"Asha{index}", surname="Patel", phone_no=f"96000000{index}",
+                email_id=f"asha{index}@example.com", gender="F", residential_address="1 Ring Road",
+                country=india, state=gujarat, approval_status="Approved" if index else "Pending",
+                date_of_birth=date(1990, 10, 17),
+            )
+            MemberDetail.objects.create(member_no=member, first_name="Kid", surname="Patel", age=9, gender="M")
+            cls.members.append(member)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def _export(self, **params):
+        response = self.client.get(reverse("member:member_export_api"), params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_csv_export_writes_households_in_the_import_layout(self):
+        rows = list(csv.DictReader(StringIO(self._export(approval_status="Pending"))))
+        self.assertEqual([(r["first_name"], r["household_phone_no"]) for r in rows],
+                         [("Asha0", ""), ("Kid", "960000000")])
+        self.assertEqual(rows[0]["country"], "India")
+        self.assertEqual(rows[0]["date_of_birth"], "1990-10-17")
+
+    def test_ndjson_export_embeds_details(self):
+        lines = [json.loads(line) for line in self._export(format="ndjson").splitlines()]
+        self.assertEqual([line["member_no"] for line in lines], [m.pk for m in self.members])
+        self.assertEqual([d["first_name"] for d in lines[0]["details"]], ["Kid"])
+
+    def test_queries_grow_per_chunk_not_per_member(self):
+        # One streamed members query, then one details query per chunk of two.
+        with self.assertNumQueries(4):
+            lines = list(stream_households_ndjson(Member.objects.all(), chunk_size=2))
+        self.assertEqual(len(lines), 5)
+
+    def test_exported_csv_imports_back(self):
+        exported = self._export(approval_status="Pending")
+        Member.objects.filter(pk=self.members[0].pk).delete()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "export.csv"
+            path.write_text(exported, encoding="utf-8")
+            call_command("import_members", str(path), stdout=StringIO())
+            self.assertEqual(Path(f"{path}.rejects.ndjson").read_text(encoding="utf-8"), "")
+        member = Member.objects.get(phone_no="960000000")
+        self.assertEqual(member.details.get().first_name, "Kid")
+
+    def test_export_validates_format_and_access(self):
+        self.assertEqual(self.client.get(reverse("member:member_export_api"), {"format": "xml"}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("member:member_export_api")).status_code, 403)
+
+
+class DemographicsSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        india = Country.objects.create(name="India")
+        cls.surat = City.objects.create(country=india, name="Surat")
+        cls.pune = City.objects.create(country=india, name="Pune")
+        cls.asha = Member.objects.create(
+            first_name="Asha", surname="Patel", phone_no="9700000001", gender="F", occupation="Teacher",
+            date_of_birth=date(1990, 1, 1), city=cls.surat,
+        )
+        cls.ravi = Member.objects.create(first_name="Ravi", surname="Shah", phone_no="9700000002", gender="M", city=cls.pune)
+        cls.kid = MemberDetail.objects.create(
+            member_no=cls.asha, first_name="Kid", surname="Patel", age=9, gender="M", date_of_birth=date(2017, 5, 5)
+        )
+        DemographicsSnapshot.rebuild()
+
+    def _counts(self, population=None):
+        rows = DemographicsSnapshot.objects.all()
+        if population:
+            rows = rows.filter(population=population)
+        return {(row.population, row.dimension, row.bucket): row.count for row in rows}
+
+    def assertMatchesRebuild(self):
+        incremental = self._counts()
+        DemographicsSnapshot.rebuild()
+        self.assertEqual(incremental, self._counts())
+
+    def test_string_date_of_birth_is_bucketed_as_a_date(self):
+        Member.objects.create(first_name="Nila", surname="Desai", phone_no="9700000003", date_of_birth="1960-10-17")
+        self.assertEqual(self._counts()[("member", "age_band", "65+")], 1)
+        self.assertMatchesRebuild()
+
+    def test_incremental_updates_match_a_rebuild(self):
+        asha = Member.objects.get(pk=self.asha.pk)
+        asha.city = self.pune
+        asha.occupation = " teacher "
+        asha.save()
+
+        kid = MemberDetail.objects.only("first_name").get(pk=self.kid.pk)
+        kid.member_no = self.ravi
+        kid.gender = "F"
+        kid.save()
+
+        MemberDetail.objects.create(member_no=self.ravi, first_name="Baby", surname="Shah", age=1, gender="M")
+        Member.objects.defer("date_of_birth").get(pk=self.ravi.pk).delete()
+        self.assertMatchesRebuild()
+
+    def test_emptied_buckets_are_removed(self):
+        self.assertEqual(self._counts()[("member", "occupation", "teacher")], 1)
+        asha = Member.objects.get(pk=self.asha.pk)
+        asha.occupation = ""
+        asha.save()
+        self.assertNotIn(("member", "occupation", "teacher"), self._counts())
+        self.assertMatchesRebuild()
+
+    def test_saves_that_change_no_demographics_run_no_extra_queries(self):
+        asha = Member.objects.get(pk=self.asha.pk)
+        kid = MemberDetail.objects.get(pk=self.kid.pk)
+        with self.assertNumQueries(1):
+            asha.save(update_fields=["status"])
+        with self.assertNumQueries(1):
+            asha.save()
+        with self.assertNumQueries(1):
+            kid.save()
+
+    def test_stats_api_reads_the_snapshot(self):
+        session = self.client.session
+        session["member_no"] = self.asha.member_no
+        session.save()
+
+        data = self.client.get(reverse("member:demographics_stats_api")).json()
+        self.assertEqual(data["members"]["total"], [{"bucket": "all", "label": "All", "count": 2}])
+        self.assertEqual({row["bucket"]: row["count"] for row in data["all"]["gender"]}, {"F": 1, "M": 2})
+
+        DemographicsSnapshot.objects.all().delete()
+        with self.assertNumQueries(3):
+            data = self.client.get(reverse("member:demographics_stats_api")).json()
+        self.assertEqual(data, {"updated_at": None, "members": {}, "family_members": {}, "all": {}})
+        self.assertFalse(DemographicsSnapshot.objects.exists())
+
+    def test_stats_api_requires_a_member_or_staff(self):
+        self.assertEqual(self.client.get(reverse("member:demographics_stats_api")).status_code, 401)
+
+
+class RecomputeAgesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.in_window = Member.objects.create(first_name="A", surname="X", phone_no="9800000001", date_of_birth=date(1991, 10, 12))
+        cls.outside = Member.objects.create(first_name="B", surname="X", phone_no="9800000002", date_of_birth=date(1990, 11, 20))
+        cls.leap = Member.objects.create(first_name="C", surname="X", phone_no="9800000003", date_of_birth=date(2000, 2, 29))
+        cls.detail = MemberDetail.objects.create(
+            member_no=cls.in_window, first_name="Kid", surname="X", gender="M", date_of_birth=date(2016, 10, 17)
+        )
+        Member.objects.update(age=1)
+        MemberDetail.objects.update(age=1)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("recompute_ages", *args, "--skip-demographics", stdout=out)
+        return out.getvalue()
+
+    def _ages(self):
+        return {
+            "in_window": Member.objects.get(pk=self.in_window.pk).age,
+            "outside": Member.objects.get(pk=self.outside.pk).age,
+            "leap": Member.objects.get(pk=self.leap.pk).age,
+            "detail": MemberDetail.objects.get(pk=self.detail.pk).age,
+        }
+
+    def test_only_birthdays_in_the_window_are_recomputed(self):
+        output = self._run("--date", "2026-10-17", "--days", "7", "--chunk-size", "1")
+        self.assertIn("1 member(s), 1 family member(s)", output)
+        self.assertEqual(self._ages(), {"in_window": 35, "outside": 1, "leap": 1, "detail": 10})
+
+        # A rerun finds nothing left to write.
+        self.assertIn("0 member(s), 0 family member(s)", self._run("--date", "2026-10-17", "--days", "7"))
+
+    def test_all_recomputes_every_dated_row(self):
+        self._run("--date", "2026-10-17", "--all")
+        self.assertEqual(self._ages(), {"in_window": 35, "outside": 35, "leap": 26, "detail": 10})
+
+    def test_feb_29_birthdays_count_on_mar_1_in_common_years(self):
+        self._run("--date", "2027-03-01", "--days", "0")
+        self.assertEqual(self._ages()["leap"], 27)
+        self.assertEqual(list(Member.objects.filter(birthday_q(date(2028, 3, 1), date(2028, 3, 1)))), [])
+
+    def test_window_wraps_the_year_end(self):
+        Member.objects.filter(pk=self.outside.pk).update(date_of_birth=date(1990, 12, 30), birth_month=12, birth_day=30)
+        self._run("--date", "2027-01-02", "--days", "5")
+        self.assertEqual(self._ages()["outside"], 36)
+
+    def test_demographics_follow_the_new_ages(self):
+        DemographicsSnapshot.rebuild(today=date(2026, 10, 1))
+        call_command("recompute_ages", "--date", "2026-10-17", stdout=StringIO())
+        bands = dict(
+            DemographicsSnapshot.objects.filter(population="member", dimension="age_band").values_list("bucket", "count")
+        )
+        self.assertEqual(bands, {"25-34": 1, "35-44": 2})
+
+    def test_invalid_arguments_are_rejected(self):
+        with self.assertRaises(CommandError):
+            self._run("--date", "17/10/2026")
+        with self.assertRaises(CommandError):
+            self._run("--days", "-1")
+
+
+class BirthdayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        approved = {"approval_status": "Approved", "status": "Active"}
+        cls.asha = Member.objects.create(
+            first_name="Asha", surname="Patel", phone_no="9900000001", email_id="asha@example.com",
+            date_of_birth=date(1990, 10, 17), **approved
+        )
+        cls.ravi = Member.objects.create(
+            first_name="Ravi", surname="Shah", phone_no="9900000002", email_id="ravi@example.com",
+            date_of_birth=date(1985, 1, 1), **approved
+        )
+        cls.pending = Member.objects.create(
+            first_name="Pat", surname="Pending", phone_no="9900000003", date_of_birth=date(1990, 10, 17)
+        )
+        cls.leap = Member.objects.create(
+            first_name="Leap", surname="Day", phone_no="9900000004", date_of_birth=date(2000, 2, 29), **approved
+        )
+        cls.kid = MemberDetail.objects.create(
+            member_no=cls.asha, first_name="Kid", surname="Patel", gender="M", date_of_birth=date(2016, 10, 17)
+        )
+        cls.nephew = MemberDetail.objects.create(
+            member_no=cls.ravi, first_name="Nephew", surname="Shah", gender="M", date_of_birth=date(2010, 10, 17)
+        )
+        MemberDetail.objects.create(
+            member_no=cls.pending, first_name="Hidden", surname="Pending", gender="M", date_of_birth=date(2012, 10, 17)
+        )
+
+    def test_birthdays_on_reads_approved_households_in_two_queries(self):
+        with self.assertNumQueries(2):
+            members, details = birthdays_on(date(2026, 10, 17))
+            names = [d.member_no.first_name for d in details]
+        self.assertEqual(members, [self.asha])
+        self.assertEqual(details, [self.kid, self.nephew])
+        self.assertEqual(names, ["Asha", "Ravi"])
+
+    def test_feb_29_birthdays_fall_on_mar_1_in_common_years(self):
+        self.assertEqual(birthdays_on(date(2027, 3, 1))[0], [self.leap])
+        self.assertEqual(birthdays_on(date(2028, 3, 1))[0], [])
+        self.assertEqual(birthdays_on(date(2028, 2, 29))[0], [self.leap])
+
+    def test_reminders_are_queued_once_per_household_and_day(self):
+        out = StringIO()
+        call_command("send_birthday_reminders", "--date", "2026-10-17", stdout=out)
+        self.assertIn("queued 2 reminder(s)", out.getvalue())
+        rows = {row.to_email: row for row in EmailOutbox.objects.filter(kind=EmailOutbox.KIND_BIRTHDAY)}
+        self.assertEqual(set(rows), {"asha@example.com", "ravi@example.com"})
+        self.assertIn("Kid Patel", rows["asha@example.com"].text_body)
+
+        call_command("send_birthday_reminders", "--date", "2026-10-17", stdout=out)
+        self.assertEqual(EmailOutbox.objects.filter(kind=EmailOutbox.KIND_BIRTHDAY).count(), 2)
+
+    def test_birthdays_api_scopes_and_ages(self):
+        session = self.client.session
+        session["member_no"] = self.ravi.member_no
+        session.save()
+        url = reverse("member:birthdays_api")
+
+        data = self.client.get(url, {"date": "2026-10-17"}).json()
+        self.assertEqual([(m["full_name"], m["turning"]) for m in data["members"]], [("Asha Patel", 36)])
+        self.assertEqual([(f["full_name"], f["turning"]) for f in data["family_members"]],
+                         [("Kid Patel", 10), ("Nephew Shah", 16)])
+
+        data = self.client.get(url, {"date": "2026-10-17", "scope": "household"}).json()
+        self.assertEqual(data["members"], [])
+        self.assertEqual([f["household"] for f in data["family_members"]], ["Ravi Shah"])
+
+        self.assertEqual(self.client.get(url, {"date": "17-10-2026"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"scope": "city"}).status_code, 400)
+
+
+def _image_upload(name="photo.jpg", size=(600, 400), mode="RGB", fmt="JPEG", orientation=None):
+    buffer = BytesIO()
+    image = Image.new(mode, size, (200, 30, 30, 0) if mode == "RGBA" else (200, 30, 30))
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(buffer, fmt, exif=exif)
+    else:
+        image.save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class ProfileImageVariantTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9910000001")
+
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.member = Member.objects.get(pk=self.member.pk)
+
+    def _upload(self, upload):
+        self.member.profile_image = upload
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.save()
+        return self.member
+
+    def _open(self, name):
+        with default_storage.open(name) as handle:
+            image = Image.open(handle)
+            image.load()
+            return image
+
+    def test_upload_is_stripped_rotated_and_resized(self):
+        member = self._upload(_image_upload(orientation=6))
+
+        original = self._open(member.profile_image.name)
+        self.assertEqual((original.format, original.size), ("JPEG", (400, 600)))
+        self.assertNotIn(0x0112, original.getexif())
+
+        sizes = {name: self._open(path).size for name, path in member.profile_image_variants.items()}
+        self.assertEqual(sizes, {"avatar": (96, 96), "card": (320, 320), "full": (400, 600)})
+        self.assertEqual(set(profile_image_variant_urls(member)), {"avatar", "card", "full"})
+
+    def test_transparent_png_gets_a_white_background(self):
+        member = self._upload(_image_upload("logo.png", mode="RGBA", fmt="PNG"))
+        self.assertEqual(self._open(member.profile_image.name).getpixel((10, 10)), (255, 255, 255))
+
+    def test_replacing_and_clearing_delete_the_old_files(self):
+        old = self._upload(_image_upload())
+        old_paths = [old.profile_image.name, *old.profile_image_variants.values()]
+
+        member = self._upload(_image_upload("second.jpg"))
+        self.assertFalse(any(default_storage.exists(path) for path in old_paths))
+        new_paths = [member.profile_image.name, *member.profile_image_variants.values()]
+        self.assertTrue(all(default_storage.exists(path) for path in new_paths))
+
+        member.profile_image = None
+        with self.captureOnCommitCallbacks(execute=True):
+            member.save()
+        self.assertEqual(member.profile_image_variants, {})
+        self.assertFalse(any(default_storage.exists(path) for path in new_paths))
+
+    def test_a_rolled_back_replacement_keeps_the_old_files(self):
+        old = self._upload(_image_upload())
+        old_paths = [old.profile_image.name, *old.profile_image_variants.values()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                old.profile_image = _image_upload("second.jpg")
+                old.save()
+                raise RuntimeError
+        self.assertTrue(all(default_storage.exists(path) for path in old_paths))
+
+    def test_unreadable_upload_is_kept_without_variants(self):
+        with self.assertLogs("member.images", "WARNING"):
+            member = self._upload(SimpleUploadedFile("broken.jpg", b"not an image"))
+        self.assertEqual(member.profile_image_variants, {})
+        self.assertTrue(member.profile_image)
+
+    def test_backfill_command_processes_stored_images(self):
+        member = self._upload(_image_upload())
+        stored = default_storage.save("member/profile/legacy.jpg", _image_upload(orientation=3))
+        Member.objects.filter(pk=member.pk).update(profile_image=stored, profile_image_variants={})
+
+        out = StringIO()
+        call_command("generate_profile_image_variants", stdout=out, stderr=StringIO())
+        self.assertIn("Member: processed 1 image(s), 0 missing file(s)", out.getvalue())
+        member.refresh_from_db()
+        self.assertEqual(set(member.profile_image_variants), {"avatar", "card", "full"})
+        self.assertNotIn(0x0112, self._open(member.profile_image.name).getexif())
+
+
+class MemberDetailBulkAddTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        india = Country.objects.create(name="India")
+        cls.city = City.objects.create(country=india, name="Surat")
+        cls.member = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9920000001", city=cls.city)
+
+    def setUp(self):
+        # The frontend posts without a CSRF token, like the other JSON APIs.
+        self.client = Client(enforce_csrf_checks=True)
+        session = self.client.session
+        session["member_no"] = self.member.member_no
+        session.save()
+
+    def _post(self, rows, **extra):
+        return self.client.post(
+            reverse("member:member_detail_bulk_add_api"), {"members": rows}, content_type="application/json", **extra
+        )
+
+    def _row(self, first_name, **extra):
+        return {"first_name": first_name, "surname": "Patel", "gender": "M", "age": 9, **extra}
+
+    def test_rows_are_created_with_stats_and_demographics(self):
+        DemographicsSnapshot.rebuild()
+        response = self._post([self._row("Kid"), self._row("Baby", age=1, date_of_birth="2025-10-17")])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created_count"], 2)
+
+        details = list(self.member.details.order_by("member_id"))
+        self.assertEqual([(d.first_name, d.birth_month, d.created_by_id) for d in details],
+                         [("Kid", None, self.member.pk), ("Baby", 10, self.member.pk)])
+        self.assertEqual(MemberStats.objects.get(member=self.member).detail_count, 2)
+
+        incremental = set(DemographicsSnapshot.objects.values_list("population", "dimension", "bucket", "count"))
+        DemographicsSnapshot.rebuild()
+        self.assertEqual(incremental, set(DemographicsSnapshot.objects.values_list("population", "dimension", "bucket", "count")))
+        self.assertIn(("detail", "city", str(self.city.pk), 2), incremental)
+
+    def test_one_invalid_row_saves_nothing(self):
+        response = self._post([self._row("Kid"), self._row("", gender="X")])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertTrue(results[0]["ok"])
+        self.assertEqual(set(results[1]["errors"]), {"first_name", "gender"})
+        self.assertFalse(self.member.details.exists())
+
+    def test_payload_is_validated(self):
+        self.assertEqual(self._post([]).status_code, 400)
+        self.assertEqual(self._post(["Kid"]).status_code, 400)
+        self.assertEqual(self._post([self._row(f"Kid{i}") for i in range(51)]).status_code, 400)
+
+    def test_requires_a_logged_in_member(self):
+        self.client.session.flush()
+        self.client.cookies.clear()
+        self.assertEqual(self._post([self._row("Kid")]).status_code, 401)
@@ -11,16 +11,25 @@ urlpatterns = [
     path("logout/", views.logout_view, name="logout"),
     path("api/profile/", views.profile_api, name="profile_api"),
     path("api/public/profile/", views.public_profile_api, name="public_profile_api"),
+    path("api/directory/search/", views.member_directory_search_api, name="member_directory_search_api"),
+    path("api/stats/demographics/", views.demographics_stats_api, name="demographics_stats_api"),
+    path("api/birthdays/", views.birthdays_api, name="birthdays_api"),
+    path("api/member-details/bulk/", views.member_detail_bulk_add_api, name="member_detail_bulk_add_api"),
 
     path("api/members/create/", views.member_create_api, name="member_create_api"),
     path("api/members/pending/", views.pending_member_requests_api, name="pending_member_requests_api"),
     path("api/members/<int:member_no>/approve/", views.approve_member_api, name="approve_member_api"),
     path("api/members/<int:member_no>/reject/", views.reject_member_api, name="reject_member_api"),
+    path("api/members/bulk-approve/", views.bulk_approve_members_api, name="bulk_approve_members_api"),
+    path("api/members/bulk-reject/", views.bulk_reject_members_api, name="bulk_reject_members_api"),
+    path("api/members/export/", views.member_export_api, name="member_export_api"),
     path("reset-password/<str:token>/", views.reset_password_with_token, name="reset_password_with_token"),
 
     path("api/master/countries/", views.country_list_api, name="country_list_api"),
     path("api/master/states/", views.state_list_api, name="state_list_api"),
     path("api/master/cities/", views.city_list_api, name="city_list_api"),
+    path("api/master/cities/search/", views.city_search_api, name="city_search_api"),
+    path("api/master/states/search/", views.state_search_api, name="state_search_api"),
     path("api/master/locations/", views.location_relation_api, name="location_relation_api"),
 
     path("members/create/", views.member_create_page, name="member_create_page"),
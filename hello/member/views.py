@@ -1,19 +1,44 @@
 import json
-from datetime import date
+from datetime import date, datetime
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
-from django.db.models import Count
-from django.http import JsonResponse
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_GET, require_http_methods
+from django.views.decorators.http import etag, require_GET, require_http_methods
 
+from .birthdays import _full_name, birthdays_on, serialize_birthdays
+from .emails import queue_approval_email, queue_approval_emails, queue_request_received_email
+from .exports import EXPORT_FORMATS, households_export_response
 from .forms import MemberCreateForm, MemberDetailForm, MemberForm
-from .models import City, Country, Member, MemberDetail, MemberPasswordResetToken, State
+from .images import prepare_profile_image, profile_image_variant_urls
+from .locations import get_location_snapshot, get_location_version, iter_location_tree, location_etag
+from .middleware import get_logged_in_member
+from .models import (
+    DemographicsSnapshot,
+    Member,
+    MemberDetail,
+    MemberPasswordResetToken,
+    MemberStats,
+    sync_birthday_fields,
+)
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .profile_cache import cache_public_profile, get_cached_public_profile
+from .search import member_search_q, search_available, search_member_nos
+
+BULK_MEMBER_ACTION_LIMIT = 500
+BULK_MEMBER_DETAIL_LIMIT = 50
+PENDING_PAGE_SIZE = 50
+PENDING_PAGE_SIZE_MAX = 200
+DIRECTORY_PAGE_SIZE = 20
+DIRECTORY_PAGE_SIZE_MAX = 100
 
 
 def _abs_media_url(request, file_field):
@@ -25,6 +50,10 @@ def _abs_media_url(request, file_field):
         return None
 
 
+def _abs_variant_urls(request, obj):
+    return {name: request.build_absolute_uri(url) for name, url in profile_image_variant_urls(obj).items()}
+
+
 def _safe_int(value):
     try:
         return int(value)
@@ -32,11 +61,24 @@ def _safe_int(value):
         return None
 
 
-def _calc_age(dob):
-    if not dob:
-        return None
-    today = date.today()
-    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+def _search_limit(request, default=10, maximum=50):
+    limit = _safe_int(request.GET.get("limit"))
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def _is_truthy(value):
+    return (value or "").strip().lower() in ("1", "true", "yes")
+
+
+def _stream_location_tree(snapshot, countries, state_obj):
+    # Same document as the non-streaming response, emitted one country at a
+    # time so large trees are never held in memory as a whole.
+    yield '{"results": ['
+    for idx, node in enumerate(iter_location_tree(snapshot, countries, state=state_obj)):
+        yield (", " if idx else "") + json.dumps(node, cls=DjangoJSONEncoder)
+    yield f'], "count": {len(countries)}}}'
 
 
 def _build_reset_link(token, request=None):
@@ -47,176 +89,13 @@ def _build_reset_link(token, request=None):
     return f"{base_url}{path}"
 
 
-def _send_approval_email(member, reset_link):
-    if not member.email_id:
-        return False, "Member email not available"
-
-    subject = "Your Account Is Approved - Set Your Password"
-    text_message = (
-        f"Hello {member.first_name},\n\n"
-        "Your account request has been approved.\n"
-        f"Username: {member.username}\n"
-        "For security, password is not sent in email.\n"
-        "Use this one-time link to set your password:\n"
-        f"{reset_link}\n\n"
-        "This link will expire and can be used only once."
-    )
-    display_name = member.first_name or "Member"
-    username = member.username or member.email_id or ""
-    html_message = f"""<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Membership Approved</title>
-</head>
-<body style="margin:0;padding:0;background:#f2f3f5;font-family:Arial,sans-serif;color:#111;">
-  <table width="100%" cellpadding="0" cellspacing="0" style="padding:24px 12px;">
-    <tr>
-      <td align="center">
-        <table width="700" cellpadding="0" cellspacing="0" style="max-width:700px;background:#ffffff;">
-          <tr>
-            <td style="background:#000;padding:28px 32px;color:#fff;">
-              <div style="font-size:34px;font-weight:700;letter-spacing:1px;">Community Portal</div>
-              <div style="font-size:12px;opacity:.85;margin-top:6px;">membership approval update</div>
-            </td>
-          </tr>
-          <tr>
-            <td style="padding:30px 32px;">
-              <p style="margin:0 0 18px 0;font-size:18px;">Hello {display_name},</p>
-              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
-                Your membership request has been <strong>approved</strong>.
-              </p>
-              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
-                <strong>Username:</strong> {username}<br>
-                <strong>Password:</strong> Not shared by email for security.
-              </p>
-              <p style="margin:0 0 22px 0;font-size:18px;line-height:1.6;">
-                Click below to set your password and activate your account.
-              </p>
-              <table cellpadding="0" cellspacing="0" style="margin:0 0 18px 0;">
-                <tr>
-                  <td bgcolor="#007bff" style="border-radius:4px;">
-                    <a href="{reset_link}" style="display:inline-block;padding:12px 22px;color:#fff;text-decoration:none;font-size:14px;font-weight:700;">Set Password</a>
-                  </td>
-                </tr>
-              </table>
-              <p style="margin:0;font-size:13px;line-height:1.6;color:#555;">
-                This link is one-time use and will expire automatically.
-              </p>
-            </td>
-          </tr>
-          <tr>
-            <td style="padding:16px 32px;background:#f7f7f8;color:#666;font-size:12px;">
-              &copy; 2026 Community Portal
-            </td>
-          </tr>
-        </table>
-      </td>
-    </tr>
-  </table>
-</body>
-</html>"""
-
-    try:
-        email = EmailMultiAlternatives(
-            subject,
-            text_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [member.email_id],
-            reply_to=[settings.REPLY_TO_EMAIL],
-        )
-        email.attach_alternative(html_message, "text/html")
-        sent = email.send(fail_silently=False)
-        if sent > 0:
-            return True, None
-        return False, "Email backend returned 0 sent emails"
-    except Exception as exc:
-        return False, f"{exc.__class__.__name__}: {exc}"
-
-
-def _send_request_received_email(member):
-    if not member.email_id:
-        return False, "Member email not available"
-
-    subject = "Member Request Received"
-    text_message = (
-        f"Hello {member.first_name},\n\n"
-        "Your membership request has been received successfully.\n"
-        "Your account is currently Pending approval by superadmin.\n\n"
-        "You will receive login credentials after approval."
-    )
-    display_name = member.first_name or "Member"
-    html_message = f"""<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Member Request Received</title>
-</head>
-<body style="margin:0;padding:0;background:#f2f3f5;font-family:Arial,sans-serif;color:#111;">
-  <table width="100%" cellpadding="0" cellspacing="0" style="padding:24px 12px;">
-    <tr>
-      <td align="center">
-        <table width="700" cellpadding="0" cellspacing="0" style="max-width:700px;background:#ffffff;">
-          <tr>
-            <td style="background:#000;padding:28px 32px;color:#fff;">
-              <div style="font-size:34px;font-weight:700;letter-spacing:1px;">Community Portal</div>
-              <div style="font-size:12px;opacity:.85;margin-top:6px;">membership request update</div>
-            </td>
-          </tr>
-          <tr>
-            <td style="padding:30px 32px;">
-              <p style="margin:0 0 18px 0;font-size:18px;">Hello {display_name},</p>
-              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
-                Your membership request has been received successfully.
-              </p>
-              <p style="margin:0 0 18px 0;font-size:18px;line-height:1.6;">
-                Current status: <strong>Pending superadmin approval</strong>.
-              </p>
-              <p style="margin:0;font-size:14px;line-height:1.6;color:#555;">
-                You will receive the next email after approval.
-              </p>
-            </td>
-          </tr>
-          <tr>
-            <td style="padding:16px 32px;background:#f7f7f8;color:#666;font-size:12px;">
-              &copy; 2026 Community Portal
-            </td>
-          </tr>
-        </table>
-      </td>
-    </tr>
-  </table>
-</body>
-</html>"""
-
-    try:
-        email = EmailMultiAlternatives(
-            subject,
-            text_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [member.email_id],
-            reply_to=[settings.REPLY_TO_EMAIL],
-        )
-        email.attach_alternative(html_message, "text/html")
-        sent = email.send(
-            fail_silently=False,
-        )
-        if sent > 0:
-            return True, None
-        return False, "Email backend returned 0 sent emails"
-    except Exception as exc:
-        return False, f"{exc.__class__.__name__}: {exc}"
-
-
 def _approve_member_and_send_email(member, approver, request=None):
     if member.approval_status == "Approved":
         return {
             "ok": False,
             "error": "Member already approved",
             "credentials": None,
-            "email_sent": False,
+            "email_queued": False,
             "email_error": None,
         }
 
@@ -225,8 +104,8 @@ def _approve_member_and_send_email(member, approver, request=None):
         ttl_minutes = int(getattr(settings, "PASSWORD_RESET_TOKEN_MINUTES", 30))
         token_obj = MemberPasswordResetToken.create_for_member(member, ttl_minutes=ttl_minutes)
         reset_link = _build_reset_link(token_obj.token, request=request)
+        email_queued, email_error = queue_approval_email(member, reset_link)
 
-    email_sent, email_error = _send_approval_email(member, reset_link)
     return {
         "ok": True,
         "error": None,
@@ -234,7 +113,7 @@ def _approve_member_and_send_email(member, approver, request=None):
             "username": member.username,
             "set_password_link": reset_link,
         },
-        "email_sent": email_sent,
+        "email_queued": email_queued,
         "email_error": email_error,
     }
 
@@ -274,6 +153,7 @@ def _serialize_member(member, request):
         "approval_status": member.approval_status,
         "approved_at": member.approved_at.isoformat() if member.approved_at else None,
         "profile_image_url": _abs_media_url(request, member.profile_image),
+        "profile_image_variants": _abs_variant_urls(request, member),
         "created_at": member.created_at.isoformat() if member.created_at else None,
         "updated_at": member.updated_at.isoformat() if member.updated_at else None,
     }
@@ -298,21 +178,12 @@ def _serialize_member_detail(detail, request):
         "marital_status_label": detail.get_marital_status_display() if detail.marital_status else None,
         "education": detail.education,
         "profile_image_url": _abs_media_url(request, detail.profile_image),
+        "profile_image_variants": _abs_variant_urls(request, detail),
         "created_at": detail.created_at.isoformat() if detail.created_at else None,
         "updated_at": detail.updated_at.isoformat() if detail.updated_at else None,
     }
 
 
-def get_logged_in_member(request):
-    member_no = request.session.get("member_no")
-    if not member_no:
-        return None
-    try:
-        return Member.objects.get(member_no=member_no)
-    except Member.DoesNotExist:
-        return None
-
-
 def customer_login(request):
     if request.method == "POST":
         username = request.POST.get("username")
@@ -344,16 +215,18 @@ def dashboard(request):
     if not member:
         return redirect("member:customer_login")
 
-    members = Member.objects.filter(member_no=member.member_no).annotate(detail_count=Count("details"))
-    member_details = MemberDetail.objects.filter(member_no=member)
+    stats = MemberStats.for_member(member)
+    member.detail_count = stats.detail_count
+    members = [member]
+    member_details = MemberDetail.objects.filter(member_no=member).select_related("member_no", "created_by", "updated_by")
 
     context = {
         "member": member,
         "members": members,
         "member_details": member_details,
-        "total_members": members.count(),
-        "total_details": member_details.count(),
-        "total_all": members.count() + member_details.count(),
+        "total_members": len(members),
+        "total_details": stats.detail_count,
+        "total_all": len(members) + stats.detail_count,
     }
 
     return render(request, "html_member/dashboard.html", context)
@@ -409,9 +282,7 @@ def member_create_api(request):
     if not form.is_valid():
         return JsonResponse({"status": "error", "errors": form.errors}, status=400)
 
-    cleaned = form.cleaned_data
     member = form.save(commit=False)
-    member.age = _calc_age(cleaned.get("date_of_birth"))
     member.status = "Inactive"
     member.approval_status = "Pending"
     member.username = None
@@ -422,15 +293,16 @@ def member_create_api(request):
         member.created_by = logged_in_member.user
         member.updated_by = logged_in_member.user
 
-    member.save()
-    request_email_sent, request_email_error = _send_request_received_email(member)
+    with transaction.atomic():
+        member.save()
+        request_email_queued, request_email_error = queue_request_received_email(member)
 
     return JsonResponse(
         {
             "status": "success",
             "message": "Member request submitted. Waiting for superadmin approval.",
             "member": _serialize_member(member, request),
-            "request_email_sent": request_email_sent,
+            "request_email_queued": request_email_queued,
             "request_email_error": request_email_error,
         },
         status=201,
@@ -446,9 +318,50 @@ def pending_member_requests_api(request):
     if not _require_superadmin(request):
         return JsonResponse({"detail": "Superadmin access required"}, status=403)
 
-    qs = Member.objects.filter(approval_status="Pending").order_by("-created_at")
-    data = [_serialize_member(member, request) for member in qs]
-    return JsonResponse({"results": data, "count": len(data)})
+    page_size = _safe_int(request.GET.get("page_size")) or PENDING_PAGE_SIZE
+    page_size = max(1, min(page_size, PENDING_PAGE_SIZE_MAX))
+
+    qs = (
+        Member.objects
+        .select_related("country", "state", "city")
+        .filter(approval_status="Pending")
+        .order_by("-created_at", "-member_no")
+    )
+
+    cursor = (request.GET.get("cursor") or "").strip()
+    if cursor:
+        try:
+            created_at, member_no = decode_cursor(cursor, datetime, int)
+        except InvalidCursor as exc:
+            return JsonResponse({"detail": str(exc)}, status=400)
+        qs = qs.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, member_no__lt=member_no)
+        )
+
+    members = list(qs[:page_size + 1])
+    has_next = len(members) > page_size
+    members = members[:page_size]
+    data = [_serialize_member(member, request) for member in members]
+
+    next_cursor = None
+    next_url = None
+    if has_next:
+        last = members[-1]
+        next_cursor = encode_cursor(last.created_at, last.member_no)
+        next_params = request.GET.copy()
+        next_params["cursor"] = next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{next_params.urlencode()}")
+
+    return JsonResponse(
+        {
+            "results": data,
+            "count": len(data),
+            "page_size": page_size,
+            "has_next": has_next,
+            "next_cursor": next_cursor,
+            "next": next_url,
+        }
+    )
 
 
 @csrf_exempt
@@ -471,7 +384,7 @@ def approve_member_api(request, member_no):
             "message": "Member approved successfully",
             "member": _serialize_member(member, request),
             "credentials": result["credentials"],
-            "email_sent": result["email_sent"],
+            "email_queued": result["email_queued"],
             "email_error": result["email_error"],
         }
     )
@@ -491,6 +404,203 @@ def reject_member_api(request, member_no):
     return JsonResponse({"status": "success", "message": "Member marked as not approved"})
 
 
+def _parse_member_nos(request):
+    if request.content_type and "application/json" in request.content_type:
+        try:
+            payload = json.loads(request.body.decode("utf-8") or "{}")
+        except json.JSONDecodeError:
+            return None, "Invalid JSON payload"
+        if isinstance(payload, list):
+            raw_ids = payload
+        elif isinstance(payload, dict):
+            raw_ids = payload.get("member_nos") or payload.get("ids") or []
+        else:
+            raw_ids = []
+    else:
+        raw_ids = request.POST.getlist("member_nos") or request.POST.getlist("ids")
+        if len(raw_ids) == 1 and "," in str(raw_ids[0]):
+            raw_ids = raw_ids[0].split(",")
+
+    if not isinstance(raw_ids, list):
+        return None, "member_nos must be a list"
+
+    member_nos = []
+    for raw in raw_ids:
+        value = _safe_int(raw)
+        if value is None:
+            return None, f"Invalid member_no value: {raw}"
+        if value not in member_nos:
+            member_nos.append(value)
+
+    if not member_nos:
+        return None, "Pass a non-empty member_nos list"
+    if len(member_nos) > BULK_MEMBER_ACTION_LIMIT:
+        return None, f"At most {BULK_MEMBER_ACTION_LIMIT} members per request"
+    return member_nos, None
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def bulk_approve_members_api(request):
+    if not _require_superadmin(request):
+        return JsonResponse({"detail": "Superadmin access required"}, status=403)
+
+    member_nos, error = _parse_member_nos(request)
+    if error:
+        return JsonResponse({"detail": error}, status=400)
+
+    existing = dict(
+        Member.objects.filter(member_no__in=member_nos).values_list("member_no", "approval_status")
+    )
+
+    ttl_minutes = int(getattr(settings, "PASSWORD_RESET_TOKEN_MINUTES", 30))
+    with transaction.atomic():
+        approved = Member.bulk_approve(member_nos, approver=request.user)
+        tokens = MemberPasswordResetToken.bulk_create_for_members(approved, ttl_minutes=ttl_minutes)
+        reset_links = {
+            member_no: _build_reset_link(token.token, request=request)
+            for member_no, token in tokens.items()
+        }
+        email_results = queue_approval_emails(approved, reset_links)
+
+    approved_by_no = {member.member_no: member for member in approved}
+    results = {}
+    for member_no in member_nos:
+        member = approved_by_no.get(member_no)
+        if member:
+            email_queued, email_error = email_results[member_no]
+            results[str(member_no)] = {
+                "ok": True,
+                "status": "approved",
+                "credentials": {
+                    "username": member.username,
+                    "set_password_link": reset_links[member_no],
+                },
+                "email_queued": email_queued,
+                "email_error": email_error,
+            }
+        elif member_no not in existing:
+            results[str(member_no)] = {"ok": False, "status": "not_found", "error": "Member not found"}
+        else:
+            results[str(member_no)] = {"ok": False, "status": "skipped", "error": "Member already approved"}
+
+    return JsonResponse(
+        {
+            "status": "success",
+            "message": f"Approved {len(approved)} member(s)",
+            "approved_count": len(approved),
+            "results": results,
+        }
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def bulk_reject_members_api(request):
+    if not _require_superadmin(request):
+        return JsonResponse({"detail": "Superadmin access required"}, status=403)
+
+    member_nos, error = _parse_member_nos(request)
+    if error:
+        return JsonResponse({"detail": error}, status=400)
+
+    with transaction.atomic():
+        rejected = set(Member.bulk_mark_not_approved(member_nos, approver=request.user))
+
+    results = {}
+    for member_no in member_nos:
+        if member_no in rejected:
+            results[str(member_no)] = {"ok": True, "status": "not_approved"}
+        else:
+            results[str(member_no)] = {"ok": False, "status": "not_found", "error": "Member not found"}
+
+    return JsonResponse(
+        {
+            "status": "success",
+            "message": f"Marked {len(rejected)} member(s) as not approved",
+            "rejected_count": len(rejected),
+            "results": results,
+        }
+    )
+
+
+@require_GET
+def birthdays_api(request):
+    member = get_logged_in_member(request)
+    if not member:
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+
+    raw_date = (request.GET.get("date") or "").strip()
+    try:
+        day = date.fromisoformat(raw_date) if raw_date else timezone.localdate()
+    except ValueError:
+        return JsonResponse({"detail": "date must be YYYY-MM-DD"}, status=400)
+
+    scope = (request.GET.get("scope") or "community").strip().lower()
+    if scope not in ("community", "household"):
+        return JsonResponse({"detail": "scope must be community or household"}, status=400)
+
+    members, details = birthdays_on(day, member.member_no if scope == "household" else None)
+    data = serialize_birthdays(members, details, day)
+    return JsonResponse({"date": day.isoformat(), "scope": scope, **data})
+
+
+@require_GET
+def demographics_stats_api(request):
+    if not (request.user.is_authenticated and request.user.is_staff) and not get_logged_in_member(request):
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+
+    # Empty until `manage.py rebuild_demographics` has run once; a read never
+    # builds it, so concurrent requests cannot race to rebuild the table.
+    rows = list(DemographicsSnapshot.objects.all())
+
+    populations = {}
+    combined = {}
+    for row in rows:
+        if not row.count and row.dimension != "total":
+            continue
+        entry = {"bucket": row.bucket, "label": row.label, "count": row.count}
+        populations.setdefault(row.population, {}).setdefault(row.dimension, []).append(entry)
+
+        dimension = combined.setdefault(row.dimension, {})
+        if row.bucket in dimension:
+            dimension[row.bucket]["count"] += row.count
+        else:
+            dimension[row.bucket] = dict(entry)
+
+    return JsonResponse(
+        {
+            "updated_at": max(row.updated_at for row in rows) if rows else None,
+            "members": populations.get(DemographicsSnapshot.POPULATION_MEMBER, {}),
+            "family_members": populations.get(DemographicsSnapshot.POPULATION_DETAIL, {}),
+            "all": {
+                dimension: sorted(buckets.values(), key=lambda item: (-item["count"], item["bucket"]))
+                for dimension, buckets in combined.items()
+            },
+        }
+    )
+
+
+@require_GET
+def member_export_api(request):
+    if not _require_superadmin(request):
+        return JsonResponse({"detail": "Superadmin access required"}, status=403)
+
+    fmt = (request.GET.get("format") or "csv").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({"detail": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    qs = Member.objects.all()
+    approval_status = (request.GET.get("approval_status") or "").strip()
+    if approval_status:
+        qs = qs.filter(approval_status=approval_status)
+    status = (request.GET.get("status") or "").strip()
+    if status:
+        qs = qs.filter(status=status)
+
+    return households_export_response(qs, fmt)
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
 def reset_password_with_token(request, token):
@@ -552,143 +662,132 @@ def reset_password_with_token(request, token):
     )
 
 @require_GET
+@etag(location_etag)
 def country_list_api(request):
-    countries = list(Country.objects.values("id", "name").order_by("name"))
-    return JsonResponse({"results": countries})
+    snapshot = get_location_snapshot()
+    return JsonResponse({"results": snapshot.countries})
 
 
 @require_GET
+@etag(location_etag)
 def state_list_api(request):
     country_id = _safe_int(request.GET.get("country_id"))
+    snapshot = get_location_snapshot()
 
-    qs = State.objects.select_related("country").all()
+    data = snapshot.states
     if country_id:
-        if not Country.objects.filter(id=country_id).exists():
+        if country_id not in snapshot.country_by_id:
             return JsonResponse({"detail": "country_id not found"}, status=404)
-        qs = qs.filter(country_id=country_id)
+        data = snapshot.states_by_country.get(country_id, [])
 
-    data = [
-        {
-            "id": st.id,
-            "name": st.name,
-            "country_id": st.country_id,
-            "country_name": st.country.name if st.country else None,
-        }
-        for st in qs.order_by("name")
-    ]
     return JsonResponse({"results": data, "count": len(data)})
 
 
 @require_GET
+@etag(location_etag)
 def city_list_api(request):
     country_id = _safe_int(request.GET.get("country_id"))
     state_id = _safe_int(request.GET.get("state_id"))
+    snapshot = get_location_snapshot()
 
     state_obj = None
     if state_id:
-        state_obj = State.objects.select_related("country").filter(id=state_id).first()
+        state_obj = snapshot.state_by_id.get(state_id)
         if not state_obj:
             return JsonResponse({"detail": "state_id not found"}, status=404)
 
     if country_id:
-        if not Country.objects.filter(id=country_id).exists():
+        if country_id not in snapshot.country_by_id:
             return JsonResponse({"detail": "country_id not found"}, status=404)
 
-    if state_obj and country_id and state_obj.country_id != country_id:
+    if state_obj and country_id and state_obj["country_id"] != country_id:
         return JsonResponse({"detail": "state_id does not belong to country_id"}, status=400)
 
-    qs = City.objects.select_related("country", "state").all()
+    data = snapshot.cities
     if state_obj:
-        qs = qs.filter(state_id=state_obj.id)
+        data = snapshot.cities_by_state.get(state_obj["id"], [])
     elif country_id:
-        qs = qs.filter(country_id=country_id)
+        data = snapshot.cities_by_country.get(country_id, [])
 
-    data = [
-        {
-            "id": city.id,
-            "name": city.name,
-            "country_id": city.country_id,
-            "country_name": city.country.name if city.country else None,
-            "state_id": city.state_id,
-            "state_name": city.state.name if city.state else None,
-        }
-        for city in qs.order_by("name")
-    ]
     return JsonResponse({"results": data, "count": len(data)})
 
 
 @require_GET
+@etag(location_etag)
+def city_search_api(request):
+    query = (request.GET.get("q") or "").strip()
+    country_id = _safe_int(request.GET.get("country_id"))
+    state_id = _safe_int(request.GET.get("state_id"))
+    limit = _search_limit(request)
+    snapshot = get_location_snapshot()
+
+    state_obj = None
+    if state_id:
+        state_obj = snapshot.state_by_id.get(state_id)
+        if not state_obj:
+            return JsonResponse({"detail": "state_id not found"}, status=404)
+
+    if country_id:
+        if country_id not in snapshot.country_by_id:
+            return JsonResponse({"detail": "country_id not found"}, status=404)
+
+    if state_obj and country_id and state_obj["country_id"] != country_id:
+        return JsonResponse({"detail": "state_id does not belong to country_id"}, status=400)
+
+    data = snapshot.search_cities(query, country_id=country_id, state_id=state_id, limit=limit)
+    return JsonResponse({"results": data, "count": len(data)})
+
+
+@require_GET
+@etag(location_etag)
+def state_search_api(request):
+    query = (request.GET.get("q") or "").strip()
+    country_id = _safe_int(request.GET.get("country_id"))
+    limit = _search_limit(request)
+    snapshot = get_location_snapshot()
+
+    if country_id:
+        if country_id not in snapshot.country_by_id:
+            return JsonResponse({"detail": "country_id not found"}, status=404)
+
+    data = snapshot.search_states(query, country_id=country_id, limit=limit)
+    return JsonResponse({"results": data, "count": len(data)})
+
+
+@require_GET
+@etag(location_etag)
 def location_relation_api(request):
     country_id = _safe_int(request.GET.get("country_id"))
     state_id = _safe_int(request.GET.get("state_id"))
+    snapshot = get_location_snapshot()
 
     state_obj = None
     if state_id:
-        state_obj = State.objects.select_related("country").filter(id=state_id).first()
+        state_obj = snapshot.state_by_id.get(state_id)
         if not state_obj:
             return JsonResponse({"detail": "state_id not found"}, status=404)
 
-    if state_obj and country_id and state_obj.country_id != country_id:
+    if state_obj and country_id and state_obj["country_id"] != country_id:
         return JsonResponse({"detail": "state_id does not belong to country_id"}, status=400)
 
-    country_qs = Country.objects.all()
+    countries = snapshot.countries
     if country_id:
-        country_qs = country_qs.filter(id=country_id)
-        if not country_qs.exists():
+        if country_id not in snapshot.country_by_id:
             return JsonResponse({"detail": "country_id not found"}, status=404)
+        countries = [snapshot.country_by_id[country_id]]
     if state_obj:
-        country_qs = country_qs.filter(id=state_obj.country_id)
+        countries = [c for c in countries if c["id"] == state_obj["country_id"]]
 
-    countries = list(country_qs.order_by("name").values("id", "name"))
     if not countries:
         return JsonResponse({"results": [], "count": 0})
 
-    country_ids = [item["id"] for item in countries]
-    state_qs = State.objects.filter(country_id__in=country_ids)
-    if state_obj:
-        state_qs = state_qs.filter(id=state_obj.id)
-    states = list(
-        state_qs
-        .order_by("name")
-        .values("id", "name", "country_id")
-    )
-    city_qs = City.objects.filter(country_id__in=country_ids)
-    if state_obj:
-        city_qs = city_qs.filter(state_id=state_obj.id)
-    cities = list(
-        city_qs
-        .order_by("name")
-        .values("id", "name", "country_id", "state_id")
-    )
-
-    states_by_country = {}
-    for st in states:
-        states_by_country.setdefault(st["country_id"], []).append(
-            {"id": st["id"], "name": st["name"], "cities": []}
-        )
-
-    cities_without_state_by_country = {}
-    for city in cities:
-        city_data = {"id": city["id"], "name": city["name"]}
-        if city["state_id"]:
-            for st in states_by_country.get(city["country_id"], []):
-                if st["id"] == city["state_id"]:
-                    st["cities"].append(city_data)
-                    break
-        else:
-            cities_without_state_by_country.setdefault(city["country_id"], []).append(city_data)
-
-    results = []
-    for c in countries:
-        results.append(
-            {
-                "id": c["id"],
-                "name": c["name"],
-                "states": states_by_country.get(c["id"], []),
-                "cities_without_state": cities_without_state_by_country.get(c["id"], []),
-            }
+    if _is_truthy(request.GET.get("stream")):
+        return StreamingHttpResponse(
+            _stream_location_tree(snapshot, countries, state_obj),
+            content_type="application/json",
         )
 
+    results = list(iter_location_tree(snapshot, countries, state=state_obj))
     return JsonResponse({"results": results, "count": len(results)})
 
 
@@ -715,6 +814,101 @@ def member_detail_add(request):
     return render(request, "html_member/member_detail_add.html", {"form": form, "member": member})
 
 
+def _parse_member_detail_rows(request):
+    # JSON body, or multipart with the rows as JSON in "members" and each
+    # row's image uploaded as profile_image_<index>.
+    if request.content_type and "application/json" in request.content_type:
+        try:
+            payload = json.loads(request.body.decode("utf-8") or "[]")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None, "Invalid JSON payload"
+    else:
+        try:
+            payload = json.loads(request.POST.get("members") or "[]")
+        except json.JSONDecodeError:
+            return None, "members must be a JSON array"
+
+    if isinstance(payload, dict):
+        payload = payload.get("members")
+    if not isinstance(payload, list) or not payload:
+        return None, "Provide a non-empty members list"
+    if len(payload) > BULK_MEMBER_DETAIL_LIMIT:
+        return None, f"At most {BULK_MEMBER_DETAIL_LIMIT} family members per request"
+    if not all(isinstance(row, dict) for row in payload):
+        return None, "Each family member must be a JSON object"
+    return payload, None
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def member_detail_bulk_add_api(request):
+    member = get_logged_in_member(request)
+    if not member:
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+
+    rows, error = _parse_member_detail_rows(request)
+    if error:
+        return JsonResponse({"detail": error}, status=400)
+
+    details = []
+    results = []
+    for index, row in enumerate(rows):
+        files = {}
+        if f"profile_image_{index}" in request.FILES:
+            files["profile_image"] = request.FILES[f"profile_image_{index}"]
+        form = MemberDetailForm(row, files)
+        if form.is_valid():
+            detail = form.save(commit=False)
+            detail.member_no = member
+            detail.created_by = member
+            detail.updated_by = member
+            details.append(detail)
+            results.append({"index": index, "ok": True})
+        else:
+            results.append({"index": index, "ok": False, "errors": form.errors})
+
+    # All or nothing, so a household can be resubmitted as a whole.
+    if len(details) != len(rows):
+        return JsonResponse(
+            {
+                "status": "error",
+                "message": "No family members were saved; fix the rows with errors and resubmit",
+                "results": results,
+            },
+            status=400,
+        )
+
+    # bulk_create() skips save() and the post_save handlers, so do their work here.
+    for detail in details:
+        sync_birthday_fields(detail)
+        prepare_profile_image(detail)
+    with transaction.atomic():
+        MemberDetail.objects.bulk_create(details)
+        MemberStats.rebuild([member.member_no])
+        DemographicsSnapshot.add_rows(
+            DemographicsSnapshot.POPULATION_DETAIL,
+            [
+                DemographicsSnapshot.buckets_for(
+                    tuple(getattr(detail, name) for name in DemographicsSnapshot.DEMOGRAPHIC_FIELDS),
+                    member.city_id,
+                )
+                for detail in details
+            ],
+        )
+
+    for result, detail in zip(results, details):
+        result["member_detail"] = _serialize_member_detail(detail, request)
+    return JsonResponse(
+        {
+            "status": "success",
+            "message": f"Saved {len(details)} family member(s)",
+            "created_count": len(details),
+            "results": results,
+        },
+        status=201,
+    )
+
+
 def member_edit(request):
     member = get_logged_in_member(request)
     if not member:
@@ -769,25 +963,19 @@ def profile(request):
     if not member:
         return redirect("member:customer_login")
 
-    from marketplace.models import BnsModel
-    from news.models import News
-
-    member_details_qs = MemberDetail.objects.filter(member_no=member)
-    latest_detail = member_details_qs.order_by("-created_at").first()
-    latest_news = News.objects.filter(created_by=member).order_by("-created_at").first()
-    latest_listing = BnsModel.objects.filter(created_by=member).order_by("-created_at").first()
+    stats = MemberStats.for_member(member)
 
     return render(
         request,
         "html_member/profile.html",
         {
             "member": member,
-            "detail_count": member_details_qs.count(),
-            "news_count": News.objects.filter(created_by=member).count(),
-            "listing_count": BnsModel.objects.filter(created_by=member).count(),
-            "latest_detail": latest_detail,
-            "latest_news": latest_news,
-            "latest_listing": latest_listing,
+            "detail_count": stats.detail_count,
+            "news_count": stats.news_count,
+            "listing_count": stats.listing_count,
+            "latest_detail": stats.latest_detail,
+            "latest_news": stats.latest_news,
+            "latest_listing": stats.latest_listing,
         },
     )
 
@@ -800,20 +988,17 @@ def profile_api(request):
     if not member:
         return JsonResponse({"detail": "Authentication required"}, status=401)
 
-    from marketplace.models import BnsModel
-    from news.models import News
-
-    details_qs = MemberDetail.objects.filter(member_no=member).order_by("-created_at")
-    latest_detail = details_qs.first()
-    latest_news = News.objects.filter(created_by=member).order_by("-created_at").first()
-    latest_listing = BnsModel.objects.filter(created_by=member).order_by("-created_at").first()
+    stats = MemberStats.for_member(member)
+    latest_detail = stats.latest_detail
+    latest_news = stats.latest_news
+    latest_listing = stats.latest_listing
 
     response = {
         "member": _serialize_member(member, request),
         "counts": {
-            "details": details_qs.count(),
-            "news": News.objects.filter(created_by=member).count(),
-            "listings": BnsModel.objects.filter(created_by=member).count(),
+            "details": stats.detail_count,
+            "news": stats.news_count,
+            "listings": stats.listing_count,
         },
         "latest_detail": _serialize_member_detail(latest_detail, request),
         "latest_news": {
@@ -845,27 +1030,8 @@ def profile_api(request):
     return JsonResponse(response)
 
 
-def public_profile_api(request):
-    if request.method != "GET":
-        return JsonResponse({"detail": "Method not allowed"}, status=405)
-
-    member_no = (request.GET.get("member_no") or "").strip()
-    username = (request.GET.get("username") or "").strip()
-
-    if not member_no and not username:
-        return JsonResponse({"detail": "Pass member_no or username as query parameter"}, status=400)
-
-    qs = Member.objects.all()
-    if member_no:
-        qs = qs.filter(member_no=member_no)
-    else:
-        qs = qs.filter(username=username)
-
-    member = qs.first()
-    if not member:
-        return JsonResponse({"detail": "Member not found"}, status=404)
-
-    data = {
+def _serialize_public_profile(member):
+    return {
         "member_no": member.member_no,
         "first_name": member.first_name,
         "middle_name": member.middle_name,
@@ -891,9 +1057,125 @@ def public_profile_api(request):
         "marital_status": member.marital_status,
         "marital_status_label": member.get_marital_status_display() if member.marital_status else None,
         "education": member.education,
-        "profile_image_url": _abs_media_url(request, member.profile_image),
     }
-    return JsonResponse({"result": data})
+
+
+def public_profile_api(request):
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
+    member_no = (request.GET.get("member_no") or "").strip()
+    username = (request.GET.get("username") or "").strip()
+
+    if not member_no and not username:
+        return JsonResponse({"detail": "Pass member_no or username as query parameter"}, status=400)
+
+    member_no_value = _safe_int(member_no) if member_no else None
+    if member_no and member_no_value is None:
+        return JsonResponse({"detail": "Member not found"}, status=404)
+
+    # Read the version before querying so a location edit that lands mid-request
+    # cannot be cached under the newer version.
+    location_version = get_location_version()
+    if member_no:
+        entry = get_cached_public_profile(location_version, member_no=member_no_value)
+    else:
+        entry = get_cached_public_profile(location_version, username=username)
+
+    if entry is None:
+        qs = Member.objects.select_related("country", "state", "city")
+        if member_no:
+            qs = qs.filter(member_no=member_no_value)
+        else:
+            qs = qs.filter(username=username)
+
+        member = qs.first()
+        if not member:
+            return JsonResponse({"detail": "Member not found"}, status=404)
+        entry = cache_public_profile(member, _serialize_public_profile(member), location_version)
+
+    last_modified = entry["last_modified"]
+    response = get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        data = dict(entry["data"])
+        data["profile_image_url"] = (
+            request.build_absolute_uri(entry["profile_image_path"]) if entry["profile_image_path"] else None
+        )
+        data["profile_image_variants"] = {
+            name: request.build_absolute_uri(path) for name, path in entry.get("profile_image_variants", {}).items()
+        }
+        response = JsonResponse({"result": data})
+
+    response.headers.setdefault("ETag", entry["etag"])
+    if last_modified:
+        response.headers.setdefault("Last-Modified", http_date(last_modified.timestamp()))
+    return response
+
+
+@require_GET
+def member_directory_search_api(request):
+    if not get_logged_in_member(request):
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+
+    query = (request.GET.get("q") or "").strip()
+    if not query:
+        return JsonResponse({"detail": "Pass q as query parameter"}, status=400)
+
+    page = max(1, _safe_int(request.GET.get("page")) or 1)
+    page_size = _safe_int(request.GET.get("page_size")) or DIRECTORY_PAGE_SIZE
+    page_size = max(1, min(page_size, DIRECTORY_PAGE_SIZE_MAX))
+    offset = (page - 1) * page_size
+
+    qs = Member.objects.select_related("country", "state", "city")
+    if search_available():
+        # Ranked ids from the FTS index, then one fetch re-ordered by rank.
+        member_nos = search_member_nos(query, limit=page_size + 1, offset=offset, approved_only=True)
+        members_by_no = qs.in_bulk(member_nos[:page_size])
+        members = [members_by_no[no] for no in member_nos[:page_size] if no in members_by_no]
+        has_next = len(member_nos) > page_size
+    else:
+        members = list(
+            qs.filter(member_search_q(query), approval_status="Approved", status="Active")
+            .order_by("first_name", "surname", "member_no")[offset:offset + page_size + 1]
+        )
+        has_next = len(members) > page_size
+        members = members[:page_size]
+
+    data = [
+        {
+            "member_no": m.member_no,
+            "full_name": _full_name(m),
+            "occupation": m.occupation,
+            "education": m.education,
+            "country": m.country.name if m.country else None,
+            "state": m.state.name if m.state else None,
+            "city": m.city.name if m.city else None,
+            "profile_image_url": _abs_media_url(request, m.profile_image),
+            "profile_image_variants": _abs_variant_urls(request, m),
+        }
+        for m in members
+    ]
+
+    next_url = None
+    if has_next:
+        next_params = request.GET.copy()
+        next_params["page"] = page + 1
+        next_url = request.build_absolute_uri(f"{request.path}?{next_params.urlencode()}")
+
+    return JsonResponse(
+        {
+            "results": data,
+            "count": len(data),
+            "page": page,
+            "page_size": page_size,
+            "has_next": has_next,
+            "next": next_url,
+        }
+    )
 
 
 def memberjson(request):
@@ -7,6 +7,7 @@ from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 from django.urls import reverse
 from .models import News, Category
+from .search import news_search_filter, search_available
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -147,6 +148,14 @@ class NewsAdmin(admin.ModelAdmin): # Rename class to NewsAdmin to avoid conflict
             return HttpResponseRedirect(redirect_url)
         return super().changelist_view(request, extra_context=extra_context)
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = (search_term or "").strip()
+        if not search_term or not search_available():
+            return super().get_search_results(request, queryset, search_term)
+
+        # FTS index lookup instead of icontains over every article body.
+        return queryset.filter(news_search_filter(search_term)), False
+
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.annotate(
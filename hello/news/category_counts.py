@@ -0,0 +1,70 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+
+CATEGORY_COUNTS_VERSION_KEY = "news:category-counts:version"
+
+_counts = None
+_counts_lock = threading.Lock()
+
+
+def get_category_counts_version():
+    version = cache.get(CATEGORY_COUNTS_VERSION_KEY)
+    if version is None:
+        cache.add(CATEGORY_COUNTS_VERSION_KEY, time.time_ns() // 1000, None)
+        version = cache.get(CATEGORY_COUNTS_VERSION_KEY)
+    return version
+
+
+def bump_category_counts_version():
+    # Not cache.incr(): see member.locations.bump_location_version().
+    cache.set(
+        CATEGORY_COUNTS_VERSION_KEY, max(time.time_ns() // 1000, get_category_counts_version() + 1), None
+    )
+
+
+def schedule_category_counts_bump():
+    transaction.on_commit(bump_category_counts_version)
+
+
+def load_category_counts():
+    from .models import Category, News
+
+    counts = dict(
+        News.objects.filter(status="published")
+        .order_by()
+        .values("category_id")
+        .annotate(count=Count("id"))
+        .values_list("category_id", "count")
+    )
+    data = [
+        {"id": c["id"], "name": c["name"], "slug": c["slug"], "count": counts.get(c["id"], 0)}
+        for c in Category.objects.filter(is_active=True).order_by("name").values("id", "name", "slug")
+    ]
+    # Include virtual category for posts where category is null.
+    data.append({"id": 0, "name": "Uncategorized", "slug": "uncategorized", "count": counts.get(None, 0)})
+    return data
+
+
+def get_category_counts():
+    """
+    Published news per active category, kept in process until a News or
+    Category change bumps the cached version.
+    """
+    global _counts
+
+    # Read the version before loading, so a change that lands mid-load
+    # leaves this copy stale and the next request reloads.
+    version = get_category_counts_version()
+    counts = _counts
+    if counts is not None and counts[0] == version:
+        return counts[1]
+
+    with _counts_lock:
+        if _counts is None or _counts[0] != version:
+            _counts = (version, load_category_counts())
+        return _counts[1]
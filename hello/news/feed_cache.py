@@ -0,0 +1,94 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+
+FEED_GENERATION_KEY = "news:feed:generation"
+FEED_RESPONSE_KEY = "news:feed:{generation}:{digest}"
+# A miss that finds another request rebuilding the same page waits this long
+# for its result before building the page itself.
+FEED_BUILD_LOCK_SECONDS = 10
+FEED_BUILD_WAIT_SECONDS = 2.0
+FEED_BUILD_POLL_SECONDS = 0.05
+
+
+def _timeout():
+    return int(getattr(settings, "NEWS_FEED_CACHE_TIMEOUT", 0) or 0)
+
+
+def get_feed_generation():
+    generation = cache.get(FEED_GENERATION_KEY)
+    if generation is None:
+        cache.add(FEED_GENERATION_KEY, time.time_ns() // 1000, None)
+        generation = cache.get(FEED_GENERATION_KEY)
+    return generation
+
+
+def bump_feed_generation():
+    # Not cache.incr(): see member.locations.bump_location_version().
+    cache.set(FEED_GENERATION_KEY, max(time.time_ns() // 1000, get_feed_generation() + 1), None)
+
+
+def schedule_feed_generation_bump():
+    transaction.on_commit(bump_feed_generation)
+
+
+def feed_cache_key(request, generation):
+    # Every parameter is part of the key, empty ones included: the feed
+    # treats "?category_id=" as a filter and echoes the query string into
+    # its next/previous links, which also carry the scheme and host.
+    params = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+    raw = repr((request.build_absolute_uri(request.path), params))
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return FEED_RESPONSE_KEY.format(generation=generation, digest=digest)
+
+
+def _cached_response(entry):
+    content_type, content = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+def cached_feed_response(request, build):
+    """
+    Serve ``build()``'s 200 response from the cache for identical feed
+    requests until the feed generation changes. Concurrent misses for the
+    same page are coalesced: one request builds it while the others poll
+    the cache for its result. The build lock is a cache.add(), so it holds
+    across workers only on a shared backend with an atomic add (Memcached,
+    Redis); with the default LocMemCache it coalesces within one process.
+    """
+    timeout = _timeout()
+    if timeout <= 0 or request.method not in ("GET", "HEAD"):
+        return build()
+
+    key = feed_cache_key(request, get_feed_generation())
+    entry = cache.get(key)
+    if entry is not None:
+        return _cached_response(entry)
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, FEED_BUILD_LOCK_SECONDS):
+        try:
+            response = build()
+            if response.status_code == 200:
+                cache.set(key, (response["Content-Type"], response.content), timeout)
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + FEED_BUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(FEED_BUILD_POLL_SECONDS)
+        # Lock before entry, so a builder finishing between the reads is seen.
+        builder_done = cache.get(lock_key) is None
+        entry = cache.get(key)
+        if entry is not None:
+            return _cached_response(entry)
+        if builder_done:
+            # The builder finished without caching (an error response).
+            break
+    return build()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0018_profile_image_variants'),
+        ('news', '0006_alter_news_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['status', 'published_at', 'id'], name='news_status_published_id_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from html import unescape
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+# Written out here rather than imported from news.search, so later changes
+# to that module cannot change what this migration did. FTS5 is SQLite-only;
+# other databases fall back to LIKE queries.
+CREATE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS news_search USING fts5(
+        title, content, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+DROP_SQL = "DROP TABLE IF EXISTS news_search"
+
+
+def _searchable_text(html):
+    # Content is editor HTML; index the words, not the tags and attributes.
+    return " ".join(unescape(strip_tags(html or "")).split())
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_SQL)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT n.id, n.title, n.content, c.name "
+            "FROM news_news n LEFT JOIN news_category c ON c.id = n.category_id"
+        )
+        rows = [(pk, title, _searchable_text(content), category) for pk, title, content, category in cursor.fetchall()]
+        cursor.executemany(
+            "INSERT INTO news_search(rowid, title, content, category) VALUES (%s, %s, %s, %s)", rows
+        )
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_published_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -84,6 +84,7 @@ class News(models.Model):
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["published_at"]),
+            models.Index(fields=["status", "published_at", "id"], name="news_status_published_id_idx"),
         ]
 
     def save(self, *args, **kwargs):
@@ -104,5 +105,19 @@ class News(models.Model):
 
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "status" in instance.__dict__ and "category_id" in instance.__dict__:
+            instance._loaded_counted_in = instance._counted_in()
+        else:
+            # Deferred fields: treat the stored state as unknown.
+            instance._loaded_counted_in = object()
+        return instance
+
+    def _counted_in(self):
+        # The category this row adds to in the published counts, if any.
+        return ("published", self.category_id) if self.status == "published" else None
+
     def __str__(self):
         return self.title
@@ -0,0 +1,149 @@
+import re
+from html import unescape
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape, strip_tags
+
+from member.search import build_match_query
+
+
+NEWS_SEARCH_TABLE = "news_search"
+NEWS_SEARCH_COLUMNS = ("title", "content", "category")
+# bm25() weights, in column order: a hit in the title outranks one in the body.
+NEWS_SEARCH_WEIGHTS = (10.0, 1.0, 4.0)
+SNIPPET_TOKENS = 12
+
+# Private-use markers around matches; swapped for <mark> after escaping.
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_INSERT_SQL = f"INSERT INTO {NEWS_SEARCH_TABLE}(rowid, {', '.join(NEWS_SEARCH_COLUMNS)}) VALUES (%s, %s, %s, %s)"
+_INDEX_CHUNK_SIZE = 500
+
+
+def searchable_text(html):
+    # Content is editor HTML; index the words, not the tags and attributes.
+    return " ".join(unescape(strip_tags(html or "")).split())
+
+
+def _index_row(pk, title, content, category):
+    return (pk, title, searchable_text(content), category)
+
+
+def index_news(news_ids):
+    """
+    (Re)index the given News rows from the database. Called from the News
+    and Category signal receivers; unlike SQL triggers this can strip the HTML.
+    """
+    if not search_available():
+        return
+    from .models import News
+
+    news_ids = list(news_ids)
+    for start in range(0, len(news_ids), _INDEX_CHUNK_SIZE):
+        chunk = news_ids[start:start + _INDEX_CHUNK_SIZE]
+        rows = News.objects.filter(pk__in=chunk).values_list("id", "title", "content", "category__name")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {NEWS_SEARCH_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk
+            )
+            cursor.executemany(_INSERT_SQL, [_index_row(*row) for row in rows])
+
+
+def unindex_news(news_ids):
+    if not search_available():
+        return
+    news_ids = list(news_ids)
+    if news_ids:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {NEWS_SEARCH_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(news_ids))})", news_ids
+            )
+
+
+def rebuild_news_search_index(using=connection):
+    # Repairs the index; the table itself is created by migration 0008.
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {NEWS_SEARCH_TABLE}")
+        cursor.execute(
+            "SELECT n.id, n.title, n.content, c.name "
+            "FROM news_news n LEFT JOIN news_category c ON c.id = n.category_id"
+        )
+        rows = cursor.fetchall()
+        cursor.executemany(_INSERT_SQL, [_index_row(*row) for row in rows])
+
+
+def search_available():
+    return connection.vendor == "sqlite"
+
+
+def news_search_filter(text):
+    # Q usable on any News queryset; the FTS lookup runs as a subquery.
+    match = build_match_query(text)
+    if not match:
+        return Q(pk__in=[])
+    return Q(pk__in=RawSQL(f"SELECT rowid FROM {NEWS_SEARCH_TABLE} WHERE {NEWS_SEARCH_TABLE} MATCH %s", [match]))
+
+
+def rank_news_search(queryset, text):
+    """
+    Restrict a News queryset to rows matching ``text``, best match first
+    (bm25(), exposed as ``search_rank``; lower is better) and ties in the
+    queryset's own order. news_search is joined once, so FTS5 runs a single
+    MATCH for the query instead of one per row.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    weights = ", ".join(str(w) for w in NEWS_SEARCH_WEIGHTS)
+    return queryset.extra(
+        select={"search_rank": f"bm25({NEWS_SEARCH_TABLE}, {weights})"},
+        tables=[NEWS_SEARCH_TABLE],
+        where=[f"{NEWS_SEARCH_TABLE}.rowid = news_news.id", f"{NEWS_SEARCH_TABLE} MATCH %s"],
+        params=[match],
+    ).order_by("search_rank", *queryset.query.order_by)
+
+
+def _highlight(fragment):
+    return escape(fragment or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def news_snippets(text, news_ids):
+    """
+    Highlighted title and content excerpts for ``news_ids``, keyed by id.
+    Text is HTML-escaped; only the <mark> tags around matches are markup.
+    """
+    match = build_match_query(text)
+    if not match or not news_ids or not search_available():
+        return {}
+
+    placeholders = ", ".join(["%s"] * len(news_ids))
+    sql = (
+        f"SELECT rowid, "
+        f"highlight({NEWS_SEARCH_TABLE}, 0, %s, %s), "
+        f"snippet({NEWS_SEARCH_TABLE}, 1, %s, %s, %s, {SNIPPET_TOKENS}) "
+        f"FROM {NEWS_SEARCH_TABLE} WHERE {NEWS_SEARCH_TABLE} MATCH %s AND rowid IN ({placeholders})"
+    )
+    params = [_MARK_START, _MARK_END, _MARK_START, _MARK_END, "…", match, *news_ids]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {
+            row[0]: {"title": _highlight(row[1]), "content": _highlight(row[2])}
+            for row in cursor.fetchall()
+        }
+
+
+def news_search_q(text):
+    # Fallback for databases without FTS5.
+    condition = Q()
+    for token in _TOKEN_RE.findall(text or ""):
+        condition &= (
+            Q(title__icontains=token)
+            | Q(content__icontains=token)
+            | Q(category__name__icontains=token)
+        )
+    return condition
@@ -0,0 +1,65 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .category_counts import schedule_category_counts_bump
+from .feed_cache import schedule_feed_generation_bump
+from .models import Category, News
+from .search import index_news, unindex_news
+
+
+# Receivers rather than save()/delete() overrides, so queryset.delete() (the
+# admin's "Delete selected") invalidates and unindexes too. The feed changes
+# with any edit to a post that is or was published, and with any category.
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_news([instance.pk])
+    counted_in = instance._counted_in()
+    loaded_counted_in = getattr(instance, "_loaded_counted_in", None)
+    if counted_in != loaded_counted_in:
+        schedule_category_counts_bump()
+    if counted_in is not None or loaded_counted_in is not None:
+        schedule_feed_generation_bump()
+    instance._loaded_counted_in = counted_in
+
+
+def _was_counted(instance):
+    # The state stored at load or save. Reading status/category_id instead
+    # would fail after a delete when they were deferred by only()/defer().
+    if hasattr(instance, "_loaded_counted_in"):
+        return instance._loaded_counted_in is not None
+    return instance._counted_in() is not None
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    unindex_news([instance.pk])
+    if _was_counted(instance):
+        schedule_category_counts_bump()
+        schedule_feed_generation_bump()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_category_counts_bump()
+    schedule_feed_generation_bump()
+    if not created:
+        # The category name is part of each post's search entry.
+        index_news(instance.news_items.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    # News in this category move to "Uncategorized" through SET_NULL.
+    instance._news_ids = list(instance.news_items.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    schedule_category_counts_bump()
+    schedule_feed_generation_bump()
+    index_news(getattr(instance, "_news_ids", []))
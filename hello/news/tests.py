@@ -1,3 +1,393 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from member.models import Member
+from member.pagination import encode_cursor
+
+from .category_counts import get_category_counts, get_category_counts_version
+from .feed_cache import cached_feed_response, feed_cache_key, get_feed_generation
+from .models import Category, News
+
+
+@override_settings(NEWS_FEED_CACHE_TIMEOUT=0)
+class NewsNavigationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9000000001")
+        cls.category = Category.objects.create(name="Community")
+        cls.posts = [
+            News.objects.create(
+                title=f"Post {index}", content="Body", category=cls.category, created_by=cls.author, status="published"
+            )
+            for index in range(6)
+        ]
+        now = timezone.now()
+        # Posts 1 and 2 share a timestamp; posts 4 and 5 have none.
+        published_at = [now - timedelta(days=2), now - timedelta(days=1), now - timedelta(days=1), now, None, None]
+        for post, value in zip(cls.posts, published_at):
+            News.objects.filter(pk=post.pk).update(published_at=value)
+        News.objects.create(title="Draft", content="Body", created_by=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def _expected_order(self):
+        # Feed order: newest first, NULLs last, ties by the higher id.
+        p = self.posts
+        return [p[3].pk, p[2].pk, p[1].pk, p[0].pk, p[5].pk, p[4].pk]
+
+    def _get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_order_puts_undated_posts_last(self):
+        data = self._get(reverse("news:api_all_news"))
+        self.assertEqual([item["id"] for item in data["results"]], self._expected_order())
+
+    def test_next_links_walk_the_list_order(self):
+        expected = self._expected_order()
+        data = self._get(reverse("news:api_all_news"), id=expected[0])
+        self.assertIsNone(data["previous"])
+        seen = [data["result"]["id"]]
+        while data["next"]:
+            self.assertEqual(data["next_item"]["id"], int(data["next"].rsplit("=", 1)[1]))
+            data = self._get(data["next"])
+            seen.append(data["result"]["id"])
+        self.assertEqual(seen, expected)
+
+    def test_previous_links_walk_the_list_order_backwards(self):
+        expected = self._expected_order()
+        data = self._get(reverse("news:api_all_news"), id=expected[-1])
+        self.assertIsNone(data["next"])
+        seen = [data["result"]["id"]]
+        while data["previous"]:
+            self.assertEqual(data["previous_item"]["id"], int(data["previous"].rsplit("=", 1)[1]))
+            data = self._get(data["previous"])
+            seen.append(data["result"]["id"])
+        self.assertEqual(seen, expected[::-1])
+
+    def test_neighbours_across_the_null_boundary(self):
+        oldest_dated, newest_undated = self.posts[0], self.posts[5]
+        data = self._get(reverse("news:api_all_news"), id=oldest_dated.pk)
+        self.assertEqual(data["next_item"]["id"], newest_undated.pk)
+
+        data = self._get(reverse("news:api_all_news"), slug=newest_undated.slug)
+        self.assertEqual(data["previous_item"]["id"], oldest_dated.pk)
+        self.assertEqual(data["next_item"]["id"], self.posts[4].pk)
+
+    def test_unpublished_and_missing_posts_are_not_found(self):
+        draft = News.objects.get(title="Draft")
+        response = self.client.get(reverse("news:api_all_news"), {"id": draft.pk})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("news:api_all_news"), {"id": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pages_walk_the_list_order_without_counting(self):
+        seen = []
+        data = self._get(reverse("news:api_all_news"), cursor="", page_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            while True:
+                self.assertNotIn("count", data)
+                self.assertLessEqual(len(data["results"]), 2)
+                seen += [item["id"] for item in data["results"]]
+                if not data["has_next"]:
+                    break
+                data = self._get(data["next"])
+        self.assertEqual(seen, self._expected_order())
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries.captured_queries))
+
+    def test_cursor_mode_caps_the_page_size(self):
+        data = self._get(reverse("news:api_all_news"), cursor="", page_size=1000000)
+        self.assertEqual(data["page_size"], 100)
+        self.assertEqual(len(data["results"]), 6)
+        self.assertFalse(data["has_next"])
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in ("not-a-cursor", encode_cursor(None, None), encode_cursor("2024-01-01T00:00:00", "1")):
+            response = self.client.get(reverse("news:api_all_news"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+
+
+class CategoryCountsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9000000001")
+        cls.community = Category.objects.create(name="Community")
+        cls.events = Category.objects.create(name="Events")
+        Category.objects.create(name="Archived", is_active=False)
+        cls.post = News.objects.create(
+            title="Welcome", content="Body", category=cls.community, created_by=cls.author, status="published"
+        )
+        News.objects.create(title="Uncategorized", content="Body", created_by=cls.author, status="published")
+        News.objects.create(title="Draft", content="Body", category=cls.events, created_by=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def _counts(self):
+        return {item["slug"]: item["count"] for item in get_category_counts()}
+
+    def test_counts_published_news_per_active_category(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("news:api_category_list"))
+        self.assertEqual(
+            {item["slug"]: item["count"] for item in response.json()["results"]},
+            {"community": 1, "events": 0, "uncategorized": 1},
+        )
+
+    def test_counts_are_served_from_memory_until_invalidated(self):
+        self._counts()
+        with self.assertNumQueries(0):
+            self.assertEqual(self._counts(), {"community": 1, "events": 0, "uncategorized": 1})
+
+    def test_publishing_and_moving_news_invalidates(self):
+        self._counts()
+        draft = News.objects.get(title="Draft")
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.status = "published"
+            draft.save()
+        self.assertEqual(self._counts(), {"community": 1, "events": 1, "uncategorized": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.category = self.events
+            self.post.save()
+        self.assertEqual(self._counts(), {"community": 0, "events": 2, "uncategorized": 1})
+
+    def test_edit_that_keeps_status_and_category_keeps_the_counts(self):
+        version = get_category_counts_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = "Welcome back"
+            self.post.save()
+        self.assertEqual(get_category_counts_version(), version)
+
+    def test_deletes_invalidate(self):
+        self._counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.only("pk").get(pk=self.post.pk).delete()
+        self.assertEqual(self._counts(), {"community": 0, "events": 0, "uncategorized": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.filter(category__isnull=True).delete()
+        self.assertEqual(self._counts(), {"community": 0, "events": 0, "uncategorized": 0})
+
+    def test_category_changes_invalidate(self):
+        self._counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.events.is_active = False
+            self.events.save()
+        self.assertEqual(self._counts(), {"community": 1, "uncategorized": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.community.delete()
+        self.assertEqual(self._counts(), {"uncategorized": 2})
+
+
+@override_settings(NEWS_FEED_CACHE_TIMEOUT=0)
+class NewsSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9000000001")
+        cls.category = Category.objects.create(name="Obituaries")
+        cls.title_hit = News.objects.create(
+            title="Shah family announcement", content="<p>Details inside.</p>", created_by=cls.author,
+            status="published",
+        )
+        cls.body_hit = News.objects.create(
+            title="Weekly notes", content="<p>Meeting at the <b>Shah</b> residence &amp; hall.</p>",
+            category=cls.category, created_by=cls.author, status="published",
+        )
+        News.objects.create(title="Unrelated", content="Nothing here", created_by=cls.author, status="published")
+        News.objects.create(title="Shah draft", content="Body", created_by=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def _search(self, text, **params):
+        response = self.client.get(reverse("news:api_all_news"), {"q": text, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _ids(self, text):
+        return [item["id"] for item in self._search(text)["results"]]
+
+    def test_title_matches_rank_first(self):
+        data = self._search("shah")
+        self.assertEqual(data["ordering"], "relevance")
+        self.assertEqual([item["id"] for item in data["results"]], [self.title_hit.pk, self.body_hit.pk])
+        self.assertEqual(data["count"], 2)
+
+    def test_match_runs_once_per_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._search("shah")
+        matching = [query["sql"] for query in queries.captured_queries if "MATCH" in query["sql"]]
+        self.assertTrue(matching)
+        for sql in matching:
+            self.assertEqual(sql.count("MATCH"), 1, sql)
+
+    def test_highlights_are_escaped_and_strip_html(self):
+        results = {item["id"]: item for item in self._search("shah")["results"]}
+        self.assertEqual(results[self.title_hit.pk]["highlight"]["title"], "<mark>Shah</mark> family announcement")
+        content = results[self.body_hit.pk]["highlight"]["content"]
+        self.assertIn("<mark>Shah</mark>", content)
+        self.assertIn("&amp;", content)
+        self.assertNotIn("<p>", content)
+        self.assertNotIn("<b>", content)
+
+    def test_markup_is_not_indexed(self):
+        self.assertEqual(self._ids("residence"), [self.body_hit.pk])
+        self.assertEqual(self._ids("amp"), [])
+
+    def test_prefixes_match_and_operators_are_literal(self):
+        self.assertEqual(self._ids("annou"), [self.title_hit.pk])
+        self.assertEqual(self._ids('shah NOT "family"'), [])
+        self.assertEqual(self._ids("!!!"), [])
+
+    def test_cursor_mode_keeps_date_order(self):
+        data = self._search("shah", cursor="")
+        self.assertEqual(data["ordering"], "-published_at")
+        self.assertEqual([item["id"] for item in data["results"]], [self.body_hit.pk, self.title_hit.pk])
+        self.assertIn("highlight", data["results"][0])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.title_hit.title = "Mehta family announcement"
+        self.title_hit.save()
+        self.assertEqual(self._ids("mehta"), [self.title_hit.pk])
+        self.assertEqual(self._ids("shah"), [self.body_hit.pk])
+
+        self.body_hit.delete()
+        self.assertEqual(self._ids("shah"), [])
+
+    def test_category_rename_and_delete_reindex(self):
+        self.assertEqual(self._ids("obituaries"), [self.body_hit.pk])
+        self.category.name = "Remembrance"
+        self.category.save()
+        self.assertEqual(self._ids("remembrance"), [self.body_hit.pk])
+        self.assertEqual(self._ids("obituaries"), [])
+
+        self.category.delete()
+        self.assertEqual(self._ids("remembrance"), [])
+
+    def test_admin_search_uses_the_index(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:news_news_changelist"), {"q": "residence"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].result_list), [self.body_hit])
+
+
+@override_settings(NEWS_FEED_CACHE_TIMEOUT=60)
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Member.objects.create(first_name="Asha", surname="Patel", phone_no="9000000001")
+        cls.post = News.objects.create(title="Welcome", content="Body", created_by=cls.author, status="published")
+        cls.draft = News.objects.create(title="Draft", content="Body", created_by=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def _ids(self, **params):
+        response = self.client.get(reverse("news:api_all_news"), params)
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.json()["results"]]
+
+    def test_identical_requests_are_served_from_the_cache(self):
+        self.assertEqual(self._ids(), [self.post.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._ids(), [self.post.pk])
+        with self.assertNumQueries(2):
+            self._ids(page_size=5)
+
+    def test_parameter_order_does_not_change_the_key(self):
+        factory = RequestFactory()
+        generation = get_feed_generation()
+        self.assertEqual(
+            feed_cache_key(factory.get("/news/allpost/?a=1&b=2"), generation),
+            feed_cache_key(factory.get("/news/allpost/?b=2&a=1"), generation),
+        )
+        self.assertNotEqual(
+            feed_cache_key(factory.get("/news/allpost/?category_id="), generation),
+            feed_cache_key(factory.get("/news/allpost/"), generation),
+        )
+
+    def test_publish_unpublish_and_delete_refresh_the_feed(self):
+        self._ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = "published"
+            self.draft.save()
+        self.assertEqual(self._ids(), [self.draft.pk, self.post.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.status = "draft"
+            self.post.save()
+        self.assertEqual(self._ids(), [self.draft.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.filter(pk=self.draft.pk).delete()
+        self.assertEqual(self._ids(), [])
+
+    def test_editing_a_published_post_refreshes_the_feed(self):
+        self._ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = "Welcome back"
+            self.post.save()
+        response = self.client.get(reverse("news:api_all_news"))
+        self.assertEqual(response.json()["results"][0]["title"], "Welcome back")
+
+    def test_editing_a_draft_keeps_the_generation(self):
+        generation = get_feed_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.title = "Still a draft"
+            self.draft.save()
+        self.assertEqual(get_feed_generation(), generation)
+
+    def test_error_responses_are_not_cached(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("news:api_all_news"), {"id": self.draft.pk})
+            self.assertEqual(response.status_code, 404)
+
+    @override_settings(NEWS_FEED_CACHE_TIMEOUT=0)
+    def test_zero_timeout_bypasses_the_cache(self):
+        build = mock.Mock(return_value=JsonResponse({}))
+        request = RequestFactory().get("/news/allpost/")
+        cached_feed_response(request, build)
+        cached_feed_response(request, build)
+        self.assertEqual(build.call_count, 2)
+        self.assertIsNone(cache.get(feed_cache_key(request, get_feed_generation())))
+
+    def test_concurrent_miss_waits_for_the_builder(self):
+        request = RequestFactory().get("/news/allpost/")
+        key = feed_cache_key(request, get_feed_generation())
+        cache.add(f"{key}:lock", 1)
+
+        def builder_finishes(seconds):
+            cache.set(key, ("application/json", b'{"built": "elsewhere"}'))
+            cache.delete(f"{key}:lock")
+
+        build = mock.Mock()
+        with mock.patch("news.feed_cache.time.sleep", side_effect=builder_finishes):
+            response = cached_feed_response(request, build)
+        build.assert_not_called()
+        self.assertEqual(response.content, b'{"built": "elsewhere"}')
+
+    def test_concurrent_miss_builds_when_the_builder_fails(self):
+        request = RequestFactory().get("/news/allpost/")
+        key = feed_cache_key(request, get_feed_generation())
+        cache.add(f"{key}:lock", 1)
+
+        build = mock.Mock(return_value=HttpResponse("ok"))
+        with mock.patch("news.feed_cache.time.sleep", side_effect=lambda seconds: cache.delete(f"{key}:lock")):
+            response = cached_feed_response(request, build)
+        build.assert_called_once_with()
+        self.assertEqual(response.content, b"ok")
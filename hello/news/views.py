@@ -3,11 +3,18 @@ from django.utils import timezone
 from django.http import JsonResponse
 from django.conf import settings
 from django.core.paginator import Paginator, EmptyPage
-from django.db.models import Q
+from django.db.models import F, Q
 import os
 
+from .category_counts import get_category_counts
+from .feed_cache import cached_feed_response
 from .models import News,Category
-from member.models import Member
+from .search import news_search_filter, news_search_q, news_snippets, rank_news_search, search_available
+from member.middleware import get_logged_in_member
+from member.pagination import InvalidCursor, keyset_neighbours, keyset_page
+
+NEWS_PAGE_SIZE = 10
+NEWS_PAGE_SIZE_MAX = 100
 
 STATUS_CODE_MAP = {
     "inreview": 0,
@@ -60,26 +67,16 @@ def _serialize_news_item(n):
     }
 
 
-def _single_record_navigation(request, news_qs, current_obj):
-    ordered_ids = list(news_qs.values_list("id", flat=True))
-    try:
-        idx = ordered_ids.index(current_obj.id)
-    except ValueError:
-        return {
-            "previous": None,
-            "next": None,
-            "previous_item": None,
-            "next_item": None,
-        }
-
-    prev_obj = None
-    next_obj = None
+def _add_search_highlights(results, search_text):
+    if search_text:
+        snippets = news_snippets(search_text, [item["id"] for item in results])
+        for item in results:
+            item["highlight"] = snippets.get(item["id"])
+    return results
 
-    if idx > 0:
-        prev_obj = news_qs.filter(id=ordered_ids[idx - 1]).first()
-    if idx < len(ordered_ids) - 1:
-        next_obj = news_qs.filter(id=ordered_ids[idx + 1]).first()
 
+def _single_record_navigation(request, news_qs, current_obj):
+    prev_obj, next_obj = keyset_neighbours(news_qs, current_obj)
     return {
         "previous": request.build_absolute_uri(f"{request.path}?id={prev_obj.id}") if prev_obj else None,
         "next": request.build_absolute_uri(f"{request.path}?id={next_obj.id}") if next_obj else None,
@@ -88,19 +85,6 @@ def _single_record_navigation(request, news_qs, current_obj):
     }
 
 
-# =====================================================
-# 🔐 HELPER: GET LOGGED-IN MEMBER
-# =====================================================
-def get_logged_in_member(request):
-    member_no = request.session.get('member_no')
-    if not member_no:
-        return None
-    try:
-        return Member.objects.get(member_no=member_no)
-    except Member.DoesNotExist:
-        return None
-
-
 # =====================================================
 # 📰 NEWS LIST (SESSION BASED)
 # =====================================================
@@ -230,41 +214,22 @@ def news_delete(request, pk):
 # 🌐 PUBLIC JSON APIs
 # =====================================================
 def api_category_list(request):
-    categories = Category.objects.filter(is_active=True).order_by("name")
-    data = [
-        {
-            "id": c.id,
-            "name": c.name,
-            "slug": c.slug,
-            "count": c.news_items.filter(status="published").count(),
-        }
-        for c in categories
-    ]
-
-    # Include virtual category for posts where category is null.
-    uncategorized_count = News.objects.filter(
-        status="published",
-        category__isnull=True,
-    ).count()
-    data.append(
-        {
-            "id": 0,
-            "name": "Uncategorized",
-            "slug": "uncategorized",
-            "count": uncategorized_count,
-        }
-    )
+    data = get_category_counts()
     return JsonResponse({"count": len(data), "results": data})
 
 
 def api_all_news(request):
+    return cached_feed_response(request, lambda: _build_all_news_response(request))
+
+
+def _build_all_news_response(request):
     ordering_mode = "-published_at"
 
     news_qs = (
         News.objects
         .select_related("category", "created_by")
         .filter(status="published")
-        .order_by("-published_at")
+        .order_by(F("published_at").desc(nulls_last=True), "-id")
     )
 
     requested_id = (request.GET.get("id") or request.GET.get("news_id") or request.GET.get("post_id") or "").strip()
@@ -279,13 +244,7 @@ def api_all_news(request):
         news_item = news_qs.filter(id=requested_id).first()
         if not news_item:
             return JsonResponse({"detail": "News not found", "id": requested_id}, status=404)
-        nav_qs = (
-            News.objects
-            .select_related("category", "created_by")
-            .filter(status="published")
-            .order_by("-published_at")
-        )
-        nav = _single_record_navigation(request, nav_qs, news_item)
+        nav = _single_record_navigation(request, news_qs, news_item)
         return JsonResponse(
             {
                 "result": _serialize_news_item(news_item),
@@ -301,13 +260,7 @@ def api_all_news(request):
         news_item = news_qs.filter(slug=requested_slug).first()
         if not news_item:
             return JsonResponse({"detail": "News not found", "slug": requested_slug}, status=404)
-        nav_qs = (
-            News.objects
-            .select_related("category", "created_by")
-            .filter(status="published")
-            .order_by("-published_at")
-        )
-        nav = _single_record_navigation(request, nav_qs, news_item)
+        nav = _single_record_navigation(request, news_qs, news_item)
         return JsonResponse(
             {
                 "result": _serialize_news_item(news_item),
@@ -369,12 +322,54 @@ def api_all_news(request):
                 Q(category__name__istartswith=compact_name)
             )
 
+    search_text = (request.GET.get("q") or "").strip()
+    if search_text:
+        if not search_available():
+            news_qs = news_qs.filter(news_search_q(search_text))
+        elif "cursor" in request.GET:
+            # Cursor mode keeps its (published_at, id) order.
+            news_qs = news_qs.filter(news_search_filter(search_text))
+        else:
+            # Best match first.
+            news_qs = rank_news_search(news_qs, search_text)
+            ordering_mode = "relevance"
+
     page_number = request.GET.get("page", 1)
-    page_size = request.GET.get("page_size") or request.GET.get("per_page") or 10
+    page_size = request.GET.get("page_size") or request.GET.get("per_page") or NEWS_PAGE_SIZE
     try:
-        page_size = max(1, int(page_size))
+        page_size = max(1, min(int(page_size), NEWS_PAGE_SIZE_MAX))
     except (TypeError, ValueError):
-        page_size = 10
+        page_size = NEWS_PAGE_SIZE
+
+    if "cursor" in request.GET:
+        # Opt-in infinite scroll: keyset on (published_at, id), no COUNT/OFFSET.
+        try:
+            page, next_cursor = keyset_page(news_qs, request.GET["cursor"].strip(), page_size)
+        except InvalidCursor as exc:
+            return JsonResponse({"detail": str(exc)}, status=400)
+        next_url = None
+        if next_cursor:
+            next_params = request.GET.copy()
+            next_params.pop("page", None)
+            next_params["cursor"] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{next_params.urlencode()}")
+        # No "count": page mode's is the total, which cursor mode never computes.
+        return JsonResponse(
+            {
+                "page_size": page_size,
+                "has_next": next_cursor is not None,
+                "ordering": ordering_mode,
+                "next_cursor": next_cursor,
+                "next": next_url,
+                "category_filter": {
+                    "category_id": category_id,
+                    "category_slug": category_slug,
+                    "category": category_name,
+                },
+                "q": search_text or None,
+                "results": _add_search_highlights([_serialize_news_item(obj) for obj in page], search_text),
+            }
+        )
 
     paginator = Paginator(news_qs, page_size)
     try:
@@ -392,6 +387,7 @@ def api_all_news(request):
         item = _serialize_news_item(n)
         item["line_no"] = start_index + idx
         results.append(item)
+    _add_search_highlights(results, search_text)
 
     if paginator.num_pages:
         current_page = page_obj.number
@@ -437,6 +433,7 @@ def api_all_news(request):
                 "id": requested_id if requested_id else None,
                 "slug": requested_slug or None,
             },
+            "q": search_text or None,
             "results": results,
         }
     )
@@ -0,0 +1,117 @@
+"""
+Benchmark previous/next lookup for single news and marketplace items.
+
+Compares the old navigation (load every published id, list.index(), then
+two more queries) with member.pagination.keyset_neighbours() at a given
+number of published rows. The rows are created inside a transaction that
+is rolled back, so the database is left as it was.
+
+    cd hello
+    python scripts/bench_single_record_navigation.py --rows 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hello.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import F  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from marketplace.models import BnsModel  # noqa: E402
+from member.pagination import keyset_neighbours  # noqa: E402
+from news.models import News  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def list_index_neighbours(qs, obj):
+    ordered_ids = list(qs.values_list("id", flat=True))
+    idx = ordered_ids.index(obj.id)
+    prev_obj = qs.filter(id=ordered_ids[idx - 1]).first() if idx > 0 else None
+    next_obj = qs.filter(id=ordered_ids[idx + 1]).first() if idx < len(ordered_ids) - 1 else None
+    return prev_obj, next_obj
+
+
+def create_rows(model, rows, run):
+    now = timezone.now()
+    # Three rows per second, so equal timestamps exercise the id tie-break.
+    objs = []
+    for i in range(rows):
+        fields = {
+            "title": f"Benchmark {i}",
+            "slug": f"bench-{run}-{i}",
+            "status": "published",
+            "published_at": now - timedelta(seconds=i // 3),
+        }
+        if model is News:
+            fields["content"] = "Benchmark row"
+        else:
+            fields.update(desc="Benchmark row", listing_type=BnsModel.LISTING_TYPE_SELLER, contact="0")
+        objs.append(model(**fields))
+    model.objects.bulk_create(objs, batch_size=5000)
+
+
+def measure(label, qs, samples, func):
+    timings = []
+    queries = 0
+    results = []
+    for obj in samples:
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            prev_obj, next_obj = func(qs, obj)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured.captured_queries))
+        results.append((prev_obj and prev_obj.id, next_obj and next_obj.id))
+    print(
+        f"  {label:<14} median {statistics.median(timings):8.2f} ms   "
+        f"max {max(timings):8.2f} ms   queries {queries}"
+    )
+    return results
+
+
+def bench(model, rows, sample_count, run):
+    create_rows(model, rows, run)
+    qs = model.objects.filter(status="published").order_by(F("published_at").desc(nulls_last=True), "-id")
+    total = qs.count()
+    step = max(1, total // sample_count)
+    samples = [qs[i] for i in range(0, total, step)][:sample_count] + [qs[total - 1]]
+
+    print(f"{model.__name__}: {total} published rows, {len(samples)} lookups")
+    old = measure("list.index()", qs, samples, list_index_neighbours)
+    new = measure("keyset", qs, samples, keyset_neighbours)
+    if old != new:
+        raise SystemExit(f"{model.__name__}: keyset neighbours differ from the list.index() result")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Published rows to create per model")
+    parser.add_argument("--samples", type=int, default=20, help="Lookups measured per model")
+    args = parser.parse_args()
+
+    run = int(time.time())
+    try:
+        with transaction.atomic():
+            for model in (News, BnsModel):
+                bench(model, args.rows, args.samples, run)
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
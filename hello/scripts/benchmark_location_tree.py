@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Benchmark the location_relation_api tree builder.
+
+Compares the previous per-city state scan (O(cities x states)) with the
+id-indexed single pass in member.locations.build_country_node.
+
+Usage:
+  python scripts/seed_world_locations.py --all-cities
+  python scripts/benchmark_location_tree.py
+  python scripts/benchmark_location_tree.py --synthetic-cities 150000 --synthetic-states 36
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hello.settings")
+sys.path.insert(0, BASE_DIR)
+
+import django  # noqa: E402
+
+django.setup()
+
+from member.locations import LocationSnapshot, build_country_node, get_location_snapshot  # noqa: E402
+
+
+def _legacy_country_node(country, states, cities):
+    states_by_country = {}
+    for st in states:
+        states_by_country.setdefault(st["country_id"], []).append(
+            {"id": st["id"], "name": st["name"], "cities": []}
+        )
+
+    cities_without_state = []
+    for city in cities:
+        city_data = {"id": city["id"], "name": city["name"]}
+        if city["state_id"]:
+            for st in states_by_country.get(city["country_id"], []):
+                if st["id"] == city["state_id"]:
+                    st["cities"].append(city_data)
+                    break
+        else:
+            cities_without_state.append(city_data)
+
+    return {
+        "id": country["id"],
+        "name": country["name"],
+        "states": states_by_country.get(country["id"], []),
+        "cities_without_state": cities_without_state,
+    }
+
+
+def _synthetic_snapshot(city_count, state_count):
+    country = {"id": 1, "name": "Synthetic"}
+    states = [
+        {"id": i, "name": f"State {i:05d}", "country_id": 1, "country_name": "Synthetic"}
+        for i in range(1, state_count + 1)
+    ]
+    cities = [
+        {
+            "id": i,
+            "name": f"City {i:07d}",
+            "country_id": 1,
+            "country_name": "Synthetic",
+            "state_id": (i % state_count) + 1,
+            "state_name": None,
+        }
+        for i in range(1, city_count + 1)
+    ]
+    return LocationSnapshot(0, [country], states, cities)
+
+
+def _time(builder, snapshot, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for country in snapshot.countries:
+            builder(
+                country,
+                snapshot.states_by_country.get(country["id"], []),
+                snapshot.cities_by_country.get(country["id"], []),
+            )
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the location tree builder")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per builder; best time is reported")
+    parser.add_argument(
+        "--synthetic-cities",
+        type=int,
+        default=0,
+        help="Benchmark an in-memory country with this many cities instead of the database",
+    )
+    parser.add_argument("--synthetic-states", type=int, default=36, help="States for --synthetic-cities")
+    args = parser.parse_args()
+
+    if args.synthetic_cities:
+        snapshot = _synthetic_snapshot(args.synthetic_cities, args.synthetic_states)
+    else:
+        snapshot = get_location_snapshot()
+
+    print(
+        f"countries={len(snapshot.countries)} states={len(snapshot.states)} cities={len(snapshot.cities)}"
+    )
+
+    sample = snapshot.countries[: min(len(snapshot.countries), 50)]
+    for country in sample:
+        states = snapshot.states_by_country.get(country["id"], [])
+        cities = snapshot.cities_by_country.get(country["id"], [])
+        if build_country_node(country, states, cities) != _legacy_country_node(country, states, cities):
+            raise SystemExit(f"Tree mismatch for country {country['id']} ({country['name']})")
+
+    legacy = _time(_legacy_country_node, snapshot, args.repeat)
+    indexed = _time(build_country_node, snapshot, args.repeat)
+    print(f"legacy state scan: {legacy * 1000:.1f} ms")
+    print(f"indexed build:     {indexed * 1000:.1f} ms")
+    if indexed:
+        print(f"speedup:           {legacy / indexed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-import unicodedata
 from collections import defaultdict
 
 import geonamescache
 import pycountry
 
+from member.locations import bump_location_version, normalize_name as norm
 from member.models import City, Country, State
 
 TARGET_COUNTRIES = [
@@ -16,14 +16,6 @@ TARGET_COUNTRIES = [
 ]
 
 
-def norm(s):
-    if not s:
-        return ''
-    s = unicodedata.normalize('NFKD', s)
-    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
-    return s.strip().lower()
-
-
 gc = geonamescache.GeonamesCache()
 geo_countries = gc.get_countries()
 geo_name_to_iso = {v['name'].strip().lower(): k for k, v in geo_countries.items()}
@@ -91,5 +83,7 @@ for country_name, (country_obj, iso2) in country_objs.items():
         f"inserted={len(to_create)} skipped_no_state={skipped_no_state} total={total} mapped={mapped}"
     )
 
+bump_location_version()
+
 print('with_state', City.objects.exclude(state__isnull=True).count())
 print('without_state', City.objects.filter(state__isnull=True).count())
@@ -32,6 +32,7 @@ import django  # noqa: E402
 django.setup()
 
 from django.db import transaction  # noqa: E402
+from member.locations import bump_location_version  # noqa: E402
 from member.models import City, Country  # noqa: E402
 
 try:
@@ -128,6 +129,8 @@ def seed_cities(countries, reset=False):
 
             print(f"Loaded cities for {canonical}: {len(rows)} source rows")
 
+    bump_location_version()
+
     print("Done")
     print(f"Created city rows: {created}")
     print(f"Existing city rows: {exists}")
@@ -26,6 +26,7 @@ import django  # noqa: E402
 django.setup()
 
 from django.db import transaction  # noqa: E402
+from member.locations import bump_location_version  # noqa: E402
 from member.models import City, Country, State  # noqa: E402
 
 
@@ -169,6 +170,8 @@ def seed_world_locations(all_cities=False, max_cities_per_country=300, min_popul
                 else:
                     existing["city"] += 1
 
+    bump_location_version()
+
     print("Seeding completed")
     print("Created:", created)
     print("Existing:", existing)